@@ -0,0 +1,96 @@
+"""
+Groups created per second by GroupsService.create_group, against the configured database.
+
+Every group has an admin and `--members` members, all new users. Run it against a local or test
+database only : the groups and users are not deleted.
+
+Usage :
+    DB_ENV=test uv run python -m benchmarks.create_group --groups 500 --members 5 --concurrency 10
+"""
+
+import argparse
+import asyncio
+import time
+from uuid import uuid4
+
+from databases import Database
+
+from src.config import settings
+from src.database import DatabaseWithSchema, database_options
+from src.dependencies.services import get_groups_service_factory
+from src.model import GroupCreate, UserCreate
+from src.repositories.logs import LogsRepository
+from src.services.logs import LogsService
+from src.utils.sql_profiler import QueryProfile, global_query_profiles
+
+# DINUM, present in the seed : the organisation is not created, nor fetched from the API
+SIRET = "13002526500013"
+SERVICE_PROVIDER_ID = 1
+
+
+def random_group_data(members: int) -> GroupCreate:
+    return GroupCreate(
+        name=f"Benchmark {uuid4()}",
+        organisation_siret=SIRET,
+        admin=UserCreate(email=f"bench_{uuid4()}@beta.gouv.fr"),
+        scopes="read write",
+        contract_description="benchmark",
+        contract_url="https://example.com/contract",
+        members=[
+            UserCreate(email=f"bench_{uuid4()}@beta.gouv.fr") for _ in range(members)
+        ],
+    )
+
+
+async def run(groups: int, members: int, concurrency: int) -> None:
+    database = Database(settings.DATABASE_URL, **database_options())
+    await database.connect()
+    db_session = DatabaseWithSchema(database, settings.DB_SCHEMA)
+
+    create_groups_service = await get_groups_service_factory(
+        db_session, LogsService(LogsRepository(0, 0))
+    )
+    groups_service = create_groups_service(
+        SERVICE_PROVIDER_ID, should_send_emails=False
+    )
+
+    # warm up (reference data, prepared statements)
+    for _ in range(concurrency):
+        await groups_service.create_group(random_group_data(members))
+
+    payloads = [random_group_data(members) for _ in range(groups)]
+    queue = asyncio.Queue()
+    for payload in payloads:
+        queue.put_nowait(payload)
+
+    async def worker():
+        # one connection per task
+        while not queue.empty():
+            await groups_service.create_group(queue.get_nowait())
+
+    profile = QueryProfile()
+    global_query_profiles.append(profile)
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    finally:
+        elapsed = time.perf_counter() - start
+        global_query_profiles.remove(profile)
+        await database.disconnect()
+
+    print(
+        f"create_group x{groups} ({members} members, {concurrency} concurrent): "
+        f"{groups / elapsed:7.1f} groups/s | "
+        f"{len(profile) / groups:.1f} round-trips per group | "
+        f"{profile.total_duration / groups * 1000:.2f} ms in the database per group"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--groups", type=int, default=500)
+    parser.add_argument("--members", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=10)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.groups, args.members, args.concurrency))
@@ -0,0 +1,125 @@
+"""
+Measure the cost of client errors (404) on the exception path :
+the previous handler (Sentry capture, traceback logging and full event scrubbing on every HTTPException)
+against the current one (capture policy, no traceback for 4xx, targeted scrubbing).
+
+Sentry is initialised with a transport that drops events, so that capture and scrubbing are measured
+without network calls.
+
+Usage :
+    uv run python -m benchmarks.exceptions
+"""
+
+import argparse
+import asyncio
+import io
+import logging
+import time
+
+import httpx
+import sentry_sdk
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.exception_handlers import http_exception_handler
+from sentry_sdk.integrations.logging import ignore_logger
+from sentry_sdk.transport import Transport
+from starlette.exceptions import HTTPException as StarletteHTTPException
+
+from src.main import (
+    anonymized_http_exception,
+    http_exceptions_logger,
+    log_http_exception,
+    sentry_before_send,
+)
+from src.utils.sentry import anonymize_user_emails
+
+# the previous handler logged on the application logger, also sent to Sentry by the logging integration
+logger = logging.getLogger("src")
+
+
+class DroppingTransport(Transport):
+    def capture_envelope(self, envelope):
+        pass
+
+
+async def legacy_log_http_exception(request: Request, exc: StarletteHTTPException):
+    anonymized_exception = anonymized_http_exception(exc)
+    sentry_sdk.capture_exception(anonymized_exception)
+    logger.error(
+        "HTTPException %s on %s %s: %s",
+        anonymized_exception.status_code,
+        request.method,
+        request.url.path,
+        anonymized_exception.detail,
+        exc_info=(
+            type(anonymized_exception),
+            anonymized_exception,
+            anonymized_exception.__traceback__,
+        ),
+    )
+    return await http_exception_handler(request, exc)
+
+
+def build_app(legacy: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/groups/{group_id}")
+    async def group(group_id: int):
+        raise HTTPException(status_code=404, detail=f"Group {group_id} not found")
+
+    app.add_exception_handler(
+        StarletteHTTPException,
+        legacy_log_http_exception if legacy else log_http_exception,
+    )
+    return app
+
+
+async def measure(app: FastAPI, iterations: int) -> float:
+    """Requests per second"""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        for i in range(100):
+            response = await client.get(f"/groups/{i}")
+            assert response.status_code == 404
+
+        start = time.perf_counter()
+        for i in range(iterations):
+            await client.get(f"/groups/{i}")
+        return iterations / (time.perf_counter() - start)
+
+
+def init_sentry(before_send) -> None:
+    sentry_sdk.init(
+        dsn="https://public@sentry.invalid/1",
+        transport=DroppingTransport,
+        attach_stacktrace=True,
+        before_send=before_send,
+    )
+    # as in src/main.py
+    ignore_logger(http_exceptions_logger.name)
+
+
+async def run(iterations: int) -> None:
+    init_sentry(lambda event, _hint: anonymize_user_emails(event))
+    before = await measure(build_app(legacy=True), iterations)
+    init_sentry(sentry_before_send)
+    after = await measure(build_app(legacy=False), iterations)
+    print(
+        f"404 x{iterations}: previous handler {before:7.0f} req/s | "
+        f"current handler {after:7.0f} req/s | "
+        f"speedup x{after / before:.2f}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=2_000)
+    args = parser.parse_args()
+
+    # logs are formatted, as in production, but not printed
+    handler = logging.StreamHandler(io.StringIO())
+    logging.getLogger("src").addHandler(handler)
+    logging.getLogger("src").propagate = False
+
+    asyncio.run(run(args.iterations))
@@ -0,0 +1,118 @@
+"""
+Compare FastAPI's default `response_model` serialisation with `records_response`
+on 10k-element list responses.
+
+Usage :
+    uv run python -m benchmarks.json_responses
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from src.model import (
+    GroupWithScopesResponse,
+    GroupWithUsersAndScopesResponse,
+    UserWithRoleResponse,
+)
+from src.utils.responses import records_response
+
+DINUM_SIRET = "13002526500013"
+
+
+def fake_group_records(size: int) -> list[dict]:
+    return [
+        {
+            "id": i,
+            "name": f"Groupe {i}",
+            "organisation_siret": DINUM_SIRET,
+            "scopes": "rne conformite_fiscale effectifs bilans_bdf",
+            "scope_list": ["rne", "conformite_fiscale", "effectifs", "bilans_bdf"],
+            "contract_description": f"DATAPASS_DEMANDE_{i}",
+            "contract_url": f"https://datapass.api.gouv.fr/demandes/{i}",
+        }
+        for i in range(size)
+    ]
+
+
+def fake_groups_with_users(size: int) -> list[GroupWithUsersAndScopesResponse]:
+    return [
+        GroupWithUsersAndScopesResponse(
+            **record,
+            users=[
+                UserWithRoleResponse.model_construct(
+                    id=j,
+                    email=f"agent_{j}@beta.gouv.fr",
+                    role_name="utilisateur",
+                    role_id=2,
+                    is_admin=False,
+                )
+                for j in range(3)
+            ],
+        )
+        for record in fake_group_records(size)
+    ]
+
+
+def build_app(size: int) -> FastAPI:
+    app = FastAPI()
+    records = fake_group_records(size)
+    groups_with_users = fake_groups_with_users(size)
+
+    @app.get("/default/records", response_model=list[GroupWithScopesResponse])
+    async def default_records():
+        return records
+
+    @app.get("/fast/records", response_model=list[GroupWithScopesResponse])
+    async def fast_records():
+        return records_response(records, GroupWithScopesResponse)
+
+    @app.get("/default/models", response_model=list[GroupWithUsersAndScopesResponse])
+    async def default_models():
+        return groups_with_users
+
+    @app.get("/fast/models", response_model=list[GroupWithUsersAndScopesResponse])
+    async def fast_models():
+        return records_response(groups_with_users, GroupWithUsersAndScopesResponse)
+
+    return app
+
+
+async def run(size: int, iterations: int) -> None:
+    app = build_app(size)
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        for path in ["records", "models"]:
+            results = {}
+            for mode in ["default", "fast"]:
+                url = f"/{mode}/{path}"
+                # warm up
+                response = await client.get(url)
+                assert response.status_code == 200
+                assert len(response.json()) == size
+
+                start = time.perf_counter()
+                for _ in range(iterations):
+                    await client.get(url)
+                results[mode] = (time.perf_counter() - start) / iterations * 1000
+
+            print(
+                f"{path:>8} x{size}: default {results['default']:7.1f} ms | "
+                f"fast {results['fast']:7.1f} ms | "
+                f"speedup x{results['default'] / results['fast']:.1f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=10_000)
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.size, args.iterations))
@@ -0,0 +1,376 @@
+"""
+Dataset of the load tests (see benchmarks.load_test), seeded into the test database.
+
+A service provider of its own ("Load test"), with a service account, and by default 100k users,
+20k groups (each with its access for the service provider), 1M memberships and 5M audit logs.
+The rows are generated by Postgres (generate_series) : the 5M audit logs take about a minute.
+
+The dataset is seeded once : run again, the script does nothing, unless --reset. It slows down the
+integration tests (the admin logs explorer renders every audit log) : --drop removes it.
+
+Usage :
+    DB_ENV=test uv run python -m benchmarks.load_dataset [--reset] [--users 100000] ...
+    DB_ENV=test uv run python -m benchmarks.load_dataset --drop
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import time
+from contextlib import asynccontextmanager
+from uuid import UUID
+
+from databases import Database
+from itsdangerous import TimestampSigner
+
+from src.config import settings
+from src.database import database_options
+from src.model import LOG_ACTIONS, LOG_RESOURCE_TYPES
+from src.utils.security import hash_password
+
+SERVICE_PROVIDER_NAME = "Load test"
+PROCONNECT_CLIENT_ID = "load_test"
+SERVICE_ACCOUNT_NAME = "load_test"
+# test database only
+SERVICE_ACCOUNT_SECRET = "load_test_secret"
+EMAIL_DOMAIN = "load.beta.gouv.fr"
+ADMIN_EMAIL = f"admin@{EMAIL_DOMAIN}"
+
+# multiplier spreading the members of a group over the users, prime with any number of users below it
+MEMBERS_SPREAD = 1_000_003
+
+# Refreshing the effective permissions takes a lock per user : at this scale, more than the lock table holds
+# in one transaction. They are disabled while seeding, and the permissions refreshed afterwards, by batches.
+EFFECTIVE_PERMISSIONS_TRIGGERS = {
+    table: [
+        f"{table}_effective_permissions_{operation}"
+        for operation in ("insert", "update", "delete")
+    ]
+    for table in ("group_user_relations", "group_service_provider_relations")
+}
+PERMISSIONS_BATCH_SIZE = 1_000
+
+AUDIT_ACTIONS = [
+    str(LOG_ACTIONS.ADD_USER_TO_GROUP),
+    str(LOG_ACTIONS.CREATE_GROUP),
+    str(LOG_ACTIONS.UPDATE_GROUP),
+    str(LOG_ACTIONS.UPDATE_USER_ROLE),
+    str(LOG_ACTIONS.REMOVE_USER_FROM_GROUP),
+]
+
+
+def organisation_siret(n: int, first_digit: str = "9") -> str:
+    """The first digit and n on 12 digits, then the Luhn check digit of the SIRETs"""
+    prefix = f"{first_digit}{n:012d}"
+    total = 0
+    for i, char in enumerate(reversed(prefix)):
+        digit = int(char) * (2 if i % 2 == 0 else 1)
+        total += digit // 10 + digit % 10
+    return f"{prefix}{-total % 10}"
+
+
+def user_email(n: int) -> str:
+    return f"load.user.{n}@{EMAIL_DOMAIN}"
+
+
+def user_sub(n: int) -> UUID:
+    """ProConnect sub of the user n, as generated by Postgres : md5('load' || n)::uuid"""
+    return UUID(hashlib.md5(f"load{n}".encode()).hexdigest())
+
+
+def proconnect_token(n: int) -> str:
+    """Bearer token of the user n on the resource server, decoded by benchmarks.load_server"""
+    return f"load:{user_sub(n)}:{user_email(n)}"
+
+
+def admin_session_cookie() -> str:
+    """Session cookie of a super admin, as signed by the session middleware (SESSION_SECRET_KEY)"""
+    session = {
+        "user_email": ADMIN_EMAIL,
+        "user_sub": str(user_sub(0)),
+        "is_admin": True,
+        "is_super_admin": True,
+    }
+    data = base64.b64encode(json.dumps(session).encode("utf-8"))
+    return TimestampSigner(str(settings.SESSION_SECRET_KEY)).sign(data).decode("utf-8")
+
+
+async def get_service_provider_id(database: Database) -> int | None:
+    return await database.fetch_val(
+        "SELECT id FROM service_providers WHERE proconnect_client_id = :client_id",
+        {"client_id": PROCONNECT_CLIENT_ID},
+    )
+
+
+async def get_dataset_size(database: Database) -> dict[str, int]:
+    """Rows of the main tables, as estimated by Postgres (fast on millions of rows)"""
+    rows = await database.fetch_all(
+        """
+        SELECT relname, reltuples::bigint AS rows
+        FROM pg_class
+        WHERE relnamespace = CAST(:schema AS regnamespace)
+        AND relname IN ('users', 'groups', 'group_user_relations', 'audit_logs')
+        """,
+        {"schema": settings.DB_SCHEMA},
+    )
+    return {row["relname"]: row["rows"] for row in rows}
+
+
+@asynccontextmanager
+async def effective_permissions_triggers_disabled(database: Database):
+    """Within a transaction : the triggers are enabled again before it commits"""
+    for table, triggers in EFFECTIVE_PERMISSIONS_TRIGGERS.items():
+        for trigger in triggers:
+            await database.execute(f"ALTER TABLE {table} DISABLE TRIGGER {trigger}")
+    yield
+    for table, triggers in EFFECTIVE_PERMISSIONS_TRIGGERS.items():
+        for trigger in triggers:
+            await database.execute(f"ALTER TABLE {table} ENABLE TRIGGER {trigger}")
+
+
+async def refresh_effective_permissions(database: Database, email_pattern: str) -> None:
+    """Effective permissions of the users matching the email pattern, one transaction per batch"""
+    start = time.perf_counter()
+    bounds = await database.fetch_one(
+        "SELECT min(id) AS first, max(id) AS last FROM users WHERE email LIKE :pattern",
+        {"pattern": email_pattern},
+    )
+    if bounds["first"] is None:
+        return
+    for first in range(bounds["first"], bounds["last"] + 1, PERMISSIONS_BATCH_SIZE):
+        await database.execute(
+            """
+            SELECT refresh_effective_permissions(ARRAY(
+                SELECT id FROM users WHERE id BETWEEN :first AND :last AND email LIKE :pattern
+            ))
+            """,
+            {
+                "first": first,
+                "last": first + PERMISSIONS_BATCH_SIZE - 1,
+                "pattern": email_pattern,
+            },
+        )
+    print(f"  effective permissions ({time.perf_counter() - start:.1f}s)")
+
+
+async def reset(database: Database) -> None:
+    service_provider_id = await get_service_provider_id(database)
+    if service_provider_id is not None:
+        # the groups of the service provider, including those created by the load tests (DataPass webhook)
+        await database.execute(
+            """
+            DELETE FROM groups WHERE id IN (
+                SELECT group_id FROM group_service_provider_relations WHERE service_provider_id = :id
+            )
+            """,
+            {"id": service_provider_id},
+        )
+        await database.execute(
+            "DELETE FROM audit_logs WHERE service_provider_id = :id",
+            {"id": service_provider_id},
+        )
+        # service account and accesses by cascade
+        await database.execute(
+            "DELETE FROM service_providers WHERE id = :id", {"id": service_provider_id}
+        )
+    await database.execute(
+        "DELETE FROM users WHERE email LIKE :pattern", {"pattern": f"%@{EMAIL_DOMAIN}"}
+    )
+    await database.execute(
+        "DELETE FROM organisations WHERE name LIKE 'Load organisation %'"
+    )
+
+
+async def seed(
+    database: Database, users: int, groups: int, memberships: int, audit_logs: int
+) -> None:
+    members_per_group = memberships // groups
+    if members_per_group > users:
+        raise ValueError("More members per group than users")
+    sirets = [organisation_siret(n) for n in range(max(groups // 10, 1))]
+
+    async def step(description: str, query: str, values: dict | None = None):
+        start = time.perf_counter()
+        await database.execute(query, values)
+        print(f"  {description} ({time.perf_counter() - start:.1f}s)")
+
+    service_provider_id = await database.fetch_val(
+        """
+        INSERT INTO service_providers (name, url, proconnect_client_id)
+        VALUES (:name, :url, :client_id)
+        RETURNING id
+        """,
+        {
+            "name": SERVICE_PROVIDER_NAME,
+            "url": f"https://{EMAIL_DOMAIN}",
+            "client_id": PROCONNECT_CLIENT_ID,
+        },
+    )
+    service_account_id = await database.fetch_val(
+        """
+        INSERT INTO service_accounts (service_provider_id, name, hashed_password, is_active)
+        VALUES (:service_provider_id, :name, :hashed_password, true)
+        RETURNING id
+        """,
+        {
+            "service_provider_id": service_provider_id,
+            "name": SERVICE_ACCOUNT_NAME,
+            "hashed_password": hash_password(SERVICE_ACCOUNT_SECRET),
+        },
+    )
+
+    await step(
+        f"{len(sirets)} organisations",
+        """
+        INSERT INTO organisations (siret, name)
+        SELECT siret, 'Load organisation ' || (n - 1)
+        FROM unnest(CAST(:sirets AS text[])) WITH ORDINALITY AS O(siret, n)
+        ON CONFLICT (siret) DO NOTHING
+        """,
+        {"sirets": sirets},
+    )
+    await step(
+        f"{users} users",
+        """
+        INSERT INTO users (email, sub_pro_connect)
+        SELECT 'load.user.' || n || '@' || :domain, md5('load' || n)::uuid::text
+        FROM generate_series(0, :count - 1) AS n
+        """,
+        {"count": users, "domain": EMAIL_DOMAIN},
+    )
+    await step(
+        f"{groups} groups",
+        """
+        INSERT INTO groups (name, orga_id)
+        SELECT 'Load group ' || n, O.id
+        FROM generate_series(0, :count - 1) AS n
+        INNER JOIN organisations AS O ON O.siret = (CAST(:sirets AS text[]))[1 + n % :organisations]
+        """,
+        {"count": groups, "sirets": sirets, "organisations": len(sirets)},
+    )
+
+    # rank of the generated rows, to spread the memberships and the audit logs
+    await database.execute(
+        """
+        CREATE TEMPORARY TABLE load_users ON COMMIT DROP AS
+        SELECT row_number() OVER (ORDER BY id) - 1 AS n, id FROM users WHERE email LIKE :pattern
+        """,
+        {"pattern": f"load.user.%@{EMAIL_DOMAIN}"},
+    )
+    await database.execute(
+        """
+        CREATE TEMPORARY TABLE load_groups ON COMMIT DROP AS
+        SELECT row_number() OVER (ORDER BY id) - 1 AS n, id FROM groups WHERE name LIKE 'Load group %'
+        """
+    )
+    await database.execute("CREATE UNIQUE INDEX ON load_users (n)")
+    await database.execute("CREATE UNIQUE INDEX ON load_groups (n)")
+
+    await step(
+        f"{groups} accesses of the service provider",
+        """
+        INSERT INTO group_service_provider_relations
+            (service_provider_id, group_id, scopes, contract_description, contract_url)
+        SELECT :service_provider_id, G.id, 'read write', 'Load contract ' || G.n, 'https://' || :domain || '/contract/' || G.n
+        FROM load_groups AS G
+        """,
+        {"service_provider_id": service_provider_id, "domain": EMAIL_DOMAIN},
+    )
+    # the first member of every group is its admin
+    await step(
+        f"{members_per_group * groups} memberships",
+        """
+        INSERT INTO group_user_relations (group_id, user_id, role_id)
+        SELECT G.id, U.id, CASE WHEN K.k = 0 THEN 1 ELSE 2 END
+        FROM load_groups AS G
+        CROSS JOIN generate_series(0, :per_group - 1) AS K(k)
+        INNER JOIN load_users AS U ON U.n = ((G.n * :per_group + K.k) * :spread) % :users
+        """,
+        {"per_group": members_per_group, "spread": MEMBERS_SPREAD, "users": users},
+    )
+    await step(
+        f"{audit_logs} audit logs",
+        """
+        INSERT INTO audit_logs
+            (service_provider_id, service_account_id, action_type, resource_type, resource_id, new_values, created_at)
+        SELECT
+            :service_provider_id, :service_account_id,
+            (CAST(:actions AS text[]))[1 + L.n % cardinality(CAST(:actions AS text[]))],
+            :resource_type, G.id, jsonb_build_object('user_id', U.id, 'role_id', 2),
+            now() - L.n * interval '1 second'
+        FROM generate_series(0, :count - 1) AS L(n)
+        INNER JOIN load_groups AS G ON G.n = L.n % :groups
+        INNER JOIN load_users AS U ON U.n = L.n % :users
+        """,
+        {
+            "service_provider_id": service_provider_id,
+            "service_account_id": service_account_id,
+            "actions": AUDIT_ACTIONS,
+            "resource_type": str(LOG_RESOURCE_TYPES.GROUP),
+            "count": audit_logs,
+            "groups": groups,
+            "users": users,
+        },
+    )
+
+
+async def run(args) -> None:
+    if settings.DB_ENV != "test":
+        raise ValueError(
+            "DB_ENV must be set to 'test' : the dataset is seeded into the test database."
+        )
+
+    database = Database(settings.DATABASE_URL, **database_options())
+    await database.connect()
+    try:
+        async with database.connection() as connection:
+            # the generation statements run far longer than the statement timeout of the API
+            await connection.execute("SET statement_timeout = 0")
+
+            if args.reset or args.drop:
+                print("Removing the load test dataset")
+                async with connection.transaction():
+                    # the users are deleted with their effective permissions (cascade)
+                    async with effective_permissions_triggers_disabled(connection):
+                        await reset(connection)
+            if args.drop:
+                return
+
+            if await get_service_provider_id(connection) is not None:
+                print("Load test dataset already seeded (--reset to seed it again)")
+                return
+
+            print("Seeding the load test dataset")
+            start = time.perf_counter()
+            async with connection.transaction():
+                async with effective_permissions_triggers_disabled(connection):
+                    await seed(
+                        connection,
+                        args.users,
+                        args.groups,
+                        args.memberships,
+                        args.audit_logs,
+                    )
+            await refresh_effective_permissions(
+                connection, f"load.user.%@{EMAIL_DOMAIN}"
+            )
+            for table in ("users", "groups", "group_user_relations", "audit_logs"):
+                await connection.execute(f"ANALYZE {table}")
+            print(f"Seeded in {time.perf_counter() - start:.0f}s")
+    finally:
+        await database.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--reset", action="store_true")
+    parser.add_argument("--drop", action="store_true", help="only remove the dataset")
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--groups", type=int, default=20_000)
+    parser.add_argument("--memberships", type=int, default=1_000_000)
+    parser.add_argument("--audit-logs", type=int, default=5_000_000)
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
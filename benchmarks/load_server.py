@@ -0,0 +1,59 @@
+"""
+The API, served by uvicorn for the load tests (see benchmarks.load_test).
+
+The application is the real one, on the configured database, but for ProConnect : the resource server
+tokens of the load tests (load:<sub>:<email>, see benchmarks.load_dataset) are accepted without calling
+its introspection and userinfo endpoints. The admin of the load tests is a super admin.
+
+Usage :
+    DB_ENV=test uv run python -m benchmarks.load_server --port 8001 --workers 1
+"""
+
+import argparse
+
+import uvicorn
+
+from benchmarks.load_dataset import ADMIN_EMAIL, PROCONNECT_CLIENT_ID
+from src.config import settings
+from src.dependencies.auth.pro_connect import pro_connect_provider
+from src.main import app
+
+
+def decode_load_token(access_token: str) -> dict:
+    prefix, sub, email = access_token.split(":", 2)
+    if prefix != "load":
+        raise ValueError("Not a load test token")
+    return {"sub": sub, "email": email, "client_id": PROCONNECT_CLIENT_ID}
+
+
+async def introspect_token(access_token: str) -> dict:
+    return decode_load_token(access_token)
+
+
+async def userinfo(token: dict) -> dict:
+    return decode_load_token(token["access_token"])
+
+
+pro_connect_provider.introspect_token = introspect_token
+pro_connect_provider.userinfo = userinfo
+settings.SUPER_ADMIN_EMAILS = f"{settings.SUPER_ADMIN_EMAILS} {ADMIN_EMAIL}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    if args.workers > 1:
+        # the workers import the application, with ProConnect replaced, from this module
+        uvicorn.run(
+            "benchmarks.load_server:app",
+            host=args.host,
+            port=args.port,
+            workers=args.workers,
+            log_level="warning",
+        )
+    else:
+        uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
@@ -0,0 +1,407 @@
+"""
+Load tests of the main endpoints of the API, on the load test dataset (see benchmarks.load_dataset).
+
+Every scenario runs for --duration seconds with --concurrency clients sending requests one after the
+other. Latency percentiles (p50, p95, p99) and throughput are printed, and saved in a JSON file, which
+can be given as --baseline to a later run to compare them.
+
+By default the API is started by the script (see benchmarks.load_server), on the test database.
+With --base-url, an already running API is tested instead : it must serve the same database, and accept
+the resource server tokens of benchmarks.load_server.
+
+Usage :
+    DB_ENV=test uv run python -m benchmarks.load_dataset
+    DB_ENV=test uv run python -m benchmarks.load_test [--scenarios group,groups_all] [--baseline previous.json]
+"""
+
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import httpx
+from databases import Database
+
+from benchmarks.load_dataset import (
+    EMAIL_DOMAIN,
+    SERVICE_ACCOUNT_NAME,
+    SERVICE_ACCOUNT_SECRET,
+    admin_session_cookie,
+    get_dataset_size,
+    get_service_provider_id,
+    proconnect_token,
+    user_email,
+)
+from src.config import settings
+from src.database import database_options
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+# DINUM, present in the seed : the organisation of the DataPass requests is not fetched from the API
+DATAPASS_SIRET = "13002526500013"
+
+
+@dataclass
+class LoadContext:
+    service_provider_id: int
+    group_ids: list[int]
+    users: int
+    access_token: str = ""
+
+
+# ----------------
+# Scenarios : one request each
+# ----------------
+
+
+async def auth_token(client: httpx.AsyncClient, context: LoadContext, rng):
+    return await client.post(
+        "/auth/token/",
+        auth=(SERVICE_ACCOUNT_NAME, SERVICE_ACCOUNT_SECRET),
+        data={"grant_type": "client_credentials"},
+    )
+
+
+async def groups_all(client, context, rng):
+    return await client.get(
+        "/groups/all", headers={"Authorization": f"Bearer {context.access_token}"}
+    )
+
+
+async def group(client, context, rng):
+    return await client.get(
+        f"/groups/{rng.choice(context.group_ids)}",
+        headers={"Authorization": f"Bearer {context.access_token}"},
+    )
+
+
+async def resource_server_groups(client, context, rng):
+    token = proconnect_token(rng.randrange(context.users))
+    return await client.get(
+        "/resource-server/groups/", headers={"Authorization": f"Bearer {token}"}
+    )
+
+
+async def datapass_webhook(client, context, rng):
+    # a new habilitation : a group is created
+    payload = {
+        "event": "approve",
+        "fired_at": int(time.time()),
+        "model_type": "authorization_request/api_entreprise",
+        "data": {
+            "id": rng.randrange(1_000_000_000),
+            "public_id": str(uuid4()),
+            "state": "validated",
+            "form_uid": "load-test",
+            "organization": {"id": 1, "name": "DINUM", "siret": DATAPASS_SIRET},
+            "applicant": {
+                "id": 1,
+                "email": user_email(rng.randrange(context.users)),
+                "given_name": "Load",
+                "family_name": "Test",
+                "phone_number": "0000000000",
+                "job_title": "Load test",
+            },
+            "data": {"intitule": f"load test {uuid4()}", "scopes": ["read"]},
+        },
+    }
+    body = json.dumps(payload).encode("utf-8")
+    signature = hmac.new(
+        settings.DATAPASS_WEBHOOK_SECRET.encode("utf-8"), body, hashlib.sha256
+    ).hexdigest()
+    return await client.post(
+        f"/webhooks/datapass/?service_provider_id={context.service_provider_id}",
+        content=body,
+        headers={
+            "Content-Type": "application/json",
+            "X-Hub-Signature-256": f"sha256={signature}",
+            "X-App-Environment": "sandbox",
+        },
+    )
+
+
+async def admin_groups(client, context, rng):
+    return await client.get(
+        "/admin/groups/", cookies={"session": admin_session_cookie()}
+    )
+
+
+async def admin_group(client, context, rng):
+    return await client.get(
+        f"/admin/groups/{rng.choice(context.group_ids)}",
+        cookies={"session": admin_session_cookie()},
+    )
+
+
+async def admin_logs(client, context, rng):
+    return await client.get("/admin/logs/", cookies={"session": admin_session_cookie()})
+
+
+SCENARIOS = {
+    "auth_token": auth_token,
+    "groups_all": groups_all,
+    "group": group,
+    "resource_server_groups": resource_server_groups,
+    "datapass_webhook": datapass_webhook,
+    "admin_groups": admin_groups,
+    "admin_group": admin_group,
+    "admin_logs": admin_logs,
+}
+# the logs explorer is not paginated : every audit log is rendered, millions on the full dataset
+DEFAULT_SCENARIOS = [name for name in SCENARIOS if name != "admin_logs"]
+
+
+# ----------------
+# Runner
+# ----------------
+
+
+def summarize(latencies: list[float], statuses: Counter, elapsed: float) -> dict:
+    """Latencies in milliseconds : every status counts, errors (non 2xx) included"""
+    if len(latencies) > 1:
+        percentiles = statistics.quantiles(latencies, n=100, method="inclusive")
+        p50, p95, p99 = percentiles[49], percentiles[94], percentiles[98]
+    else:
+        p50 = p95 = p99 = latencies[0] if latencies else 0.0
+    return {
+        "requests": len(latencies),
+        "errors": sum(
+            count
+            for status, count in statuses.items()
+            if not (isinstance(status, int) and 200 <= status < 300)
+        ),
+        "statuses": {str(status): count for status, count in statuses.items()},
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "latency_ms": {
+            "p50": round(p50 * 1000, 2),
+            "p95": round(p95 * 1000, 2),
+            "p99": round(p99 * 1000, 2),
+            "mean": round(statistics.fmean(latencies) * 1000, 2) if latencies else 0.0,
+            "max": round(max(latencies, default=0.0) * 1000, 2),
+        },
+    }
+
+
+async def run_scenario(
+    client, scenario, context, duration: float, concurrency: int, seed: int
+) -> dict:
+    latencies: list[float] = []
+    statuses: Counter = Counter()
+    deadline = time.perf_counter() + duration
+
+    async def worker(worker_seed: int):
+        rng = random.Random(worker_seed)
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                status = (await scenario(client, context, rng)).status_code
+            except httpx.HTTPError as error:
+                status = type(error).__name__
+            latencies.append(time.perf_counter() - start)
+            statuses[status] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(seed + i) for i in range(concurrency)))
+    return summarize(latencies, statuses, time.perf_counter() - start)
+
+
+async def load_context(database: Database) -> LoadContext:
+    service_provider_id = await get_service_provider_id(database)
+    if service_provider_id is None:
+        raise SystemExit(
+            "No load test dataset : run `python -m benchmarks.load_dataset` first"
+        )
+    # the same groups on every run
+    rows = await database.fetch_all(
+        """
+        SELECT group_id FROM group_service_provider_relations
+        WHERE service_provider_id = :id
+        ORDER BY group_id
+        LIMIT 1000
+        """,
+        {"id": service_provider_id},
+    )
+    users = await database.fetch_val(
+        "SELECT count(*) FROM users WHERE email LIKE :pattern",
+        {"pattern": f"load.user.%@{EMAIL_DOMAIN}"},
+    )
+    return LoadContext(service_provider_id, [row["group_id"] for row in rows], users)
+
+
+async def wait_for_api(client: httpx.AsyncClient, timeout: float = 30) -> None:
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            if (await client.get("/health/")).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        if time.perf_counter() > deadline:
+            raise SystemExit("The API did not start")
+        await asyncio.sleep(0.2)
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: dict, baseline: dict) -> float:
+    """Print the changes from the baseline, returns the worst regression (0.1 : 10% slower)"""
+    worst = 0.0
+    print(f"\nCompared to {baseline.get('git_commit')} ({baseline.get('started_at')})")
+    for key in ("config", "dataset"):
+        if baseline.get(key) != results[key]:
+            print(f"  warning : the {key} differs from the baseline")
+    for name, scenario in results["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous or not previous["throughput_rps"]:
+            continue
+        p95_change = scenario["latency_ms"]["p95"] / previous["latency_ms"]["p95"] - 1
+        throughput_change = scenario["throughput_rps"] / previous["throughput_rps"] - 1
+        worst = max(worst, p95_change, -throughput_change)
+        print(
+            f"  {name:<24} p95 {p95_change:+7.1%} | throughput {throughput_change:+7.1%}"
+        )
+    return worst
+
+
+async def run(args) -> dict:
+    database = Database(settings.DATABASE_URL, **database_options())
+    await database.connect()
+    try:
+        context = await load_context(database)
+        dataset = await get_dataset_size(database)
+    finally:
+        await database.disconnect()
+
+    server = None
+    base_url = args.base_url
+    if base_url is None:
+        base_url = f"http://127.0.0.1:{args.port}"
+        server = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "benchmarks.load_server",
+                "--port",
+                str(args.port),
+                "--workers",
+                str(args.workers),
+            ]
+        )
+
+    scenarios = args.scenarios.split(",") if args.scenarios else DEFAULT_SCENARIOS
+    results = {
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "config": {
+            "base_url": base_url,
+            "workers": args.workers if server else None,
+            "duration_s": args.duration,
+            "concurrency": args.concurrency,
+        },
+        "dataset": dataset,
+        "scenarios": {},
+    }
+
+    try:
+        async with httpx.AsyncClient(
+            base_url=base_url,
+            timeout=30,
+            limits=httpx.Limits(max_connections=args.concurrency),
+        ) as client:
+            await wait_for_api(client)
+
+            response = await auth_token(client, context, None)
+            response.raise_for_status()
+            context.access_token = response.json()["access_token"]
+
+            for index, name in enumerate(scenarios):
+                scenario = SCENARIOS[name]
+                # warm up (caches, connections of the pool)
+                await run_scenario(
+                    client, scenario, context, args.warmup, args.concurrency, index
+                )
+                summary = await run_scenario(
+                    client,
+                    scenario,
+                    context,
+                    args.duration,
+                    args.concurrency,
+                    index * 1000,
+                )
+                results["scenarios"][name] = summary
+                latency = summary["latency_ms"]
+                print(
+                    f"{name:<24} {summary['throughput_rps']:8.1f} req/s | "
+                    f"p50 {latency['p50']:8.1f} ms | p95 {latency['p95']:8.1f} ms | "
+                    f"p99 {latency['p99']:8.1f} ms | errors {summary['errors']}"
+                )
+    finally:
+        if server is not None:
+            server.terminate()
+            try:
+                server.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                server.kill()
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--scenarios",
+        help=f"comma separated, among {', '.join(SCENARIOS)} (default: all but admin_logs)",
+    )
+    parser.add_argument(
+        "--duration", type=float, default=20, help="seconds per scenario"
+    )
+    parser.add_argument("--warmup", type=float, default=2, help="seconds per scenario")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--base-url", help="API to test, instead of starting one")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--output", help="JSON file of the results")
+    parser.add_argument("--baseline", help="JSON file of previous results, to compare")
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        help="fail if a p95 or a throughput is worse than the baseline by more than this (0.1 : 10%%)",
+    )
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"load_test_{datetime.now():%Y%m%d_%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as file:
+        json.dump(results, file, indent=2)
+    print(f"\nResults saved in {output}")
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            worst = compare(results, json.load(file))
+        if args.max_regression is not None and worst > args.max_regression:
+            print(f"Regression of {worst:.1%}, above {args.max_regression:.0%}")
+            sys.exit(1)
@@ -0,0 +1,105 @@
+"""
+Compare the previous BaseHTTPMiddleware stack with the pure ASGI middlewares
+on a `/health` route.
+
+The route returns a static payload, so that only the middleware overhead is measured
+(the real health check runs a database query).
+
+Usage :
+    uv run python -m benchmarks.middlewares
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+import sentry_sdk
+from fastapi import FastAPI, Request
+from fastapi.responses import RedirectResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.middleware.sessions import SessionMiddleware
+
+from src.middleware.force_web_auth import ForceWebAuthenticationMiddleware
+from src.middleware.sentry_context import SentryContextMiddleware
+
+
+class LegacyForceWebAuthenticationMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        path = request.url.path
+        if path.startswith("/admin") and not path.startswith("/admin/login"):
+            is_admin = request.session.get(
+                "is_admin", request.session.get("is_super_admin", False)
+            )
+            if not is_admin:
+                return RedirectResponse(url="/admin/login", status_code=302)
+        return await call_next(request)
+
+
+async def legacy_sentry_context_middleware(request: Request, call_next):
+    scope = sentry_sdk.get_current_scope()
+    scope.set_tag("endpoint", request.url.path)
+    scope.set_tag("method", request.method)
+    scope.set_context(
+        "request",
+        {
+            "url": str(request.url),
+            "method": request.method,
+            "headers": dict(request.headers),
+        },
+    )
+    return await call_next(request)
+
+
+def build_app(legacy: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/health/")
+    async def health():
+        return {"status": "healthy", "database": "connected"}
+
+    if legacy:
+        app.add_middleware(LegacyForceWebAuthenticationMiddleware)
+    else:
+        app.add_middleware(ForceWebAuthenticationMiddleware)
+    app.add_middleware(SessionMiddleware, secret_key="benchmark")
+    if legacy:
+        app.middleware("http")(legacy_sentry_context_middleware)
+    else:
+        app.add_middleware(SentryContextMiddleware)
+    return app
+
+
+async def measure(app: FastAPI, iterations: int) -> float:
+    """Requests per second on /health/"""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        # warm up
+        for _ in range(100):
+            response = await client.get("/health/")
+            assert response.status_code == 200
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            await client.get("/health/")
+        return iterations / (time.perf_counter() - start)
+
+
+async def run(iterations: int) -> None:
+    before = await measure(build_app(legacy=True), iterations)
+    after = await measure(build_app(legacy=False), iterations)
+    print(
+        f"/health x{iterations}: BaseHTTPMiddleware {before:7.0f} req/s | "
+        f"pure ASGI {after:7.0f} req/s | "
+        f"speedup x{after / before:.2f}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=5_000)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.iterations))
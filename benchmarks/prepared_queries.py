@@ -0,0 +1,68 @@
+"""
+Per-query overhead of the prepared queries (see PreparedQuery), against the same queries
+run as text through `databases`, on the configured database.
+
+Every query runs on one connection, held for the whole run : only the query itself is measured,
+not the pool.
+
+Usage :
+    DB_ENV=test uv run python -m benchmarks.prepared_queries --iterations 5000
+"""
+
+import argparse
+import asyncio
+import time
+
+from databases import Database
+
+from src.config import settings
+from src.database import DatabaseWithSchema, database_options
+from src.repositories.groups import GET_GROUP
+from src.repositories.users import GET_USER_BY_SUB
+
+# group of the seed, and a sub matching no user : the query runs the same
+QUERIES = {
+    "get_group": (GET_GROUP, {"id": 1, "service_provider_id": 1}),
+    "get_user_by_sub": (
+        GET_USER_BY_SUB,
+        {"sub_pro_connect": "00000000-0000-4000-8000-000000000000"},
+    ),
+}
+
+
+async def measure(db_session, query, values, iterations: int) -> float:
+    """Microseconds per query"""
+    for _ in range(100):
+        await db_session.fetch_one(query, values)
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await db_session.fetch_one(query, values)
+    return (time.perf_counter() - start) / iterations * 1_000_000
+
+
+async def run(iterations: int) -> None:
+    database = Database(settings.DATABASE_URL, **database_options())
+    await database.connect()
+    db_session = DatabaseWithSchema(database, settings.DB_SCHEMA)
+
+    try:
+        async with database.connection():
+            for name, (query, values) in QUERIES.items():
+                text = await measure(db_session, query.query, values, iterations)
+                prepared = await measure(db_session, query, values, iterations)
+                print(
+                    f"{name} x{iterations}: text {text:6.0f} us/query | "
+                    f"prepared {prepared:6.0f} us/query | "
+                    f"overhead saved {text - prepared:5.0f} us/query"
+                )
+    finally:
+        await database.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=5_000)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.iterations))
@@ -0,0 +1,411 @@
+"""
+Synthetic data at production scale, bulk loaded (COPY) into the local or test database, to see how the
+queries of the repositories (groups, users, admin) behave on millions of rows.
+
+The volumes are configurable, and skewed as in production :
+- group sizes follow a Pareto law (--group-skew) : a few huge groups, most with a handful of members
+- users are drawn with a Zipf law (--user-skew) : a few users in thousands of groups, most in one or none
+- organisations and service providers are drawn with a Zipf law too (ministries, popular APIs)
+- audit logs are spread over a year, on the groups in proportion to their size
+
+The rows are generated in Python from --seed (same arguments, same dataset) and streamed to Postgres
+with COPY : the default volumes (about 10M rows) load in a few minutes.
+They are tagged (emails @synthetic.beta.gouv.fr, "Synthetic ..." names) : run again, the script
+replaces them, and --drop removes them. On the test database, remove them before the integration
+tests : the admin logs explorer renders every audit log.
+
+Usage :
+    DB_ENV=local uv run python -m benchmarks.synthetic_data [--users 1000000] [--groups 200000] ...
+    DB_ENV=local uv run python -m benchmarks.synthetic_data --drop
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+from uuid import UUID
+
+from databases import Database
+
+from benchmarks.load_dataset import (
+    effective_permissions_triggers_disabled,
+    organisation_siret,
+    refresh_effective_permissions,
+)
+from src.config import settings
+from src.database import database_options
+from src.model import LOG_ACTIONS, LOG_RESOURCE_TYPES
+from src.utils.security import hash_password
+
+EMAIL_DOMAIN = "synthetic.beta.gouv.fr"
+USERS_EMAIL_PATTERN = f"synthetic.user.%@{EMAIL_DOMAIN}"
+# first digit of the SIRETs, the load test dataset uses 9
+SIRET_FIRST_DIGIT = "8"
+
+ADMIN_ROLE_ID = 1
+MEMBER_ROLE_ID = 2
+
+# API Entreprise scopes
+SCOPES = [
+    "unites_legales_etablissements",
+    "effectifs",
+    "bilans",
+    "liasses_fiscales",
+    "conformite_fiscale",
+    "conformite_sociale",
+    "attestations_sociales",
+    "certificat_qualibat",
+]
+
+# resource type, action, weight : mostly membership changes
+AUDIT_ACTIONS = [
+    (LOG_RESOURCE_TYPES.GROUP, LOG_ACTIONS.ADD_USER_TO_GROUP, 50),
+    (LOG_RESOURCE_TYPES.GROUP, LOG_ACTIONS.UPDATE_USER_ROLE, 10),
+    (LOG_RESOURCE_TYPES.GROUP, LOG_ACTIONS.REMOVE_USER_FROM_GROUP, 10),
+    (LOG_RESOURCE_TYPES.GROUP, LOG_ACTIONS.UPDATE_GROUP, 10),
+    (LOG_RESOURCE_TYPES.GROUP, LOG_ACTIONS.CREATE_GROUP, 5),
+    (LOG_RESOURCE_TYPES.USER, LOG_ACTIONS.CREATE_USER, 15),
+]
+AUDIT_LOGS_PERIOD = timedelta(days=365)
+
+
+# ----------------
+# Distributions
+# ----------------
+
+
+def zipf_cum_weights(count: int, exponent: float) -> list[float]:
+    """Cumulative weights of ranks 0..count-1, the rank r weighting 1 / (r + 1) ** exponent"""
+    return list(accumulate(1 / (rank + 1) ** exponent for rank in range(count)))
+
+
+def pareto_sizes(
+    rng: random.Random, count: int, total: int, alpha: float, maximum: int
+) -> list[int]:
+    """count sizes between 1 and maximum, summing to about total, Pareto distributed"""
+    weights = [rng.paretovariate(alpha) for _ in range(count)]
+    scale = total / sum(weights)
+    return [min(maximum, max(1, round(weight * scale))) for weight in weights]
+
+
+def distinct_choices(rng: random.Random, cum_weights: list[float], k: int) -> list[int]:
+    """k distinct ranks, drawn with the weights"""
+    population = len(cum_weights)
+    if 2 * k > population:
+        # the weights hardly matter when most of the population is drawn
+        return rng.sample(range(population), k)
+    chosen: dict[int, None] = {}
+    while len(chosen) < k:
+        for rank in rng.choices(
+            range(population), cum_weights=cum_weights, k=k - len(chosen)
+        ):
+            chosen[rank] = None
+    return list(chosen)
+
+
+# ----------------
+# Bulk load
+# ----------------
+
+
+async def copy(connection, table: str, columns: list[str], records) -> int:
+    """COPY the records (an iterable, consumed as it is sent) into the table"""
+    start = time.perf_counter()
+    status = await connection.raw_connection.copy_records_to_table(
+        table, records=records, columns=columns, schema_name=settings.DB_SCHEMA
+    )
+    rows = int(status.split()[-1])
+    elapsed = time.perf_counter() - start
+    print(f"  {rows} {table} ({elapsed:.1f}s, {rows / elapsed:,.0f} rows/s)")
+    return rows
+
+
+async def copied_ids(connection, query: str, pattern: str) -> list[int]:
+    """Ids of the copied rows, in the order of the COPY : identities are allocated in that order"""
+    rows = await connection.raw_connection.fetch(query, pattern)
+    return [row[0] for row in rows]
+
+
+async def generate(connection, args) -> None:
+    rng = random.Random(args.seed)
+    now = datetime.now(timezone.utc)
+
+    # service providers, with a service account each : the audit logs reference them
+    hashed_password = hash_password(f"synthetic_{args.seed}")
+    service_providers = []
+    for n in range(args.service_providers):
+        service_provider_id = await connection.fetch_val(
+            "INSERT INTO service_providers (name, url) VALUES (:name, :url) RETURNING id",
+            {"name": f"Synthetic provider {n}", "url": f"https://{EMAIL_DOMAIN}/{n}"},
+        )
+        service_account_id = await connection.fetch_val(
+            """
+            INSERT INTO service_accounts (service_provider_id, name, hashed_password, is_active)
+            VALUES (:service_provider_id, :name, :hashed_password, true)
+            RETURNING id
+            """,
+            {
+                "service_provider_id": service_provider_id,
+                "name": f"synthetic_{n}",
+                "hashed_password": hashed_password,
+            },
+        )
+        service_providers.append((service_provider_id, service_account_id))
+    print(f"  {len(service_providers)} service_providers")
+
+    await copy(
+        connection,
+        "organisations",
+        ["siret", "name"],
+        (
+            (organisation_siret(n, SIRET_FIRST_DIGIT), f"Synthetic organisation {n}")
+            for n in range(args.organisations)
+        ),
+    )
+    organisation_ids = await copied_ids(
+        connection,
+        "SELECT id FROM organisations WHERE name LIKE $1 ORDER BY id",
+        "Synthetic organisation %",
+    )
+
+    # about a fifth of the users never logged in with ProConnect
+    await copy(
+        connection,
+        "users",
+        ["email", "sub_pro_connect", "created_at"],
+        (
+            (
+                f"synthetic.user.{n}@{EMAIL_DOMAIN}",
+                str(UUID(int=rng.getrandbits(128), version=4))
+                if rng.random() < 0.8
+                else None,
+                now - AUDIT_LOGS_PERIOD * rng.random(),
+            )
+            for n in range(args.users)
+        ),
+    )
+    users = await connection.raw_connection.fetch(
+        "SELECT id, sub_pro_connect FROM users WHERE email LIKE $1 ORDER BY id",
+        USERS_EMAIL_PATTERN,
+    )
+    user_ids = [row[0] for row in users]
+    user_subs = [row[1] for row in users]
+
+    organisation_weights = zipf_cum_weights(len(organisation_ids), args.user_skew)
+    await copy(
+        connection,
+        "groups",
+        ["orga_id", "name", "created_at"],
+        (
+            (
+                rng.choices(organisation_ids, cum_weights=organisation_weights)[0],
+                f"Synthetic group {n}",
+                now - AUDIT_LOGS_PERIOD * rng.random(),
+            )
+            for n in range(args.groups)
+        ),
+    )
+    group_ids = await copied_ids(
+        connection,
+        "SELECT id FROM groups WHERE name LIKE $1 ORDER BY id",
+        "Synthetic group %",
+    )
+
+    # every group has an access to a service provider, a fifth to a second one
+    service_provider_weights = zipf_cum_weights(len(service_providers), 1.0)
+    group_service_providers = [
+        distinct_choices(rng, service_provider_weights, 2 if rng.random() < 0.2 else 1)
+        if len(service_providers) > 1
+        else [0]
+        for _ in group_ids
+    ]
+    await copy(
+        connection,
+        "group_service_provider_relations",
+        [
+            "service_provider_id",
+            "group_id",
+            "scopes",
+            "contract_description",
+            "contract_url",
+        ],
+        (
+            (
+                service_providers[index][0],
+                group_id,
+                " ".join(rng.sample(SCOPES, rng.randint(1, 4))),
+                f"Synthetic contract {group_id}",
+                f"https://{EMAIL_DOMAIN}/contracts/{group_id}",
+            )
+            for group_id, indexes in zip(group_ids, group_service_providers)
+            for index in indexes
+        ),
+    )
+
+    # the first member of every group is its admin
+    group_sizes = pareto_sizes(
+        rng, len(group_ids), args.memberships, args.group_skew, len(user_ids)
+    )
+    user_weights = zipf_cum_weights(len(user_ids), args.user_skew)
+    await copy(
+        connection,
+        "group_user_relations",
+        ["group_id", "user_id", "role_id"],
+        (
+            (group_id, user_ids[rank], ADMIN_ROLE_ID if k == 0 else MEMBER_ROLE_ID)
+            for group_id, size in zip(group_ids, group_sizes)
+            for k, rank in enumerate(distinct_choices(rng, user_weights, size))
+        ),
+    )
+
+    # the larger the group, the more it changes. Created in order, as the identities
+    group_weights = list(accumulate(group_sizes))
+    action_weights = list(accumulate(weight for *_, weight in AUDIT_ACTIONS))
+    first_log = now - AUDIT_LOGS_PERIOD
+
+    def audit_logs():
+        for n in range(args.audit_logs):
+            group = rng.choices(range(len(group_ids)), cum_weights=group_weights)[0]
+            service_provider_id, service_account_id = service_providers[
+                group_service_providers[group][0]
+            ]
+            resource_type, action, _ = rng.choices(
+                AUDIT_ACTIONS, cum_weights=action_weights
+            )[0]
+            user = rng.choices(range(len(user_ids)), cum_weights=user_weights)[0]
+            if resource_type == LOG_RESOURCE_TYPES.USER:
+                resource_id = user_ids[user]
+                new_values = {"email": f"synthetic.user.{user}@{EMAIL_DOMAIN}"}
+            else:
+                resource_id = group_ids[group]
+                new_values = {"user_id": user_ids[user], "role_id": MEMBER_ROLE_ID}
+            yield (
+                service_provider_id,
+                service_account_id,
+                str(action),
+                str(resource_type),
+                resource_id,
+                json.dumps(new_values),
+                user_subs[rng.randrange(len(user_subs))],
+                first_log + AUDIT_LOGS_PERIOD * n / args.audit_logs,
+            )
+
+    await copy(
+        connection,
+        "audit_logs",
+        [
+            "service_provider_id",
+            "service_account_id",
+            "action_type",
+            "resource_type",
+            "resource_id",
+            "new_values",
+            "acting_user_sub",
+            "created_at",
+        ],
+        audit_logs(),
+    )
+
+
+async def drop(connection) -> None:
+    service_provider_ids = [
+        row["id"]
+        for row in await connection.fetch_all(
+            "SELECT id FROM service_providers WHERE name LIKE 'Synthetic provider %'"
+        )
+    ]
+    # memberships and accesses by cascade
+    await connection.execute("DELETE FROM groups WHERE name LIKE 'Synthetic group %'")
+    await connection.execute(
+        "DELETE FROM audit_logs WHERE service_provider_id = ANY(:ids)",
+        {"ids": service_provider_ids},
+    )
+    # service accounts by cascade
+    await connection.execute(
+        "DELETE FROM service_providers WHERE id = ANY(:ids)",
+        {"ids": service_provider_ids},
+    )
+    # effective permissions by cascade
+    await connection.execute(
+        "DELETE FROM users WHERE email LIKE :pattern", {"pattern": USERS_EMAIL_PATTERN}
+    )
+    await connection.execute(
+        "DELETE FROM organisations WHERE name LIKE 'Synthetic organisation %'"
+    )
+
+
+async def run(args) -> None:
+    # the triggers are disabled for minutes while loading : never on a shared database (dev, prod)
+    if settings.DB_ENV not in ("local", "test"):
+        raise ValueError(
+            "DB_ENV must be set to 'local' or 'test' : synthetic data is only loaded into a disposable database."
+        )
+
+    database = Database(settings.DATABASE_URL, **database_options())
+    await database.connect()
+    try:
+        async with database.connection() as connection:
+            # the bulk loads run far longer than the statement timeout of the API
+            await connection.execute("SET statement_timeout = 0")
+
+            already_generated = await connection.fetch_val(
+                "SELECT EXISTS (SELECT 1 FROM users WHERE email LIKE :pattern)",
+                {"pattern": USERS_EMAIL_PATTERN},
+            )
+            if args.drop or already_generated:
+                print("Removing the synthetic data")
+                async with connection.transaction():
+                    async with effective_permissions_triggers_disabled(connection):
+                        await drop(connection)
+            if args.drop:
+                return
+
+            print("Generating the synthetic data")
+            start = time.perf_counter()
+            async with connection.transaction():
+                async with effective_permissions_triggers_disabled(connection):
+                    await generate(connection, args)
+            await refresh_effective_permissions(connection, USERS_EMAIL_PATTERN)
+            for table in (
+                "organisations",
+                "users",
+                "groups",
+                "group_user_relations",
+                "group_service_provider_relations",
+                "audit_logs",
+                "effective_permissions",
+            ):
+                await connection.execute(f"ANALYZE {table}")
+            print(f"Generated in {time.perf_counter() - start:.0f}s")
+    finally:
+        await database.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--drop", action="store_true", help="only remove the data")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--organisations", type=int, default=20_000)
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--groups", type=int, default=200_000)
+    parser.add_argument("--memberships", type=int, default=3_000_000)
+    parser.add_argument("--service-providers", type=int, default=20)
+    parser.add_argument("--audit-logs", type=int, default=5_000_000)
+    parser.add_argument(
+        "--group-skew",
+        type=float,
+        default=1.1,
+        help="Pareto index of the group sizes : the lower, the larger the largest groups",
+    )
+    parser.add_argument(
+        "--user-skew",
+        type=float,
+        default=0.7,
+        help="Zipf exponent of the users and organisations : the higher, the more concentrated",
+    )
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
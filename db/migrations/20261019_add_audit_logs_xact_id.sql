@@ -0,0 +1,12 @@
+\set schema_name :DB_SCHEMA
+
+-- Transaction that wrote the audit log entry, used by the change feed (GET /changes).
+-- Identity ids are allocated at insert time but become visible at commit time, so an entry with a lower id
+-- may appear after an entry with a higher id. The change feed only returns entries written by transactions
+-- older than every transaction still in progress, which makes audit_logs.id a safe monotonic cursor.
+-- Existing entries are left NULL (no table rewrite) : they are all committed.
+ALTER TABLE :schema_name.audit_logs
+ADD COLUMN xact_id xid8;
+
+ALTER TABLE :schema_name.audit_logs
+ALTER COLUMN xact_id SET DEFAULT pg_current_xact_id();
@@ -0,0 +1,75 @@
+\set schema_name :DB_SCHEMA
+
+-- Per-group version counter, used to compute ETags on group reads.
+-- It is bumped by triggers on every write that changes what a group read returns :
+-- group name, members and roles, scopes and contracts.
+ALTER TABLE :schema_name.groups
+ADD COLUMN version BIGINT NOT NULL DEFAULT 1;
+
+-- Direct updates on a group (ex: rename)
+CREATE OR REPLACE FUNCTION :schema_name.bump_group_version_on_update() RETURNS trigger AS $$
+BEGIN
+  IF NEW.version = OLD.version THEN
+    NEW.version := OLD.version + 1;
+  END IF;
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER groups_bump_version
+BEFORE UPDATE ON :schema_name.groups
+FOR EACH ROW EXECUTE FUNCTION :schema_name.bump_group_version_on_update();
+
+-- Writes on group relations (members, scopes). Statement level, so that a batch insert
+-- of N members bumps the group version once, not N times.
+CREATE OR REPLACE FUNCTION :schema_name.bump_group_version_on_relation_change() RETURNS trigger AS $$
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    EXECUTE format(
+      'UPDATE %I.groups SET version = version + 1 WHERE id IN (SELECT group_id FROM new_rows)',
+      TG_TABLE_SCHEMA
+    );
+  ELSIF TG_OP = 'UPDATE' THEN
+    EXECUTE format(
+      'UPDATE %I.groups SET version = version + 1 WHERE id IN (SELECT group_id FROM new_rows UNION SELECT group_id FROM old_rows)',
+      TG_TABLE_SCHEMA
+    );
+  ELSE
+    EXECUTE format(
+      'UPDATE %I.groups SET version = version + 1 WHERE id IN (SELECT group_id FROM old_rows)',
+      TG_TABLE_SCHEMA
+    );
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER group_user_relations_bump_version_insert
+AFTER INSERT ON :schema_name.group_user_relations
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION :schema_name.bump_group_version_on_relation_change();
+
+CREATE TRIGGER group_user_relations_bump_version_update
+AFTER UPDATE ON :schema_name.group_user_relations
+REFERENCING NEW TABLE AS new_rows OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION :schema_name.bump_group_version_on_relation_change();
+
+CREATE TRIGGER group_user_relations_bump_version_delete
+AFTER DELETE ON :schema_name.group_user_relations
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION :schema_name.bump_group_version_on_relation_change();
+
+CREATE TRIGGER group_service_provider_relations_bump_version_insert
+AFTER INSERT ON :schema_name.group_service_provider_relations
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION :schema_name.bump_group_version_on_relation_change();
+
+CREATE TRIGGER group_service_provider_relations_bump_version_update
+AFTER UPDATE ON :schema_name.group_service_provider_relations
+REFERENCING NEW TABLE AS new_rows OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION :schema_name.bump_group_version_on_relation_change();
+
+CREATE TRIGGER group_service_provider_relations_bump_version_delete
+AFTER DELETE ON :schema_name.group_service_provider_relations
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION :schema_name.bump_group_version_on_relation_change();
@@ -0,0 +1,28 @@
+\set schema_name :DB_SCHEMA
+
+-- Outbound webhooks : service providers can register an URL to be notified of changes on their groups.
+-- The secret is used to sign deliveries (HMAC SHA256), so it has to be stored in clear.
+ALTER TABLE :schema_name.service_providers
+ADD COLUMN webhook_url TEXT,
+ADD COLUMN webhook_secret TEXT;
+
+-- Delivery queue (outbox). Rows are inserted in the same transaction as the change they notify,
+-- then sent, batched by service provider, by the webhooks dispatcher.
+CREATE TABLE IF NOT EXISTS :schema_name.webhook_deliveries (
+    id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    service_provider_id INTEGER NOT NULL,
+    event_type VARCHAR(50) NOT NULL, -- LOG_ACTIONS name, ex: ADD_USER_TO_GROUP
+    group_id INTEGER NOT NULL, -- no foreign key, the group may be deleted before the delivery is sent
+    payload JSONB NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    last_error TEXT,
+    delivered_at TIMESTAMP WITH TIME ZONE,
+    failed_at TIMESTAMP WITH TIME ZONE, -- set when attempts are exhausted
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT fk_webhook_deliveries_sp_id FOREIGN KEY (service_provider_id) REFERENCES :schema_name.service_providers (id) ON DELETE CASCADE
+);
+
+-- Only pending deliveries are polled
+CREATE INDEX idx_webhook_deliveries_pending ON :schema_name.webhook_deliveries(next_attempt_at)
+WHERE delivered_at IS NULL AND failed_at IS NULL;
@@ -0,0 +1,118 @@
+\set schema_name :DB_SCHEMA
+
+-- Effective permissions of a user on a service provider : the union of the scopes of all its groups.
+-- Maintained by triggers on group_user_relations and group_service_provider_relations,
+-- so that an authorization decision is a single primary key lookup.
+CREATE TABLE IF NOT EXISTS :schema_name.effective_permissions (
+    user_id INTEGER NOT NULL,
+    service_provider_id INTEGER NOT NULL,
+    scopes TEXT[] NOT NULL DEFAULT '{}', -- parsed, deduplicated and sorted
+    group_ids INTEGER[] NOT NULL DEFAULT '{}', -- groups granting these scopes
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (user_id, service_provider_id),
+    CONSTRAINT fk_effective_permissions_user FOREIGN KEY (user_id) REFERENCES :schema_name.users (id) ON DELETE CASCADE,
+    CONSTRAINT fk_effective_permissions_sp FOREIGN KEY (service_provider_id) REFERENCES :schema_name.service_providers (id) ON DELETE CASCADE
+);
+
+-- Recompute the effective permissions of the given users.
+-- Users are locked (advisory lock, in a stable order) before their permissions are read, so that two concurrent
+-- transactions touching the same user cannot overwrite each other with a stale computation.
+-- Scopes are split on spaces and commas, as they are stored as free text in group_service_provider_relations.
+CREATE OR REPLACE FUNCTION :schema_name.refresh_effective_permissions(refreshed_user_ids INTEGER[]) RETURNS void
+SET search_path = :schema_name
+AS $$
+BEGIN
+  PERFORM pg_advisory_xact_lock(hashtext('effective_permissions'), locked_user_id)
+  FROM (SELECT DISTINCT unnest(refreshed_user_ids) AS locked_user_id ORDER BY 1) AS locked_users;
+
+  DELETE FROM effective_permissions WHERE user_id = ANY(refreshed_user_ids);
+
+  INSERT INTO effective_permissions (user_id, service_provider_id, scopes, group_ids)
+  SELECT
+    GUR.user_id,
+    GSPR.service_provider_id,
+    ARRAY(
+      SELECT DISTINCT scope
+      FROM unnest(regexp_split_to_array(string_agg(GSPR.scopes, ' '), '[[:space:],]+')) AS scope
+      WHERE scope <> ''
+      ORDER BY scope
+    ),
+    array_agg(DISTINCT GSPR.group_id ORDER BY GSPR.group_id)
+  FROM group_user_relations AS GUR
+  INNER JOIN group_service_provider_relations AS GSPR ON GSPR.group_id = GUR.group_id
+  WHERE GUR.user_id = ANY(refreshed_user_ids)
+  GROUP BY GUR.user_id, GSPR.service_provider_id;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Membership changes : refresh the users added, removed or updated
+CREATE OR REPLACE FUNCTION :schema_name.refresh_effective_permissions_on_membership_change() RETURNS trigger
+SET search_path = :schema_name
+AS $$
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    PERFORM refresh_effective_permissions(ARRAY(SELECT user_id FROM new_rows));
+  ELSIF TG_OP = 'UPDATE' THEN
+    PERFORM refresh_effective_permissions(ARRAY(SELECT user_id FROM new_rows UNION SELECT user_id FROM old_rows));
+  ELSE
+    PERFORM refresh_effective_permissions(ARRAY(SELECT user_id FROM old_rows));
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Scopes changes : refresh every member of the groups concerned
+CREATE OR REPLACE FUNCTION :schema_name.refresh_effective_permissions_on_scopes_change() RETURNS trigger
+SET search_path = :schema_name
+AS $$
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    PERFORM refresh_effective_permissions(ARRAY(
+      SELECT GUR.user_id FROM group_user_relations AS GUR WHERE GUR.group_id IN (SELECT group_id FROM new_rows)
+    ));
+  ELSIF TG_OP = 'UPDATE' THEN
+    PERFORM refresh_effective_permissions(ARRAY(
+      SELECT GUR.user_id FROM group_user_relations AS GUR
+      WHERE GUR.group_id IN (SELECT group_id FROM new_rows UNION SELECT group_id FROM old_rows)
+    ));
+  ELSE
+    PERFORM refresh_effective_permissions(ARRAY(
+      SELECT GUR.user_id FROM group_user_relations AS GUR WHERE GUR.group_id IN (SELECT group_id FROM old_rows)
+    ));
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER group_user_relations_effective_permissions_insert
+AFTER INSERT ON :schema_name.group_user_relations
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION :schema_name.refresh_effective_permissions_on_membership_change();
+
+CREATE TRIGGER group_user_relations_effective_permissions_update
+AFTER UPDATE ON :schema_name.group_user_relations
+REFERENCING NEW TABLE AS new_rows OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION :schema_name.refresh_effective_permissions_on_membership_change();
+
+CREATE TRIGGER group_user_relations_effective_permissions_delete
+AFTER DELETE ON :schema_name.group_user_relations
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION :schema_name.refresh_effective_permissions_on_membership_change();
+
+CREATE TRIGGER group_service_provider_relations_effective_permissions_insert
+AFTER INSERT ON :schema_name.group_service_provider_relations
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION :schema_name.refresh_effective_permissions_on_scopes_change();
+
+CREATE TRIGGER group_service_provider_relations_effective_permissions_update
+AFTER UPDATE ON :schema_name.group_service_provider_relations
+REFERENCING NEW TABLE AS new_rows OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION :schema_name.refresh_effective_permissions_on_scopes_change();
+
+CREATE TRIGGER group_service_provider_relations_effective_permissions_delete
+AFTER DELETE ON :schema_name.group_service_provider_relations
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION :schema_name.refresh_effective_permissions_on_scopes_change();
+
+-- Initial computation
+SELECT :schema_name.refresh_effective_permissions(ARRAY(SELECT DISTINCT user_id FROM :schema_name.group_user_relations));
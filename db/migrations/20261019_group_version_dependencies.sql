@@ -0,0 +1,69 @@
+\set schema_name :DB_SCHEMA
+
+-- A group read also returns the emails of its members, the names of their roles and the SIRET of its organisation.
+-- Writes on these columns bump the version (ETag) of the groups returning them, as writes on the group itself do.
+
+-- Member emails
+CREATE OR REPLACE FUNCTION :schema_name.bump_group_version_on_user_change() RETURNS trigger AS $$
+BEGIN
+  EXECUTE format(
+    'UPDATE %1$I.groups SET version = version + 1 WHERE id IN (
+      SELECT GUR.group_id
+      FROM new_rows AS N
+      INNER JOIN old_rows AS O ON O.id = N.id
+      INNER JOIN %1$I.group_user_relations AS GUR ON GUR.user_id = N.id
+      WHERE N.email IS DISTINCT FROM O.email
+    )',
+    TG_TABLE_SCHEMA
+  );
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER users_bump_group_version_update
+AFTER UPDATE ON :schema_name.users
+REFERENCING NEW TABLE AS new_rows OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION :schema_name.bump_group_version_on_user_change();
+
+-- Role names (and admin flag)
+CREATE OR REPLACE FUNCTION :schema_name.bump_group_version_on_role_change() RETURNS trigger AS $$
+BEGIN
+  EXECUTE format(
+    'UPDATE %1$I.groups SET version = version + 1 WHERE id IN (
+      SELECT GUR.group_id
+      FROM new_rows AS N
+      INNER JOIN old_rows AS O ON O.id = N.id
+      INNER JOIN %1$I.group_user_relations AS GUR ON GUR.role_id = N.id
+      WHERE (N.role_name, N.is_admin) IS DISTINCT FROM (O.role_name, O.is_admin)
+    )',
+    TG_TABLE_SCHEMA
+  );
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER roles_bump_group_version_update
+AFTER UPDATE ON :schema_name.roles
+REFERENCING NEW TABLE AS new_rows OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION :schema_name.bump_group_version_on_role_change();
+
+-- Organisation SIRETs
+CREATE OR REPLACE FUNCTION :schema_name.bump_group_version_on_organisation_change() RETURNS trigger AS $$
+BEGIN
+  EXECUTE format(
+    'UPDATE %1$I.groups SET version = version + 1 WHERE orga_id IN (
+      SELECT N.id
+      FROM new_rows AS N
+      INNER JOIN old_rows AS O ON O.id = N.id
+      WHERE N.siret IS DISTINCT FROM O.siret
+    )',
+    TG_TABLE_SCHEMA
+  );
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER organisations_bump_group_version_update
+AFTER UPDATE ON :schema_name.organisations
+REFERENCING NEW TABLE AS new_rows OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION :schema_name.bump_group_version_on_organisation_change();
@@ -0,0 +1,34 @@
+\set schema_name :DB_SCHEMA
+
+-- Parsed scopes : `scopes` stays the source of truth (free text, space or comma separated),
+-- `scope_list` is derived from it by Postgres on every write, and indexed for "groups with scope X" queries.
+ALTER TABLE :schema_name.group_service_provider_relations
+ADD COLUMN scope_list TEXT[] GENERATED ALWAYS AS (
+    array_remove(regexp_split_to_array(COALESCE(scopes, ''), '[[:space:],]+'), '')
+) STORED;
+
+CREATE INDEX idx_gspr_scope_list ON :schema_name.group_service_provider_relations USING GIN (scope_list);
+
+-- Effective permissions now read the parsed scopes instead of splitting the text again
+CREATE OR REPLACE FUNCTION :schema_name.refresh_effective_permissions(refreshed_user_ids INTEGER[]) RETURNS void
+SET search_path = :schema_name
+AS $$
+BEGIN
+  PERFORM pg_advisory_xact_lock(hashtext('effective_permissions'), locked_user_id)
+  FROM (SELECT DISTINCT unnest(refreshed_user_ids) AS locked_user_id ORDER BY 1) AS locked_users;
+
+  DELETE FROM effective_permissions WHERE user_id = ANY(refreshed_user_ids);
+
+  INSERT INTO effective_permissions (user_id, service_provider_id, scopes, group_ids)
+  SELECT
+    GUR.user_id,
+    GSPR.service_provider_id,
+    COALESCE(array_agg(DISTINCT S.scope ORDER BY S.scope) FILTER (WHERE S.scope IS NOT NULL), '{}'),
+    array_agg(DISTINCT GSPR.group_id ORDER BY GSPR.group_id)
+  FROM group_user_relations AS GUR
+  INNER JOIN group_service_provider_relations AS GSPR ON GSPR.group_id = GUR.group_id
+  LEFT JOIN LATERAL unnest(GSPR.scope_list) AS S(scope) ON true
+  WHERE GUR.user_id = ANY(refreshed_user_ids)
+  GROUP BY GUR.user_id, GSPR.service_provider_id;
+END;
+$$ LANGUAGE plpgsql;
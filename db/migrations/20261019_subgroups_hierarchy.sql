@@ -0,0 +1,115 @@
+\set schema_name :DB_SCHEMA
+
+-- Group hierarchy (ex: ministry -> directorates -> teams), stored in parent_child_relations.
+-- - effective members of a group : its members, and the members of all its descendants
+-- - inherited scopes of a group : the scopes of its ancestors, through edges with inherit_scopes = true
+-- Hierarchy queries are recursive CTEs over the indexes on parent_group_id and child_group_id :
+-- one query whatever the depth of the tree.
+
+-- Groups inheriting the scopes of the given groups, the given groups included
+CREATE OR REPLACE FUNCTION :schema_name.scope_inheriting_group_ids(root_group_ids INTEGER[]) RETURNS INTEGER[]
+SET search_path = :schema_name
+AS $$
+  WITH RECURSIVE inheriting AS (
+    SELECT unnest(root_group_ids) AS group_id
+    UNION
+    SELECT PCR.child_group_id
+    FROM inheriting AS I
+    INNER JOIN parent_child_relations AS PCR ON PCR.parent_group_id = I.group_id AND PCR.inherit_scopes
+  )
+  SELECT ARRAY(SELECT group_id FROM inheriting);
+$$ LANGUAGE sql STABLE;
+
+-- Effective permissions now include the scopes inherited from ancestor groups
+CREATE OR REPLACE FUNCTION :schema_name.refresh_effective_permissions(refreshed_user_ids INTEGER[]) RETURNS void
+SET search_path = :schema_name
+AS $$
+BEGIN
+  PERFORM pg_advisory_xact_lock(hashtext('effective_permissions'), locked_user_id)
+  FROM (SELECT DISTINCT unnest(refreshed_user_ids) AS locked_user_id ORDER BY 1) AS locked_users;
+
+  DELETE FROM effective_permissions WHERE user_id = ANY(refreshed_user_ids);
+
+  INSERT INTO effective_permissions (user_id, service_provider_id, scopes, group_ids)
+  WITH RECURSIVE granting AS (
+    -- groups whose scopes apply to the user : its groups, and their ancestors through inherit_scopes edges
+    SELECT GUR.user_id, GUR.group_id
+    FROM group_user_relations AS GUR
+    WHERE GUR.user_id = ANY(refreshed_user_ids)
+    UNION
+    SELECT GR.user_id, PCR.parent_group_id
+    FROM granting AS GR
+    INNER JOIN parent_child_relations AS PCR ON PCR.child_group_id = GR.group_id AND PCR.inherit_scopes
+  )
+  SELECT
+    GR.user_id,
+    GSPR.service_provider_id,
+    COALESCE(array_agg(DISTINCT S.scope ORDER BY S.scope) FILTER (WHERE S.scope IS NOT NULL), '{}'),
+    array_agg(DISTINCT GSPR.group_id ORDER BY GSPR.group_id)
+  FROM granting AS GR
+  INNER JOIN group_service_provider_relations AS GSPR ON GSPR.group_id = GR.group_id
+  LEFT JOIN LATERAL unnest(GSPR.scope_list) AS S(scope) ON true
+  GROUP BY GR.user_id, GSPR.service_provider_id;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Scopes changes : refresh the members of the groups concerned, and of the groups inheriting their scopes
+CREATE OR REPLACE FUNCTION :schema_name.refresh_effective_permissions_on_scopes_change() RETURNS trigger
+SET search_path = :schema_name
+AS $$
+DECLARE
+  changed_group_ids INTEGER[];
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    changed_group_ids := ARRAY(SELECT group_id FROM new_rows);
+  ELSIF TG_OP = 'UPDATE' THEN
+    changed_group_ids := ARRAY(SELECT group_id FROM new_rows UNION SELECT group_id FROM old_rows);
+  ELSE
+    changed_group_ids := ARRAY(SELECT group_id FROM old_rows);
+  END IF;
+
+  PERFORM refresh_effective_permissions(ARRAY(
+    SELECT GUR.user_id FROM group_user_relations AS GUR
+    WHERE GUR.group_id = ANY(scope_inheriting_group_ids(changed_group_ids))
+  ));
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Hierarchy changes : refresh the members of the child groups, and of the groups inheriting their scopes
+CREATE OR REPLACE FUNCTION :schema_name.refresh_effective_permissions_on_hierarchy_change() RETURNS trigger
+SET search_path = :schema_name
+AS $$
+DECLARE
+  changed_group_ids INTEGER[];
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    changed_group_ids := ARRAY(SELECT child_group_id FROM new_rows);
+  ELSIF TG_OP = 'UPDATE' THEN
+    changed_group_ids := ARRAY(SELECT child_group_id FROM new_rows UNION SELECT child_group_id FROM old_rows);
+  ELSE
+    changed_group_ids := ARRAY(SELECT child_group_id FROM old_rows);
+  END IF;
+
+  PERFORM refresh_effective_permissions(ARRAY(
+    SELECT GUR.user_id FROM group_user_relations AS GUR
+    WHERE GUR.group_id = ANY(scope_inheriting_group_ids(changed_group_ids))
+  ));
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER parent_child_relations_effective_permissions_insert
+AFTER INSERT ON :schema_name.parent_child_relations
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION :schema_name.refresh_effective_permissions_on_hierarchy_change();
+
+CREATE TRIGGER parent_child_relations_effective_permissions_update
+AFTER UPDATE ON :schema_name.parent_child_relations
+REFERENCING NEW TABLE AS new_rows OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION :schema_name.refresh_effective_permissions_on_hierarchy_change();
+
+CREATE TRIGGER parent_child_relations_effective_permissions_delete
+AFTER DELETE ON :schema_name.parent_child_relations
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION :schema_name.refresh_effective_permissions_on_hierarchy_change();
@@ -0,0 +1,49 @@
+\set schema_name :DB_SCHEMA
+
+-- Inherited scopes are limited to the service providers the member group is itself linked to.
+-- A service provider can only nest groups linked to it : without this restriction, nesting one of its groups
+-- under a group also linked to another service provider gave the members the scopes of the other service provider.
+CREATE OR REPLACE FUNCTION :schema_name.refresh_effective_permissions(refreshed_user_ids INTEGER[]) RETURNS void
+SET search_path = :schema_name
+AS $$
+BEGIN
+  PERFORM pg_advisory_xact_lock(hashtext('effective_permissions'), locked_user_id)
+  FROM (SELECT DISTINCT unnest(refreshed_user_ids) AS locked_user_id ORDER BY 1) AS locked_users;
+
+  DELETE FROM effective_permissions WHERE user_id = ANY(refreshed_user_ids);
+
+  INSERT INTO effective_permissions (user_id, service_provider_id, scopes, group_ids)
+  WITH RECURSIVE granting AS (
+    -- groups whose scopes apply to the user : its groups, and their ancestors through inherit_scopes edges,
+    -- along with the group the user is a member of
+    SELECT GUR.user_id, GUR.group_id AS member_group_id, GUR.group_id
+    FROM group_user_relations AS GUR
+    WHERE GUR.user_id = ANY(refreshed_user_ids)
+    UNION
+    SELECT GR.user_id, GR.member_group_id, PCR.parent_group_id
+    FROM granting AS GR
+    INNER JOIN parent_child_relations AS PCR ON PCR.child_group_id = GR.group_id AND PCR.inherit_scopes
+  )
+  SELECT
+    GR.user_id,
+    GSPR.service_provider_id,
+    COALESCE(array_agg(DISTINCT S.scope ORDER BY S.scope) FILTER (WHERE S.scope IS NOT NULL), '{}'),
+    array_agg(DISTINCT GSPR.group_id ORDER BY GSPR.group_id)
+  FROM granting AS GR
+  INNER JOIN group_service_provider_relations AS GSPR ON GSPR.group_id = GR.group_id
+  LEFT JOIN LATERAL unnest(GSPR.scope_list) AS S(scope) ON true
+  WHERE EXISTS (
+    SELECT 1 FROM group_service_provider_relations AS MGSPR
+    WHERE MGSPR.group_id = GR.member_group_id AND MGSPR.service_provider_id = GSPR.service_provider_id
+  )
+  GROUP BY GR.user_id, GSPR.service_provider_id;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Refresh the members of the groups inheriting scopes
+SELECT :schema_name.refresh_effective_permissions(ARRAY(
+  SELECT DISTINCT GUR.user_id FROM :schema_name.group_user_relations AS GUR
+  WHERE GUR.group_id = ANY(:schema_name.scope_inheriting_group_ids(ARRAY(
+    SELECT child_group_id FROM :schema_name.parent_child_relations WHERE inherit_scopes
+  )))
+));
@@ -17,6 +17,22 @@ class AppSettings(BaseSettings):
     DB_PASSWORD: str
     DB_SCHEMA: str
     DB_ENV: str
+    # Optional read replica, with the credentials of the primary (see DatabaseWithSchema.reader)
+    DB_REPLICA_HOST: str = ""
+    DB_REPLICA_PORT: int | None = None  # defaults to DB_PORT
+    # Connection pool of each worker (see src/database.py) : workers x DB_POOL_MAX_SIZE must stay below
+    # the max_connections of Postgres (or the pool_size of PgBouncer)
+    DB_POOL_MIN_SIZE: int = 5
+    DB_POOL_MAX_SIZE: int = 20
+    DB_POOL_MAX_INACTIVE_CONNECTION_LIFETIME_SECONDS: float = 60.0
+    # waiting longer for a connection fails fast with a 503
+    DB_POOL_ACQUIRE_TIMEOUT_SECONDS: float = 5.0
+    # search_path of the connections set to DB_SCHEMA, disable if set on the role (PgBouncer)
+    DB_SEARCH_PATH_ON_CONNECT: bool = True
+    # statements running longer are cancelled by Postgres, 0 to disable
+    DB_STATEMENT_TIMEOUT_MS: int = 10000
+    # prepared statements cached per connection : 0 behind PgBouncer in transaction mode
+    DB_STATEMENT_CACHE_SIZE: int = 100
 
     # Mail settings
     MAIL_HOST: str
@@ -24,6 +40,9 @@ class AppSettings(BaseSettings):
     MAIL_PASSWORD: SecretStr
     MAIL_PORT: int = 1025
     MAIL_USE_STARTTLS: bool
+    # SMTP sessions kept open by each worker (see src/repositories/email.py)
+    MAIL_POOL_SIZE: int = 4
+    MAIL_POOL_HEALTH_CHECK_AFTER_SECONDS: float = 30.0
 
     # API Authentication (for service-to-service)
     API_ALGORITHM: str = "HS256"  # HS256 is fine for API tokens
@@ -41,6 +60,31 @@ class AppSettings(BaseSettings):
     DATAPASS_WEBHOOK_SECRET: str
 
     SENTRY_DSN: str = ""  # optional
+    # HTTPExceptions sent to Sentry, as `status:sample_rate` (see src/utils/sentry.py)
+    SENTRY_HTTP_CAPTURE_POLICY: str = "5xx:1.0,401:0.1,403:0.1,4xx:0"
+    SENTRY_HTTP_CAPTURE_MAX_PER_MINUTE: int = 60
+
+    # Prometheus metrics on /metrics (see src/utils/metrics.py), protected by a bearer token if set.
+    # Required in production : without it, /metrics is disabled there
+    METRICS_TOKEN: str = ""
+    # Directory shared by the workers : if set, /metrics returns the metrics of all the workers
+    METRICS_DIR: str = ""
+    METRICS_SNAPSHOT_INTERVAL_SECONDS: float = 5.0
+    # Debug : profile the SQL statements of every request (see src/middleware/sql_profiler.py)
+    SQL_PROFILER_ENABLED: bool = False
+
+    # Outbound webhooks to service providers (see src/services/webhooks.py)
+    WEBHOOKS_DISPATCHER_ENABLED: bool = False
+    WEBHOOKS_POLL_INTERVAL_SECONDS: float = 2.0
+    WEBHOOKS_BATCH_SIZE: int = 100
+    WEBHOOKS_MAX_ATTEMPTS: int = 10
+    WEBHOOKS_TIMEOUT_SECONDS: float = 5.0
+
+    # In-process cache of roles and service providers (see src/repositories/reference_data.py)
+    REFERENCE_DATA_CACHE_TTL_SECONDS: float = 60.0
+    # In-process cache of the ProConnect sub -> email pairings (see src/repositories/users_sub.py)
+    USER_SUBS_CACHE_TTL_SECONDS: float = 300.0
+    USER_SUBS_CACHE_MAX_SIZE: int = 10000
 
     PROCONNECT_CLIENT_ID: str
     PROCONNECT_CLIENT_SECRET: str
@@ -64,6 +108,12 @@ class AppSettings(BaseSettings):
     def DATABASE_URL(self) -> str:
         return f"postgresql://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT_TEST if self.DB_ENV == 'test' else self.DB_PORT}/{self.DB_NAME}"  # type: ignore
 
+    @property
+    def DATABASE_REPLICA_URL(self) -> str:
+        if not self.DB_REPLICA_HOST:
+            return ""
+        return f"postgresql://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_REPLICA_HOST}:{self.DB_REPLICA_PORT or self.DB_PORT}/{self.DB_NAME}"  # type: ignore
+
     @property
     def IS_PRODUCTION(self) -> bool:
         return self.DB_ENV in ["prod"]
@@ -1,58 +1,315 @@
+import re
+import time
+from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 
+import asyncpg
 import databases
 
 from src.config import settings
+from src.utils.metrics import (
+    Gauge,
+    db_pool_acquire_duration,
+    db_pool_acquire_timeouts,
+    record_db_query,
+    registry,
+)
+from src.utils.sql_profiler import record_query
+
+# named parameters of the queries (:name), as parsed by the text queries of `databases` (SQLAlchemy) :
+# casts are written CAST(:name AS type), as :name::type is not a parameter
+QUERY_PARAMETER = re.compile(r"(?<![:\w\\]):(\w+)(?!:)")
+
+
+class PreparedQuery:
+    """
+    Hot query, prepared on every connection of the pools when it opens (see prepare_statements), and run
+    through asyncpg directly : no query compilation nor parameter rewriting by `databases` per call, and no
+    parse nor plan by Postgres as long as the statement stays in the statement cache of the connection.
+
+    Declared once, at import, with `prepared_query`, and run as any other query by DatabaseWithSchema
+    (execute, fetch_one, fetch_all), with the same named parameters. Its text must not depend on the
+    values (no IN list built per call : use arrays instead).
+    """
+
+    def __init__(self, name: str, query: str):
+        self.name = name
+        self.query = query
+        self.parameters: list[str] = []
+        self.sql = QUERY_PARAMETER.sub(self._positional, query)
+
+    def _positional(self, match: re.Match) -> str:
+        parameter = match.group(1)
+        if parameter not in self.parameters:
+            self.parameters.append(parameter)
+        return f"${self.parameters.index(parameter) + 1}"
+
+    def arguments(self, values: dict | None) -> list:
+        values = values or {}
+        return [values[parameter] for parameter in self.parameters]
+
+    def __str__(self) -> str:
+        return self.query
+
+
+# every prepared query, by name
+prepared_queries: dict[str, PreparedQuery] = {}
+
+
+def prepared_query(name: str, query: str) -> PreparedQuery:
+    if name in prepared_queries:
+        raise ValueError(f"Prepared query {name} is already declared")
+    prepared_queries[name] = PreparedQuery(name, query)
+    return prepared_queries[name]
 
 
-# Optimized database wrapper that sets schema once per transaction
+class Row(asyncpg.Record):
+    """Row of a prepared query, with the behaviour of the rows of `databases` : attributes, iteration on the keys."""
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    @property
+    def _mapping(self):
+        return self
+
+
+async def prepare_statements(connection) -> None:
+    """
+    `init` of the asyncpg pools : prepare every declared query on the new connection.
+
+    The statements are put in the statement cache of asyncpg, where the queries run by
+    DatabaseWithSchema find them : asyncpg PreparedStatement objects cannot outlive the
+    acquisition of the connection from the pool.
+    """
+    for query in prepared_queries.values():
+        await connection._get_statement(query.sql, None, record_class=Row)
+    # asyncpg prepares without a Sync : the server keeps the statement timeout armed until the next one, and
+    # cancels the next statement of a connection left idle longer than the timeout (or ignores its Terminate)
+    await connection.execute("SELECT 1")
+
+
+# Database session of a request. The schema is not set here : it is the search_path of every
+# connection of the pool (see database_options), so that reads need no transaction nor extra round-trip.
 class DatabaseWithSchema:
-    def __init__(self, db, schema):
+    def __init__(self, db, schema, replica=None):
         self.db = db
         self.schema = schema
+        # optional read replica, see `reader`
+        self.replica = DatabaseWithSchema(replica, schema) if replica else None
+        self.has_written = False
+
+    @property
+    def reader(self) -> "DatabaseWithSchema":
+        """
+        Session for the read-only queries that tolerate replication lag : the replica if configured,
+        until the session writes. Reads following a write are sent to the primary, so that they see it.
+        Reads guarding a write (existence checks...) must use the session itself.
+        """
+        if self.replica is None or self.has_written:
+            return self
+        return self.replica
 
     async def execute(self, query, *args, **kwargs):
-        await self._ensure_schema_set()
-        return await self.db.execute(query, *args, **kwargs)
+        return await self._run("execute", query, *args, **kwargs)
 
     async def fetch_one(self, query, *args, **kwargs):
-        await self._ensure_schema_set()
-        return await self.db.fetch_one(query, *args, **kwargs)
+        return await self._run("fetch_one", query, *args, **kwargs)
 
     async def fetch_all(self, query, *args, **kwargs):
-        await self._ensure_schema_set()
-        return await self.db.fetch_all(query, *args, **kwargs)
+        return await self._run("fetch_all", query, *args, **kwargs)
+
+    def _track_writes(self, query):
+        # anything but a SELECT (INSERT ... RETURNING, data-modifying CTEs) counts as a write
+        if not self.has_written and str(query).lstrip()[:6].upper() != "SELECT":
+            self.has_written = True
+
+    async def _run(self, operation, query, *args, **kwargs):
+        """Run a statement, recording it for the metrics and the SQL profiler."""
+        self._track_writes(query)
+        start = time.perf_counter()
+        try:
+            if isinstance(query, PreparedQuery):
+                return await self._run_prepared(operation, query, *args, **kwargs)
+            return await getattr(self.db, operation)(query, *args, **kwargs)
+        finally:
+            self._record(operation, query, start)
 
-    async def _ensure_schema_set(self):
-        # For now, set schema on each operation but this could be optimized further
-        # by tracking transaction state
-        await self.db.execute(f"SET search_path TO {self.schema}")
+    async def _run_prepared(self, operation, query: PreparedQuery, values=None):
+        arguments = query.arguments(values)
+        connection = self.db.connection()
+        async with connection, connection._query_lock:
+            raw_connection = connection.raw_connection
+            if operation == "fetch_all":
+                return await raw_connection.fetch(
+                    query.sql, *arguments, record_class=Row
+                )
+            row = await raw_connection.fetchrow(query.sql, *arguments, record_class=Row)
+        if operation == "execute":
+            # as `databases` : the first value returned, if any
+            return row[0] if row else None
+        return row
 
-    def transaction(self, **kwargs):
-        return self.db.transaction(**kwargs)
+    def _record(self, operation, query, start):
+        duration = time.perf_counter() - start
+        record_db_query(operation, duration)
+        record_query(operation, query, duration)
+
+    @asynccontextmanager
+    async def transaction(self, **kwargs):
+        """
+        Unit of work. Single statements do not need one : they run in autocommit.
+
+        A transaction opened while the task is already in one joins it instead of opening a savepoint :
+        a service operation spanning several repositories (create_group...) runs as one transaction,
+        whatever the transactions of the repositories it calls.
+        """
+        if self.db.connection()._transaction_stack:
+            yield
+            return
+
+        start = time.perf_counter()
+        transaction = await self.db.transaction(**kwargs)
+        self._record("begin", "BEGIN", start)
+        try:
+            yield
+        except BaseException:
+            start = time.perf_counter()
+            await transaction.rollback()
+            self._record("rollback", "ROLLBACK", start)
+            raise
+        start = time.perf_counter()
+        await transaction.commit()
+        self._record("commit", "COMMIT", start)
 
     # Pass through other attributes
     def __getattr__(self, name):
         return getattr(self.db, name)
 
 
+class DatabaseBusyError(Exception):
+    """No connection of the pool became available within DB_POOL_ACQUIRE_TIMEOUT_SECONDS."""
+
+
+# errors of a saturated database, answered with a 503 (see main.py)
+DATABASE_BUSY_ERRORS = (DatabaseBusyError, asyncpg.exceptions.QueryCanceledError)
+
+
+def database_options() -> dict:
+    """Options of the asyncpg pool, from the settings."""
+    # sent when connecting. Behind PgBouncer, which rejects them, set them on the role instead
+    # (ALTER ROLE ... SET search_path / statement_timeout) and disable them with DB_SEARCH_PATH_ON_CONNECT
+    # and DB_STATEMENT_TIMEOUT_MS
+    server_settings = {}
+    if settings.DB_SEARCH_PATH_ON_CONNECT:
+        server_settings["search_path"] = settings.DB_SCHEMA
+    if settings.DB_STATEMENT_TIMEOUT_MS:
+        server_settings["statement_timeout"] = str(settings.DB_STATEMENT_TIMEOUT_MS)
+
+    return {
+        "min_size": settings.DB_POOL_MIN_SIZE,
+        "max_size": settings.DB_POOL_MAX_SIZE,
+        "max_inactive_connection_lifetime": settings.DB_POOL_MAX_INACTIVE_CONNECTION_LIFETIME_SECONDS,
+        "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        "server_settings": server_settings,
+        # no statement cache (PgBouncer) : the prepared queries are parsed on every run
+        "init": prepare_statements if settings.DB_STATEMENT_CACHE_SIZE else None,
+    }
+
+
+class AcquireTimeoutPool:
+    """
+    Wraps the asyncpg pool of `databases`, which waits for a free connection without limit : under load,
+    requests would queue until the client gives up. Past `timeout`, DatabaseBusyError is raised instead
+    (a 503, see main.py), and the time spent waiting is exported for tuning the pool size.
+    """
+
+    def __init__(self, pool, timeout: float):
+        self.pool = pool
+        self.timeout = timeout
+
+    async def acquire(self):
+        start = time.perf_counter()
+        try:
+            return await self.pool.acquire(timeout=self.timeout)
+        except TimeoutError:
+            db_pool_acquire_timeouts.inc()
+            raise DatabaseBusyError(
+                f"No database connection available after {self.timeout}s"
+            ) from None
+        finally:
+            db_pool_acquire_duration.observe(time.perf_counter() - start)
+
+    # Pass through other attributes
+    def __getattr__(self, name):
+        return getattr(self.pool, name)
+
+
 # Create database instance with optimized connection pooling
-database = databases.Database(
-    settings.DATABASE_URL,
-    min_size=5,  # Keep minimum 5 connections open
-    max_size=20,  # Allow up to 20 concurrent connections
-    max_inactive_connection_lifetime=60,  # Close idle connections after 1 minute
+database = databases.Database(settings.DATABASE_URL, **database_options())
+# optional read replica, for the reads that tolerate replication lag (see DatabaseWithSchema.reader)
+replica_database = (
+    databases.Database(settings.DATABASE_REPLICA_URL, **database_options())
+    if settings.DATABASE_REPLICA_URL
+    else None
+)
+
+
+def configured_databases() -> dict[str, databases.Database]:
+    databases_by_role = {"primary": database}
+    if replica_database is not None:
+        databases_by_role["replica"] = replica_database
+    return databases_by_role
+
+
+def pool_utilisation() -> dict[tuple, float]:
+    """Connections of the pools, read when /metrics is scraped."""
+    utilisation = {}
+    for role, db in configured_databases().items():
+        pool = getattr(db._backend, "_pool", None)
+        if pool is None:
+            continue
+        size, idle = pool.get_size(), pool.get_idle_size()
+        utilisation.update(
+            {
+                (role, "max"): pool.get_max_size(),
+                (role, "open"): size,
+                (role, "in_use"): size - idle,
+                (role, "idle"): idle,
+            }
+        )
+    return utilisation
+
+
+registry.register(
+    Gauge(
+        "db_pool_connections",
+        "Connections of the database pools, by database and state.",
+        ("database", "state"),
+        callback=pool_utilisation,
+    )
 )
 
 
 async def startup():
-    if not database.is_connected:
-        await database.connect()
+    for db in configured_databases().values():
+        if not db.is_connected:
+            await db.connect()
+            db._backend._pool = AcquireTimeoutPool(
+                db._backend._pool, settings.DB_POOL_ACQUIRE_TIMEOUT_SECONDS
+            )
 
 
 async def shutdown():
-    if database.is_connected:
-        await database.disconnect()
+    for db in configured_databases().values():
+        if db.is_connected:
+            await db.disconnect()
 
 
 # Dependency to get DB connection
@@ -60,7 +317,9 @@ async def get_db() -> AsyncGenerator[DatabaseWithSchema, None]:
     await startup()
 
     # Create schema-aware database instance
-    schema_database = DatabaseWithSchema(database, settings.DB_SCHEMA)
+    schema_database = DatabaseWithSchema(
+        database, settings.DB_SCHEMA, replica=replica_database
+    )
 
     try:
         yield schema_database
@@ -17,14 +17,18 @@ from src.dependencies.email import get_email_service
 
 # Service dependencies
 from src.dependencies.services import (
+    get_changes_service,
+    get_group_hierarchy_service,
     get_groups_service,
     get_groups_service_factory,
     get_organisations_service,
+    get_permissions_service,
     get_roles_service,
     get_scopes_service,
     get_service_acounts_service,
     get_service_providers_service,
     get_users_service,
+    get_webhooks_service,
 )
 
 # Admin dependencies
@@ -47,14 +51,18 @@ __all__ = [
     # Email
     "get_email_service",
     # Services
+    "get_changes_service",
+    "get_group_hierarchy_service",
     "get_groups_service",
     "get_groups_service_factory",
     "get_organisations_service",
+    "get_permissions_service",
     "get_roles_service",
     "get_scopes_service",
     "get_service_acounts_service",
     "get_service_providers_service",
     "get_users_service",
+    "get_webhooks_service",
     # Admin
     "get_admin_read_service",
     "get_admin_write_service",
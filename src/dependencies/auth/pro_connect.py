@@ -4,6 +4,7 @@ from authlib.integrations.starlette_client.apps import StarletteOAuth2App
 from fastapi import HTTPException, status
 
 from src.config import AppSettings, settings
+from src.utils.metrics import external_request_duration
 
 
 class ProConnectOAuthProvider(OAuth):
@@ -33,9 +34,12 @@ class ProConnectOAuthProvider(OAuth):
             metadata = await self.proconnect.load_server_metadata()
             userinfo_endpoint = metadata["userinfo_endpoint"]
 
-            resp = await self.proconnect.get(
-                userinfo_endpoint, token=token, headers={"Accept": "application/jwt"}
-            )
+            async with external_request_duration.time("proconnect", "userinfo"):
+                resp = await self.proconnect.get(
+                    userinfo_endpoint,
+                    token=token,
+                    headers={"Accept": "application/jwt"},
+                )
 
             if resp.status_code != 200:
                 raise Exception(f"Failed to get userinfo: {resp.status_code}")
@@ -75,18 +79,19 @@ class ProConnectOAuthProvider(OAuth):
                     "ProConnect introspection endpoint not found in metadata"
                 )
 
-            response = await self.proconnect.post(
-                introspection_endpoint,
-                token=access_token,
-                data={
-                    "token": access_token,
-                    "token_type_hint": "access_token",
-                },
-                auth=(
-                    self.proconnect.client_id,
-                    self.proconnect.client_secret,
-                ),
-            )
+            async with external_request_duration.time("proconnect", "introspect"):
+                response = await self.proconnect.post(
+                    introspection_endpoint,
+                    token=access_token,
+                    data={
+                        "token": access_token,
+                        "token_type_hint": "access_token",
+                    },
+                    auth=(
+                        self.proconnect.client_id,
+                        self.proconnect.client_secret,
+                    ),
+                )
 
             if response.status_code != 200:
                 raise Exception(f"Token introspection failed: {response.status_code}")
@@ -1,3 +1,5 @@
+from functools import cache
+
 from src.repositories.email import EmailRepository
 from src.services.email.main import EmailService
 
@@ -6,9 +8,21 @@ from src.services.email.main import EmailService
 # =================
 
 
+@cache
+def email_service_singleton() -> EmailService:
+    """
+    The mail configuration and the Jinja environment are stateless : they are built once per process.
+    """
+    return EmailService(EmailRepository())
+
+
 async def get_email_service() -> EmailService:
     """
-    Dependency function that provides an EmailService instance.
+    Dependency function that provides the EmailService instance.
     """
-    email_repository = EmailRepository()
-    return EmailService(email_repository)
+    return email_service_singleton()
+
+
+async def close_email_connections() -> None:
+    """Shutdown event : close the SMTP sessions kept open by the email service."""
+    await email_service_singleton().email_repository.smtp_pool.close()
@@ -3,29 +3,47 @@ from fastapi import Depends
 
 from src.database import get_db
 from src.dependencies.context import get_logs_service, get_service_provider_id
-from src.dependencies.email import get_email_service
+from src.dependencies.email import email_service_singleton
+from src.repositories.changes import ChangesRepository
 from src.repositories.groups import GroupsRepository
+from src.repositories.hierarchy import GroupHierarchyRepository
 from src.repositories.organisations import OrganisationsRepository
+from src.repositories.permissions import PermissionsRepository
 from src.repositories.roles import RolesRepository
 from src.repositories.scopes import ScopesRepository
 from src.repositories.service_account import ServiceAccountRepository
 from src.repositories.service_providers import ServiceProvidersRepository
 from src.repositories.users import UsersRepository
 from src.repositories.users_in_group import UsersInGroupRepository
-from src.services.email.main import EmailService
+from src.repositories.webhooks import WebhooksRepository
+from src.services.changes import ChangesService
 from src.services.groups import GroupsService
+from src.services.hierarchy import GroupHierarchyService
 from src.services.logs import LogsService
 from src.services.organisations import OrganisationsService
+from src.services.permissions import PermissionsService
 from src.services.roles import RolesService
 from src.services.scopes import ScopesService
 from src.services.service_accounts import ServiceAccountsService
 from src.services.service_providers import ServiceProvidersService
 from src.services.users import UsersService
+from src.services.webhooks import WebhooksService
 
 # ============
 # API services
 # ============
 
+# Deliveries are enqueued with the database session of the repository that notifies them :
+# the webhooks service is stateless and shared by all requests.
+webhooks_service = WebhooksService(WebhooksRepository())
+
+
+async def get_webhooks_service() -> WebhooksService:
+    """
+    Dependency function that provides the WebhooksService instance.
+    """
+    return webhooks_service
+
 
 async def get_service_acounts_service(
     db: Database = Depends(get_db),
@@ -80,49 +98,44 @@ async def get_service_providers_service(
 async def get_scopes_service(
     db: Database = Depends(get_db),
     logs_service: LogsService = Depends(get_logs_service),
+    webhooks_service: WebhooksService = Depends(get_webhooks_service),
 ) -> ScopesService:
     """
     Dependency function that provides a ScopeService instance.
     """
-    scopes_repository = ScopesRepository(db, logs_service)
+    scopes_repository = ScopesRepository(db, logs_service, webhooks_service)
     return ScopesService(scopes_repository)
 
 
 async def get_groups_service_factory(
     db: Database = Depends(get_db),
     logs_service: LogsService = Depends(get_logs_service),
-    users_service: UsersService = Depends(get_users_service),
-    roles_service: RolesService = Depends(get_roles_service),
-    organisations_service: OrganisationsService = Depends(get_organisations_service),
-    service_provider_service: ServiceProvidersService = Depends(
-        get_service_providers_service
-    ),
-    scopes_service: ScopesService = Depends(get_scopes_service),
-    email_service: EmailService = Depends(get_email_service),
 ):
     """
     Dependency function that returns a factory function to create GroupsService instances for any service provider.
 
+    GroupsService uses almost every other service : they are built by the factory, not resolved as dependencies,
+    as they only need the database session and the logs service of the request.
+
     Returns:
         A function that takes service_provider_id and returns a GroupsService instance
     """
-    groups_repository = GroupsRepository(db, logs_service)
-    users_in_group_repository = UsersInGroupRepository(db, logs_service)
 
     def create_groups_service(
         service_provider_id: int, should_send_emails=True
     ) -> GroupsService:
         return GroupsService(
-            groups_repository,
-            users_in_group_repository,
-            users_service,
-            roles_service,
-            organisations_service,
-            service_provider_service,
-            scopes_service,
+            GroupsRepository(db, logs_service),
+            UsersInGroupRepository(db, logs_service, webhooks_service),
+            UsersService(UsersRepository(db, logs_service)),
+            RolesService(RolesRepository(db)),
+            OrganisationsService(OrganisationsRepository(db, logs_service)),
+            ServiceProvidersService(ServiceProvidersRepository(db)),
+            ScopesService(ScopesRepository(db, logs_service, webhooks_service)),
             service_provider_id,
-            email_service,
+            email_service_singleton(),
             should_send_emails=should_send_emails,
+            db_session=db,
         )
 
     return create_groups_service
@@ -141,3 +154,37 @@ async def get_groups_service(
         )
 
     return groups_service_factory(service_provider_id)
+
+
+async def get_group_hierarchy_service(
+    db: Database = Depends(get_db),
+    logs_service: LogsService = Depends(get_logs_service),
+    groups_service: GroupsService = Depends(get_groups_service),
+) -> GroupHierarchyService:
+    """
+    Dependency function that provides a GroupHierarchyService instance using the context's service_provider_id.
+    """
+    hierarchy_repository = GroupHierarchyRepository(db, logs_service)
+    return GroupHierarchyService(hierarchy_repository, groups_service)
+
+
+async def get_changes_service(
+    db: Database = Depends(get_db),
+    service_provider_id: int = Depends(get_service_provider_id),
+) -> ChangesService:
+    """
+    Dependency function that provides a ChangesService instance using the context's service_provider_id.
+    """
+    changes_repository = ChangesRepository(db)
+    return ChangesService(changes_repository, service_provider_id)
+
+
+async def get_permissions_service(
+    db: Database = Depends(get_db),
+    service_provider_id: int = Depends(get_service_provider_id),
+) -> PermissionsService:
+    """
+    Dependency function that provides a PermissionsService instance using the context's service_provider_id.
+    """
+    permissions_repository = PermissionsRepository(db)
+    return PermissionsService(permissions_repository, service_provider_id)
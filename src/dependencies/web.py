@@ -5,6 +5,7 @@ from fastapi import Depends, HTTPException, Request
 from pydantic import EmailStr
 
 from src.database import get_db
+from src.dependencies.services import webhooks_service
 from src.repositories.groups import GroupsRepository
 from src.repositories.logs import LogsRepository
 from src.repositories.admin.admin_read_repository import AdminReadRepository
@@ -105,7 +106,6 @@ async def get_admin_write_service(
         acting_user_sub = UUID(user_sub, version=4)
 
     admin_read_repository = AdminReadRepository(db, admin_email=user_email)
-    admin_write_repository = AdminWriteRepository(db, admin_email=user_email)
     logs_service = LogsService(
         LogsRepository(
             service_provider_id=0,
@@ -113,8 +113,13 @@ async def get_admin_write_service(
             acting_user_sub=acting_user_sub,
         )
     )
+    admin_write_repository = AdminWriteRepository(
+        db, admin_email=user_email, logs_service=logs_service
+    )
     groups_repository = GroupsRepository(db, logs_service)
-    users_in_group_repository = UsersInGroupRepository(db, logs_service)
+    users_in_group_repository = UsersInGroupRepository(
+        db, logs_service, webhooks_service
+    )
     users_service = UsersService(UsersRepository(db, logs_service))
     roles_service = RolesService(RolesRepository(db))
     return AdminWriteService(
@@ -56,4 +56,12 @@ api_tags_metadata = [
         "name": "Gestion des groupes par l'utilisateur",
         "description": "Permet à un utilisateur pro-connecté d’interagir avec ses groupes (resource server)",
     },
+    {
+        "name": "Permissions",
+        "description": "Permet à un fournisseur de service de connaître les droits effectifs d’un utilisateur, pour ses décisions d’autorisation",
+    },
+    {
+        "name": "Synchronisation incrémentale",
+        "description": "Permet à un fournisseur de service de synchroniser ses groupes à partir d’un curseur, sans tout relister",
+    },
 ]
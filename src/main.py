@@ -1,5 +1,4 @@
 import logging
-import re
 import traceback
 from typing import Any
 
@@ -10,17 +9,25 @@ from fastapi.openapi.utils import get_openapi
 from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
 from sentry_sdk.integrations.fastapi import FastApiIntegration
-from sentry_sdk.integrations.logging import LoggingIntegration
+from sentry_sdk.integrations.logging import LoggingIntegration, ignore_logger
 from starlette.exceptions import HTTPException as StarletteHTTPException
-from starlette.middleware.sessions import SessionMiddleware
 
 from src.config import settings
-from src.database import shutdown, startup
+from src.database import DATABASE_BUSY_ERRORS, shutdown, startup
+from src.dependencies.email import close_email_connections
 from src.documentation import api_description, api_summary, api_tags_metadata
 from src.middleware.force_web_auth import ForceWebAuthenticationMiddleware
+from src.middleware.metrics import MetricsMiddleware
+from src.middleware.sentry_context import SentryContextMiddleware
+from src.middleware.sql_profiler import SQLProfilerMiddleware
+from src.middleware.web_session import WebSessionMiddleware
+from src.repositories.reference_data import warm_reference_data_cache
 from src.routers import (
+    changes,
     groups,
     health,
+    metrics,
+    permissions,
     roles,
     users,
 )
@@ -28,6 +35,17 @@ from src.routers.auth import auth
 from src.routers.resource_server import resource_server
 from src.routers.web.admin import view as admin_home
 from src.routers.webhooks import datapass
+from src.services.cache_invalidation import (
+    start_invalidation_listener,
+    stop_invalidation_listener,
+)
+from src.services.webhooks import start_webhooks_dispatcher, stop_webhooks_dispatcher
+from src.utils.metrics import start_metrics_snapshots, stop_metrics_snapshots
+from src.utils.sentry import (
+    HttpExceptionCapturePolicy,
+    anonymize_user_emails,
+    scrub_event,
+)
 
 app = FastAPI(redirect_slashes=True, redoc_url="/")
 
@@ -39,26 +57,17 @@ app = FastAPI(redirect_slashes=True, redoc_url="/")
 app_logger = logging.getLogger("src")  # Your application namespace
 app_logger.setLevel(logging.INFO)
 
-EMAIL_ADDRESS_PATTERN = re.compile(
-    r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b"
+# HTTPExceptions are logged on their own logger : they are sent to Sentry according to the capture policy,
+# not by the logging integration
+http_exceptions_logger = logging.getLogger("src.http_exceptions")
+http_exception_capture_policy = HttpExceptionCapturePolicy(
+    settings.SENTRY_HTTP_CAPTURE_POLICY,
+    max_per_minute=settings.SENTRY_HTTP_CAPTURE_MAX_PER_MINUTE,
 )
-REDACTED_EMAIL = "[REDACTED_EMAIL]"
-
-
-def anonymize_user_emails(value: Any) -> Any:
-    if isinstance(value, str):
-        return EMAIL_ADDRESS_PATTERN.sub(REDACTED_EMAIL, value)
-    if isinstance(value, dict):
-        return {key: anonymize_user_emails(item) for key, item in value.items()}
-    if isinstance(value, list):
-        return [anonymize_user_emails(item) for item in value]
-    if isinstance(value, tuple):
-        return tuple(anonymize_user_emails(item) for item in value)
-    return value
 
 
 def sentry_before_send(event: dict[str, Any], _hint: dict[str, Any]):
-    return anonymize_user_emails(event)
+    return scrub_event(event)
 
 
 def format_anonymized_exception(exc: Exception) -> str:
@@ -105,44 +114,49 @@ if settings.SENTRY_DSN != "":
         # Before send hook to filter/modify events
         before_send=sentry_before_send,
     )
+    ignore_logger(http_exceptions_logger.name)
 
 
-@app.exception_handler(StarletteHTTPException)
-async def log_http_exception(request: Request, exc: StarletteHTTPException):
-    anonymized_exception = anonymized_http_exception(exc)
-    sentry_sdk.capture_exception(anonymized_exception)
-    app_logger.error(
+def report_http_exception(request: Request, exc: StarletteHTTPException) -> None:
+    """
+    Log an HTTPException, and send it to Sentry if the capture policy allows it.
+    The traceback is only logged for server errors : client errors (404, 403...) are expected.
+    """
+    should_capture = http_exception_capture_policy.should_capture(exc.status_code)
+    is_server_error = exc.status_code >= 500
+    exc_info = None
+
+    if should_capture or is_server_error:
+        anonymized_exception = anonymized_http_exception(exc)
+        if should_capture:
+            sentry_sdk.capture_exception(anonymized_exception)
+        if is_server_error:
+            exc_info = (
+                type(anonymized_exception),
+                anonymized_exception,
+                anonymized_exception.__traceback__,
+            )
+
+    http_exceptions_logger.error(
         "HTTPException %s on %s %s: %s",
-        anonymized_exception.status_code,
+        exc.status_code,
         request.method,
         request.url.path,
-        anonymized_exception.detail,
-        exc_info=(
-            type(anonymized_exception),
-            anonymized_exception,
-            anonymized_exception.__traceback__,
-        ),
+        anonymize_user_emails(exc.detail),
+        exc_info=exc_info,
     )
+
+
+@app.exception_handler(StarletteHTTPException)
+async def log_http_exception(request: Request, exc: StarletteHTTPException):
+    report_http_exception(request, exc)
     return await http_exception_handler(request, exc)
 
 
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     if isinstance(exc, HTTPException):
-        anonymized_exception = anonymized_http_exception(exc)
-        sentry_sdk.capture_exception(anonymized_exception)
-        app_logger.error(
-            "HTTPException %s on %s %s: %s",
-            anonymized_exception.status_code,
-            request.method,
-            request.url.path,
-            anonymized_exception.detail,
-            exc_info=(
-                type(anonymized_exception),
-                anonymized_exception,
-                anonymized_exception.__traceback__,
-            ),
-        )
+        report_http_exception(request, exc)
         raise exc
     else:
         # Non-HTTPException errors
@@ -159,6 +173,25 @@ async def global_exception_handler(request: Request, exc: Exception):
         )
 
 
+async def database_busy_handler(request: Request, exc: Exception):
+    """
+    No database connection available in time, or statement cancelled by its timeout : fail fast with a 503
+    rather than queueing more requests on a saturated database.
+    """
+    app_logger.warning(
+        "Database busy on %s %s: %s", request.method, request.url.path, exc
+    )
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Database busy, retry later"},
+        headers={"Retry-After": "1"},
+    )
+
+
+for database_busy_error in DATABASE_BUSY_ERRORS:
+    app.add_exception_handler(database_busy_error, database_busy_handler)
+
+
 # =========
 # APP SETUP
 # =========
@@ -170,9 +203,23 @@ app.mount("/static", StaticFiles(directory="static"), name="static")
 # Register startup and shutdown events (essentially DB connexion)
 app.add_event_handler("startup", startup)
 app.add_event_handler("shutdown", shutdown)
+# roles and service providers cache, once connected to the database
+app.add_event_handler("startup", warm_reference_data_cache)
+# cache invalidation events from the other workers
+app.add_event_handler("startup", start_invalidation_listener)
+app.add_event_handler("shutdown", stop_invalidation_listener)
+# pooled SMTP sessions
+app.add_event_handler("shutdown", close_email_connections)
+# outbound webhooks, only if WEBHOOKS_DISPATCHER_ENABLED
+app.add_event_handler("startup", start_webhooks_dispatcher)
+app.add_event_handler("shutdown", stop_webhooks_dispatcher)
+# metrics snapshots shared by the workers, only if METRICS_DIR
+app.add_event_handler("startup", start_metrics_snapshots)
+app.add_event_handler("shutdown", stop_metrics_snapshots)
 
 # health/monitoring
 app.include_router(health.router)
+app.include_router(metrics.router, include_in_schema=False)
 
 # authentication - both web(ProConnect) and API(OAuth2)
 app.include_router(auth.router)
@@ -182,6 +229,8 @@ app.include_router(users.router)
 app.include_router(roles.router)
 app.include_router(groups.router)
 app.include_router(resource_server.router)
+app.include_router(changes.router)
+app.include_router(permissions.router)
 
 # webhooks (Datapass)
 app.include_router(datapass.router)
@@ -199,8 +248,9 @@ app.include_router(admin_home.router, include_in_schema=False)
 # force authentication on web paths
 # NB : API router authentication is enforced through dependencies
 app.add_middleware(ForceWebAuthenticationMiddleware)
+# sessions are only used by the web paths (/admin, /auth/pro-connect)
 app.add_middleware(
-    SessionMiddleware,
+    WebSessionMiddleware,
     secret_key=settings.SESSION_SECRET_KEY,
     max_age=3600,
     same_site="lax",
@@ -208,23 +258,16 @@ app.add_middleware(
     session_cookie="session",  # Consistent cookie name
 )
 
+# tag Sentry events with the endpoint, only when Sentry is configured
+if settings.SENTRY_DSN != "":
+    app.add_middleware(SentryContextMiddleware)
 
-@app.middleware("http")
-async def sentry_context_middleware(request: Request, call_next):
-    scope = sentry_sdk.get_current_scope()
-    scope.set_tag("endpoint", request.url.path)
-    scope.set_tag("method", request.method)
-    scope.set_context(
-        "request",
-        {
-            "url": str(request.url),
-            "method": request.method,
-            "headers": dict(request.headers),
-        },
-    )
+# debug : SQL statements of every request, in the X-SQL-Profile header and the logs
+if settings.SQL_PROFILER_ENABLED:
+    app.add_middleware(SQLProfilerMiddleware)
 
-    response = await call_next(request)
-    return response
+# latency and database round-trips per route, exposed on /metrics. Added last to measure the whole stack
+app.add_middleware(MetricsMiddleware)
 
 
 def custom_openapi():
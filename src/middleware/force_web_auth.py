@@ -1,27 +1,29 @@
 from fastapi import Request
 from fastapi.responses import RedirectResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 
-class ForceWebAuthenticationMiddleware(BaseHTTPMiddleware):
+class ForceWebAuthenticationMiddleware:
     """
     Middleware to check if the user is authenticated for admin routes and redirect him otherwise
+
+    Pure ASGI middleware : requests outside /admin are passed through untouched.
     """
 
-    async def dispatch(self, request: Request, call_next):
-        # Only check admin routes
-        path = request.url.path
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        path = scope.get("path", "") if scope["type"] == "http" else ""
 
+        # Only check admin routes
         if path.startswith("/admin") and not path.startswith("/admin/login"):
-            is_admin = request.session.get(
-                "is_admin", request.session.get("is_super_admin", False)
-            )
+            session = Request(scope).session
+            is_admin = session.get("is_admin", session.get("is_super_admin", False))
 
             if not is_admin:
-                return RedirectResponse(url="/admin/login", status_code=302)
-
-            response = await call_next(request)
-            return response
+                response = RedirectResponse(url="/admin/login", status_code=302)
+                await response(scope, receive, send)
+                return
 
-        response = await call_next(request)
-        return response
+        await self.app(scope, receive, send)
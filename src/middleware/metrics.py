@@ -0,0 +1,54 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.utils.metrics import (
+    RequestStats,
+    current_request_stats,
+    db_queries_per_request,
+    http_request_duration,
+)
+
+# label of the requests that matched no API route (404, static files) : keeps the number of series bounded
+UNMATCHED_ROUTE = "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    Record the latency and the number of database round-trips of every HTTP request.
+
+    Requests are labelled with their route template (/groups/{group_id}), never with the raw path.
+    Pure ASGI middleware : the latency is measured until the response is fully sent.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            current_request_stats.reset(token)
+            # set by the FastAPI router on the scope once the request is routed
+            route = scope.get("route")
+            route_path = getattr(route, "path", UNMATCHED_ROUTE)
+            http_request_duration.observe(
+                duration, scope["method"], route_path, status_code
+            )
+            db_queries_per_request.observe(stats.db_queries, route_path)
@@ -0,0 +1,22 @@
+import sentry_sdk
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+class SentryContextMiddleware:
+    """
+    Tag Sentry events with the endpoint and method of the request.
+
+    Pure ASGI middleware : it does not wrap the response. Request headers are not copied, the FastAPI
+    integration already attaches them (without PII) to the events it sends.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            sentry_scope = sentry_sdk.get_current_scope()
+            sentry_scope.set_tag("endpoint", scope["path"])
+            sentry_scope.set_tag("method", scope["method"])
+
+        await self.app(scope, receive, send)
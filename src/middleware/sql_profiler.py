@@ -0,0 +1,58 @@
+import logging
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.utils.sql_profiler import QueryProfile, current_query_profile
+
+logger = logging.getLogger(__name__)
+
+SQL_PROFILE_HEADER = "X-SQL-Profile"
+
+
+class SQLProfilerMiddleware:
+    """
+    Debug mode (SQL_PROFILER_ENABLED) : profile the SQL statements of every request.
+
+    The summary is sent in the X-SQL-Profile response header (ex: queries=12; repeated=2; time_ms=8.4),
+    and logged. Requests running the same statement several times are logged as warnings, with every
+    statement and its caller.
+    The header holds the statements run until the response starts : for streamed responses, see the log.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = QueryProfile()
+        token = current_query_profile.set(profile)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append(
+                    SQL_PROFILE_HEADER, profile.summary()
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_query_profile.reset(token)
+            if profile.repeated_statements():
+                logger.warning(
+                    "SQL profile of %s %s: %s",
+                    scope["method"],
+                    scope["path"],
+                    profile.report(),
+                )
+            else:
+                logger.info(
+                    "SQL profile of %s %s: %s",
+                    scope["method"],
+                    scope["path"],
+                    profile.summary(),
+                )
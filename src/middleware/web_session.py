@@ -0,0 +1,31 @@
+from starlette.middleware.sessions import SessionMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+# only the web interfaces use the session cookie
+WEB_PATH_PREFIXES = ("/admin", "/auth/pro-connect")
+
+
+class WebSessionMiddleware(SessionMiddleware):
+    """
+    SessionMiddleware limited to the web paths.
+
+    API, webhook and resource server requests do not parse nor sign the session cookie, and have no `request.session`.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        path_prefixes: tuple[str, ...] = WEB_PATH_PREFIXES,
+        **kwargs,
+    ):
+        super().__init__(app, **kwargs)
+        self.path_prefixes = path_prefixes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] in ("http", "websocket") and scope["path"].startswith(
+            self.path_prefixes
+        ):
+            await super().__call__(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
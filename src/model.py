@@ -1,3 +1,4 @@
+from datetime import datetime
 from enum import Enum
 from typing import Annotated
 from xmlrpc.client import boolean
@@ -85,6 +86,10 @@ class UserWithRoleResponse(UserBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class EffectiveMemberResponse(UserWithRoleResponse):
+    group_id: int  # group the user is a direct member of
+
+
 # --- Group ---
 class GroupBase(BaseModel):
     name: str
@@ -118,6 +123,7 @@ class UserInGroupResponse(UserResponse):
 
 class GroupWithScopesResponse(GroupResponse):
     scopes: str
+    scope_list: list[str] = []  # parsed scopes
     contract_description: str | None
     contract_url: HttpUrl | None = None
 
@@ -130,6 +136,7 @@ class GroupWithUsersAndScopesResponse(GroupWithScopesResponse):
 class OrganisationGroupResponse(GroupResponse):
     organisation_siret: Siret
     scopes: str
+    scope_list: list[str] = []  # parsed scopes
     admin_emails: list[EmailStr]
 
 
@@ -147,6 +154,23 @@ class ParentChildResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class ChildGroupCreate(BaseModel):
+    child_group_id: int
+    inherit_scopes: bool = False
+
+
+class GroupDescendantResponse(GroupResponse):
+    parent_group_id: int
+    inherit_scopes: bool
+    depth: int  # 1 for direct children
+
+
+class GroupEffectiveScopesResponse(BaseModel):
+    group_id: int
+    scopes: list[str]  # own and inherited scopes
+    inherited_from: list[int]  # ancestor groups the group inherits scopes from
+
+
 # --- Role ---
 class RoleBase(BaseModel):
     role_name: str
@@ -161,7 +185,9 @@ class RoleResponse(RoleBase):
 
 # --- Service Provider & scopes ---
 class ScopeBase(BaseModel):
-    scopes: str  # Consider using list[str] if representing multiple scopes
+    scopes: str
+    # parsed scopes, see group_service_provider_relations.scope_list
+    scope_list: list[str] = []
     contract_description: str | None
     contract_url: HttpUrl | None = None
 
@@ -173,6 +199,15 @@ class ScopeResponse(ScopeBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class EffectivePermissionsResponse(BaseModel):
+    """Union of the scopes a user gets from all its groups, on a service provider."""
+
+    user_id: int
+    service_provider_id: int
+    scopes: list[str]
+    group_ids: list[int]
+
+
 class ServiceProviderBase(BaseModel):
     name: str
     url: HttpUrl | None
@@ -223,6 +258,10 @@ class LOG_ACTIONS(Enum):
     REMOVE_USER_FROM_GROUP = "User removed from group"
     UPDATE_USER_ROLE = "User role updated in group"
 
+    # Group hierarchy actions
+    ADD_CHILD_GROUP = "Child group added"
+    REMOVE_CHILD_GROUP = "Child group removed"
+
     # Organization actions
     CREATE_ORGANISATION = "Organisation created"
     UPDATE_ORGANISATION = "Organisation updated"
@@ -261,6 +300,26 @@ class LogResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+# --- Change feed ---
+
+
+class ChangeResponse(BaseModel):
+    """A change on a group of the service provider, read from the audit logs."""
+
+    cursor: int  # audit log ID
+    action_type: str  # LOG_ACTIONS name, ex: ADD_USER_TO_GROUP
+    resource_type: str  # LOG_RESOURCE_TYPES name, ex: GROUP
+    group_id: int
+    new_values: dict | None = None
+    created_at: datetime
+
+
+class ChangesResponse(BaseModel):
+    changes: list[ChangeResponse]
+    next_cursor: int
+    has_more: bool
+
+
 # --- DataPass Webhook Models ---
 
 
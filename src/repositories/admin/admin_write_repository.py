@@ -2,7 +2,15 @@
 from fastapi import HTTPException, status
 from pydantic import EmailStr
 
-from src.model import ServiceProviderResponse
+from src.model import LOG_ACTIONS, LOG_RESOURCE_TYPES, ServiceProviderResponse
+from src.repositories.reference_data import reference_data_cache
+from src.repositories.users_sub import sub_emails_cache
+from src.services.cache_invalidation import (
+    REFERENCE_DATA,
+    USER,
+    invalidation_bus,
+)
+from src.services.logs import LogsService
 from src.utils.admin_permissions import get_web_admin_permissions
 
 
@@ -14,9 +22,10 @@ class AdminWriteRepository:
     Should only be called from the web interface !
     """
 
-    def __init__(self, db_session, admin_email: EmailStr):
+    def __init__(self, db_session, admin_email: EmailStr, logs_service: LogsService):
         self.db_session = db_session
         self.admin_email = admin_email
+        self.logs_service = logs_service
 
         # extra safety check. All Admin Repositories should never be instantiated without an admin email
         if not self.admin_email or not get_web_admin_permissions(
@@ -33,22 +42,21 @@ class AdminWriteRepository:
         service_provider_id: int,
         hashed_password: str | None = None,
     ) -> None:
-        async with self.db_session.transaction():
-            query = """
-            INSERT INTO service_accounts (
-                service_provider_id,
-                name,
-                hashed_password,
-                is_active
-            )
-            VALUES (:service_provider_id, :name, :hashed_password, TRUE)
-            """
-            values = {
-                "name": client_id,
-                "service_provider_id": service_provider_id,
-                "hashed_password": hashed_password,
-            }
-            return await self.db_session.execute(query, values)
+        query = """
+        INSERT INTO service_accounts (
+            service_provider_id,
+            name,
+            hashed_password,
+            is_active
+        )
+        VALUES (:service_provider_id, :name, :hashed_password, TRUE)
+        """
+        values = {
+            "name": client_id,
+            "service_provider_id": service_provider_id,
+            "hashed_password": hashed_password,
+        }
+        return await self.db_session.execute(query, values)
 
     async def update_service_account(
         self,
@@ -57,29 +65,28 @@ class AdminWriteRepository:
         is_active: bool | None = None,
         new_hashed_password: str | None = None,
     ) -> None:
-        async with self.db_session.transaction():
-            set = []
-            values: dict[str, int | str] = {
-                "service_account_id": service_account_id,
-                "service_provider_id": service_provider_id,
-            }
-
-            if is_active is not None:
-                set.append("is_active = :is_active")
-                values["is_active"] = is_active
-
-            if new_hashed_password is not None:
-                set.append("hashed_password = :hashed_password")
-                values["hashed_password"] = new_hashed_password
-
-            await self.db_session.execute(
-                f"""
-                    UPDATE service_accounts
-                    SET {", ".join(set)}, updated_at = CURRENT_TIMESTAMP
-                    WHERE id = :service_account_id AND service_provider_id = :service_provider_id
-                    """,
-                values,
-            )
+        set = []
+        values: dict[str, int | str] = {
+            "service_account_id": service_account_id,
+            "service_provider_id": service_provider_id,
+        }
+
+        if is_active is not None:
+            set.append("is_active = :is_active")
+            values["is_active"] = is_active
+
+        if new_hashed_password is not None:
+            set.append("hashed_password = :hashed_password")
+            values["hashed_password"] = new_hashed_password
+
+        await self.db_session.execute(
+            f"""
+                UPDATE service_accounts
+                SET {", ".join(set)}, updated_at = CURRENT_TIMESTAMP
+                WHERE id = :service_account_id AND service_provider_id = :service_provider_id
+                """,
+            values,
+        )
 
     async def set_admin(
         self,
@@ -100,28 +107,52 @@ class AdminWriteRepository:
             )
 
     async def create_service_provider(
-        self, name: str, url: str, proconnect_client_id: str | None = None
+        self,
+        name: str,
+        url: str,
+        proconnect_client_id: str | None = None,
+        webhook_url: str | None = None,
+        webhook_secret: str | None = None,
     ) -> ServiceProviderResponse:
         async with self.db_session.transaction():
             query = """
-                INSERT INTO service_providers (name, url, proconnect_client_id, created_at, updated_at)
-                VALUES (:name, :url, :proconnect_client_id, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+                INSERT INTO service_providers (name, url, proconnect_client_id, webhook_url, webhook_secret, created_at, updated_at)
+                VALUES (:name, :url, :proconnect_client_id, :webhook_url, :webhook_secret, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
                 RETURNING *
             """
             values = {
                 "name": name,
                 "url": url,
                 "proconnect_client_id": proconnect_client_id,
+                "webhook_url": webhook_url,
+                "webhook_secret": webhook_secret,
             }
-            return await self.db_session.fetch_one(query, values)
+            service_provider = await self.db_session.fetch_one(query, values)
+            await invalidation_bus.publish(self.db_session, REFERENCE_DATA)
+        # other workers are notified on commit, this one right away
+        reference_data_cache.invalidate()
+        return service_provider
 
     async def update_service_provider(
-        self, id: int, name: str, url: str, proconnect_client_id: str | None = None
+        self,
+        id: int,
+        name: str,
+        url: str,
+        proconnect_client_id: str | None = None,
+        webhook_url: str | None = None,
+        webhook_secret: str | None = None,
     ) -> ServiceProviderResponse:
         async with self.db_session.transaction():
+            # the secret is kept when not given, and removed along with the webhook URL
             query = """
                 UPDATE service_providers
-                SET name=:name, url=:url, proconnect_client_id=:proconnect_client_id, updated_at= CURRENT_TIMESTAMP
+                SET name=:name, url=:url, proconnect_client_id=:proconnect_client_id,
+                    webhook_url=CAST(:webhook_url AS text),
+                    webhook_secret=CASE
+                        WHEN CAST(:webhook_url AS text) IS NULL THEN NULL
+                        ELSE COALESCE(CAST(:webhook_secret AS text), webhook_secret)
+                    END,
+                    updated_at= CURRENT_TIMESTAMP
                 WHERE service_providers.id = :id
                 RETURNING *
             """
@@ -130,8 +161,14 @@ class AdminWriteRepository:
                 "name": name,
                 "url": url,
                 "proconnect_client_id": proconnect_client_id,
+                "webhook_url": webhook_url,
+                "webhook_secret": webhook_secret,
             }
-            return await self.db_session.fetch_one(query, values)
+            service_provider = await self.db_session.fetch_one(query, values)
+            await invalidation_bus.publish(self.db_session, REFERENCE_DATA)
+        # other workers are notified on commit, this one right away
+        reference_data_cache.invalidate()
+        return service_provider
 
     async def delete_group(self, group_id: int) -> None:
         """
@@ -146,8 +183,8 @@ class AdminWriteRepository:
             )
 
             # Delete group_service_provider_relations
-            await self.db_session.execute(
-                "DELETE FROM group_service_provider_relations WHERE group_id = :group_id",
+            relations = await self.db_session.fetch_all(
+                "DELETE FROM group_service_provider_relations WHERE group_id = :group_id RETURNING service_provider_id",
                 {"group_id": group_id},
             )
 
@@ -156,6 +193,19 @@ class AdminWriteRepository:
                 "DELETE FROM groups WHERE id = :group_id", {"group_id": group_id}
             )
 
+            # the service providers the group was linked to find the deletion in their change feed
+            await self.logs_service.save(
+                action_type=LOG_ACTIONS.DELETE_GROUP,
+                resource_type=LOG_RESOURCE_TYPES.GROUP,
+                db_session=self.db_session,
+                resource_id=group_id,
+                new_values={
+                    "service_provider_ids": [
+                        relation["service_provider_id"] for relation in relations
+                    ]
+                },
+            )
+
     async def delete_user(self, user_id: int) -> None:
         """
         Delete a user and all their relationships.
@@ -163,8 +213,8 @@ class AdminWriteRepository:
         """
         async with self.db_session.transaction():
             # Delete group_user_relations first (foreign key constraint)
-            await self.db_session.execute(
-                "DELETE FROM group_user_relations WHERE user_id = :user_id",
+            memberships = await self.db_session.fetch_all(
+                "DELETE FROM group_user_relations WHERE user_id = :user_id RETURNING group_id",
                 {"user_id": user_id},
             )
 
@@ -172,3 +222,16 @@ class AdminWriteRepository:
             await self.db_session.execute(
                 "DELETE FROM users WHERE id = :user_id", {"user_id": user_id}
             )
+
+            # the members leaving the groups appear in the change feed of their service providers
+            await self.logs_service.save_many(
+                action_type=LOG_ACTIONS.REMOVE_USER_FROM_GROUP,
+                resource_type=LOG_RESOURCE_TYPES.GROUP,
+                db_session=self.db_session,
+                resource_values=[
+                    (membership["group_id"], {"user_id": user_id})
+                    for membership in memberships
+                ],
+            )
+            await invalidation_bus.publish(self.db_session, USER, user_id)
+        sub_emails_cache.clear()
@@ -0,0 +1,80 @@
+# ------- REPOSITORY FILE -------
+from src.model import LOG_RESOURCE_TYPES
+
+# keys of the entry values specific to the service provider that wrote the entry (scopes and contract of
+# its relation with the group), or listing the service providers of the group : only returned to the writer
+SERVICE_PROVIDER_KEYS = [
+    "scopes",
+    "contract_description",
+    "contract_url",
+    "service_provider_ids",
+]
+
+
+class ChangesRepository:
+    """
+    Read-only access to the audit logs, as a change feed for service providers.
+    """
+
+    def __init__(self, db_session):
+        self.db_session = db_session
+
+    async def list_since(self, service_provider_id: int, since: int, limit: int):
+        """
+        Audit log entries about the groups linked to the service provider, with an ID greater than `since`.
+
+        Entries written by the service provider itself, and the deletions of the groups it was linked to, stay in
+        the feed once the group or the relation is deleted : the group ID is then read from the entry.
+        The values specific to another service provider (see SERVICE_PROVIDER_KEYS) are removed from its entries.
+
+        Entries written by transactions that may still be in progress are held back (see audit_logs.xact_id),
+        so that a later call never returns an entry with an ID lower than the cursor already handed out.
+        """
+        query = """
+        SELECT
+            AL.id as cursor,
+            AL.action_type,
+            AL.resource_type,
+            CASE
+                WHEN AL.resource_type = :group_type THEN AL.resource_id
+                ELSE COALESCE(GSPR.group_id, CAST(AL.new_values->>'group_id' AS integer))
+            END as group_id,
+            CASE
+                WHEN AL.service_provider_id = :service_provider_id THEN AL.new_values
+                ELSE AL.new_values - CAST(:service_provider_keys AS text[])
+            END as new_values,
+            AL.created_at
+        FROM audit_logs AS AL
+        LEFT JOIN group_service_provider_relations AS GSPR
+            ON AL.resource_type = :relation_type AND GSPR.id = AL.resource_id
+        WHERE AL.id > :since
+        AND (AL.xact_id IS NULL OR AL.xact_id < pg_snapshot_xmin(pg_current_snapshot()))
+        AND AL.resource_type IN (:group_type, :relation_type)
+        AND (
+            AL.service_provider_id = :service_provider_id
+            OR GSPR.service_provider_id = :service_provider_id
+            OR (
+                AL.resource_type = :group_type
+                AND EXISTS (
+                    SELECT 1 FROM group_service_provider_relations AS L
+                    WHERE L.group_id = AL.resource_id AND L.service_provider_id = :service_provider_id
+                )
+            )
+            OR AL.new_values->'service_provider_ids' @> to_jsonb(CAST(:service_provider_id AS integer))
+        )
+        ORDER BY AL.id
+        LIMIT :limit
+        """
+        return await self.db_session.fetch_all(
+            query,
+            {
+                "service_provider_id": service_provider_id,
+                "since": since,
+                "limit": limit,
+                "service_provider_keys": SERVICE_PROVIDER_KEYS,
+                "group_type": str(LOG_RESOURCE_TYPES.GROUP),
+                "relation_type": str(
+                    LOG_RESOURCE_TYPES.GROUP_SERVICE_PROVIDER_RELATION
+                ),
+            },
+        )
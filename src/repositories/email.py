@@ -1,16 +1,105 @@
 import asyncio
+import time
+from contextlib import asynccontextmanager
+from email.message import EmailMessage
+from email.utils import formatdate, make_msgid
 from pathlib import Path
 
-from fastapi_mail import (
-    ConnectionConfig,
-    FastMail,
-    MessageSchema,
-    MessageType,
-    MultipartSubtypeEnum,
-)
+import aiosmtplib
+from fastapi_mail import ConnectionConfig
 from jinja2 import Environment, FileSystemLoader
 
 from src.config import settings
+from src.utils.metrics import emails_pending
+
+
+class SMTPConnectionPool:
+    """
+    Small pool of connected (and authenticated) SMTP sessions, shared by all the emails sent by the process.
+
+    - at most `max_size` sessions are open at once, extra senders wait for a free session
+    - a session idle for more than `health_check_after_seconds` is checked with a NOOP before reuse,
+      and replaced if the server closed it
+    - a session that failed while sending is closed, never reused
+    - nothing is sent when the configuration suppresses sending (SUPPRESS_SEND), like FastMail
+    """
+
+    def __init__(
+        self,
+        conf: ConnectionConfig,
+        max_size: int,
+        health_check_after_seconds: float,
+    ):
+        self.conf = conf
+        self.max_size = max_size
+        self.health_check_after_seconds = health_check_after_seconds
+        # (session, last used at), most recently used last
+        self.idle: list[tuple[aiosmtplib.SMTP, float]] = []
+        self.semaphore = asyncio.Semaphore(max_size)
+
+    async def connect(self) -> aiosmtplib.SMTP:
+        session = aiosmtplib.SMTP(
+            hostname=self.conf.MAIL_SERVER,
+            port=self.conf.MAIL_PORT,
+            timeout=self.conf.TIMEOUT,
+            use_tls=self.conf.MAIL_SSL_TLS,
+            start_tls=self.conf.MAIL_STARTTLS,
+            validate_certs=self.conf.VALIDATE_CERTS,
+            local_hostname=self.conf.LOCAL_HOSTNAME,
+        )
+        await session.connect()
+        if self.conf.USE_CREDENTIALS:
+            await session.login(
+                self.conf.MAIL_USERNAME, self.conf.MAIL_PASSWORD.get_secret_value()
+            )
+        return session
+
+    async def is_healthy(self, session: aiosmtplib.SMTP, last_used_at: float) -> bool:
+        if not session.is_connected:
+            return False
+        if time.monotonic() - last_used_at < self.health_check_after_seconds:
+            return True
+        try:
+            await session.noop()
+            return True
+        except aiosmtplib.SMTPException:
+            return False
+
+    async def get_session(self) -> aiosmtplib.SMTP:
+        while self.idle:
+            session, last_used_at = self.idle.pop()
+            if await self.is_healthy(session, last_used_at):
+                return session
+            self.discard(session)
+        return await self.connect()
+
+    def discard(self, session: aiosmtplib.SMTP) -> None:
+        session.close()
+
+    @asynccontextmanager
+    async def acquire(self):
+        async with self.semaphore:
+            session = await self.get_session()
+            try:
+                yield session
+            except BaseException:
+                self.discard(session)
+                raise
+            self.idle.append((session, time.monotonic()))
+
+    async def send_message(self, message: EmailMessage):
+        if self.conf.SUPPRESS_SEND:
+            return None
+        async with self.acquire() as session:
+            return await session.send_message(message)
+
+    async def close(self) -> None:
+        idle, self.idle = self.idle, []
+        for session, _ in idle:
+            try:
+                await session.quit()
+            except aiosmtplib.SMTPException:
+                self.discard(session)
 
 
 class EmailRepository:
@@ -26,7 +115,11 @@ class EmailRepository:
             USE_CREDENTIALS=settings.MAIL_USERNAME is not None,
             VALIDATE_CERTS=True,
         )
-        self.fastmail = FastMail(self.conf)
+        self.smtp_pool = SMTPConnectionPool(
+            self.conf,
+            max_size=settings.MAIL_POOL_SIZE,
+            health_check_after_seconds=settings.MAIL_POOL_HEALTH_CHECK_AFTER_SECONDS,
+        )
 
         # Setup Jinja2 for email templates
         template_dir = Path("templates/emails")
@@ -36,21 +129,30 @@ class EmailRepository:
         self.logo_ade_path = Path("static/images/logo_ade.png")
         self.logo_ade_content_id = "logo_ade"
 
-    def _get_logo_ade_attachments(self) -> list[dict]:
-        if not self.logo_ade_path.exists():
-            return []
-
-        return [
-            {
-                "file": str(self.logo_ade_path),
-                "mime_type": "image",
-                "mime_subtype": "png",
-                "headers": {
-                    "Content-ID": f"<{self.logo_ade_content_id}>",
-                    "Content-Disposition": "inline; filename=logo_ade.png",
-                },
-            }
-        ]
+    def build_message(
+        self, recipients: list[str], subject: str, html_content: str
+    ) -> EmailMessage:
+        """
+        HTML email, with the logo as an inline (multipart/related) image when it exists
+        """
+        message = EmailMessage()
+        message["Date"] = formatdate(time.time(), localtime=True)
+        message["Message-ID"] = make_msgid()
+        message["From"] = self.conf.MAIL_FROM
+        message["To"] = ", ".join(recipients)
+        message["Subject"] = subject
+        message.set_content(html_content, subtype="html")
+
+        if self.logo_ade_path.exists():
+            message.add_related(
+                self.logo_ade_path.read_bytes(),
+                maintype="image",
+                subtype="png",
+                disposition="inline",
+                filename="logo_ade.png",
+                cid=f"<{self.logo_ade_content_id}>",
+            )
+        return message
 
     async def send(
         self,
@@ -70,20 +172,18 @@ class EmailRepository:
             else None,
         )
 
-        message = MessageSchema(
-            subject=subject,
-            recipients=recipients,
-            body=html_content,
-            subtype=MessageType.html,
-            multipart_subtype=MultipartSubtypeEnum.related,
-            attachments=self._get_logo_ade_attachments(),
-        )
+        message = self.build_message(recipients, subject, html_content)
 
-        for attempt in range(retry):
-            try:
-                return await self.fastmail.send_message(message)
-            except Exception as e:
-                if attempt < retry - 1:
-                    await asyncio.sleep(retry_delay)
-                else:
-                    raise e
+        # queued until sent, retries included
+        emails_pending.inc()
+        try:
+            for attempt in range(retry):
+                try:
+                    return await self.smtp_pool.send_message(message)
+                except Exception as e:
+                    if attempt < retry - 1:
+                        await asyncio.sleep(retry_delay)
+                    else:
+                        raise e
+        finally:
+            emails_pending.dec()
@@ -1,4 +1,7 @@
 # ------- REPOSITORY FILE -------
+from pydantic import UUID4
+
+from src.database import prepared_query
 from src.model import (
     LOG_ACTIONS,
     LOG_RESOURCE_TYPES,
@@ -10,6 +13,17 @@ from src.model import (
 )
 from src.services.logs import LogsService
 
+GET_GROUP = prepared_query(
+    "get_group",
+    """
+    SELECT G.id, G.name, organisations.siret as organisation_siret
+    FROM groups as G
+    INNER JOIN organisations ON organisations.id = G.orga_id
+    INNER JOIN group_service_provider_relations AS GSPR ON GSPR.group_id = G.id AND  GSPR.service_provider_id = :service_provider_id
+    WHERE G.id = :id
+    """,
+)
+
 
 class GroupsRepository:
     def __init__(self, db_session, logs_service: LogsService):
@@ -19,120 +33,206 @@ class GroupsRepository:
     async def get(
         self, group_id: int, service_provider_id: int
     ) -> GroupWithUsersAndScopesResponse | None:
-        async with self.db_session.transaction():
-            query = """
-            SELECT G.id, G.name, organisations.siret as organisation_siret
-            FROM groups as G
-            INNER JOIN organisations ON organisations.id = G.orga_id
-            INNER JOIN group_service_provider_relations AS GSPR ON GSPR.group_id = G.id AND  GSPR.service_provider_id = :service_provider_id
-            WHERE G.id = :id
-            """
-            return await self.db_session.fetch_one(
-                query, {"id": group_id, "service_provider_id": service_provider_id}
-            )
+        return await self.db_session.fetch_one(
+            GET_GROUP, {"id": group_id, "service_provider_id": service_provider_id}
+        )
 
     async def get_all(self, service_provider_id: int) -> list[GroupWithScopesResponse]:
-        async with self.db_session.transaction():
-            query = """
-            SELECT G.id, G.name, O.siret as organisation_siret, GSPR.scopes, GSPR.contract_description, GSPR.contract_url
-            FROM groups as G
-            INNER JOIN organisations AS O ON G.orga_id = O.id
-            INNER JOIN group_service_provider_relations AS GSPR ON GSPR.group_id = G.id AND GSPR.service_provider_id = :service_provider_id
-            ORDER BY G.id
-            """
-            return await self.db_session.fetch_all(
-                query,
-                {
-                    "service_provider_id": service_provider_id,
-                },
-            )
+        db_session = self.db_session.reader
+        query = """
+        SELECT G.id, G.name, O.siret as organisation_siret, GSPR.scopes, GSPR.scope_list, GSPR.contract_description, GSPR.contract_url
+        FROM groups as G
+        INNER JOIN organisations AS O ON G.orga_id = O.id
+        INNER JOIN group_service_provider_relations AS GSPR ON GSPR.group_id = G.id AND GSPR.service_provider_id = :service_provider_id
+        ORDER BY G.id
+        """
+        return await db_session.fetch_all(
+            query,
+            {
+                "service_provider_id": service_provider_id,
+            },
+        )
 
-    async def search_by_user(
-        self, user_id: int, service_provider_id: int
-    ) -> list[GroupWithUsersAndScopesResponse]:
-        async with self.db_session.transaction():
-            query = """
-            SELECT G.id, G.name, O.siret as organisation_siret, GSPR.scopes, GSPR.contract_description, GSPR.contract_url
-            FROM groups as G
-            INNER JOIN organisations AS O ON G.orga_id = O.id
-            INNER JOIN group_user_relations AS GUR ON GUR.group_id = G.id
-            INNER JOIN users AS U ON U.id = GUR.user_id
+    async def get_version(self, group_id: int, service_provider_id: int) -> int | None:
+        """
+        Version of the group, bumped by triggers on every write of the group, its scopes, its members,
+        and of the member emails, role names and organisation SIRET the group read returns.
+        """
+        query = """
+        SELECT G.version
+        FROM groups as G
+        INNER JOIN group_service_provider_relations AS GSPR ON GSPR.group_id = G.id AND GSPR.service_provider_id = :service_provider_id
+        WHERE G.id = :id
+        """
+        row = await self.db_session.fetch_one(
+            query, {"id": group_id, "service_provider_id": service_provider_id}
+        )
+        return row["version"] if row else None
+
+    async def get_all_versions_digest(self, service_provider_id: int) -> str:
+        """
+        Digest of the (id, version) pairs of every group linked to the service provider.
+        Changes whenever a group is added, removed or modified.
+        """
+        query = """
+        SELECT md5(COALESCE(string_agg(G.id || ':' || G.version, ',' ORDER BY G.id), '')) as digest
+        FROM groups as G
+        INNER JOIN group_service_provider_relations AS GSPR ON GSPR.group_id = G.id AND GSPR.service_provider_id = :service_provider_id
+        """
+        row = await self.db_session.fetch_one(
+            query, {"service_provider_id": service_provider_id}
+        )
+        return row["digest"]
+
+    async def search_by_user_sub_with_users(
+        self, user_sub: UUID4, service_provider_id: int
+    ) -> list[dict]:
+        """
+        Groups of a user (identified by its ProConnect sub) along with their members, in a single query.
+
+        Members are aggregated by Postgres with json_agg. The acting user is always returned, so that
+        an unknown sub yields no rows, and a known user without any group yields a single row with a NULL group id.
+        """
+        db_session = self.db_session.reader
+        query = """
+        SELECT
+            AU.id as acting_user_id,
+            G.id,
+            G.name,
+            O.siret as organisation_siret,
+            GSPR.scopes,
+            GSPR.scope_list,
+            GSPR.contract_description,
+            GSPR.contract_url,
+            MEMBERS.users
+        FROM users AS AU
+        LEFT JOIN (
+            group_user_relations AS AGUR
+            INNER JOIN groups AS G ON G.id = AGUR.group_id
+            INNER JOIN organisations AS O ON O.id = G.orga_id
             INNER JOIN group_service_provider_relations AS GSPR ON GSPR.group_id = G.id AND GSPR.service_provider_id = :service_provider_id
-            WHERE U.id = :user_id
-            ORDER BY G.id
-            """
-            return await self.db_session.fetch_all(
-                query,
-                {
-                    "user_id": user_id,
-                    "service_provider_id": service_provider_id,
-                },
-            )
+        ) ON AGUR.user_id = AU.id
+        LEFT JOIN LATERAL (
+            SELECT json_agg(
+                json_build_object(
+                    'id', U.id,
+                    'email', U.email,
+                    'role_name', R.role_name,
+                    'role_id', R.id,
+                    'is_admin', R.is_admin
+                )
+                ORDER BY R.id ASC, U.id ASC
+            ) AS users
+            FROM group_user_relations AS GUR
+            INNER JOIN users AS U ON U.id = GUR.user_id
+            INNER JOIN roles AS R ON R.id = GUR.role_id
+            WHERE GUR.group_id = G.id
+        ) AS MEMBERS ON true
+        WHERE AU.sub_pro_connect = :sub_pro_connect
+        ORDER BY G.id
+        """
+        return await db_session.fetch_all(
+            query,
+            {
+                "sub_pro_connect": str(user_sub),
+                "service_provider_id": service_provider_id,
+            },
+        )
 
     async def search_by_contract(
         self, contract_description: str, service_provider_id: int
     ) -> list[GroupResponse]:
-        async with self.db_session.transaction():
-            query = """
-            SELECT G.id, G.name, O.siret as organisation_siret, GSPR.scopes, GSPR.contract_description, GSPR.contract_url
-            FROM groups as G
-            INNER JOIN organisations AS O ON G.orga_id = O.id
-            INNER JOIN group_service_provider_relations AS GSPR ON GSPR.group_id = G.id AND GSPR.service_provider_id = :service_provider_id
-            WHERE GSPR.contract_description = :contract_description
-            ORDER BY G.id
-            """
-            return await self.db_session.fetch_all(
-                query,
-                {
-                    "contract_description": contract_description,
-                    "service_provider_id": service_provider_id,
-                },
-            )
+        # read on the primary : DataPass looks the contract group up before creating it, a lagging replica
+        # would create it twice
+        query = """
+        SELECT G.id, G.name, O.siret as organisation_siret, GSPR.scopes, GSPR.scope_list, GSPR.contract_description, GSPR.contract_url
+        FROM groups as G
+        INNER JOIN organisations AS O ON G.orga_id = O.id
+        INNER JOIN group_service_provider_relations AS GSPR ON GSPR.group_id = G.id AND GSPR.service_provider_id = :service_provider_id
+        WHERE GSPR.contract_description = :contract_description
+        ORDER BY G.id
+        """
+        return await self.db_session.fetch_all(
+            query,
+            {
+                "contract_description": contract_description,
+                "service_provider_id": service_provider_id,
+            },
+        )
+
+    async def search_by_scope(
+        self, scope: str, service_provider_id: int
+    ) -> list[GroupWithScopesResponse]:
+        """
+        Groups having `scope` on the service provider. Uses the GIN index on scope_list.
+        """
+        db_session = self.db_session.reader
+        query = """
+        SELECT G.id, G.name, O.siret as organisation_siret, GSPR.scopes, GSPR.scope_list, GSPR.contract_description, GSPR.contract_url
+        FROM groups as G
+        INNER JOIN organisations AS O ON G.orga_id = O.id
+        INNER JOIN group_service_provider_relations AS GSPR ON GSPR.group_id = G.id AND GSPR.service_provider_id = :service_provider_id
+        WHERE GSPR.scope_list @> ARRAY[CAST(:scope AS TEXT)]
+        ORDER BY G.id
+        """
+        return await db_session.fetch_all(
+            query,
+            {
+                "scope": scope,
+                "service_provider_id": service_provider_id,
+            },
+        )
 
     async def search_by_organisation_siret(
         self, siret: Siret, service_provider_id: int
     ):
-        async with self.db_session.transaction():
-            query = """
-            SELECT
-                G.id,
-                G.name,
-                O.siret as organisation_siret,
-                GSPR.scopes,
-                ARRAY_AGG(DISTINCT U.email) FILTER (WHERE R.is_admin = true) as admin_emails
-            FROM groups as G
-            INNER JOIN organisations AS O ON G.orga_id = O.id
-            INNER JOIN group_service_provider_relations AS GSPR ON GSPR.group_id = G.id AND GSPR.service_provider_id = :service_provider_id
-            LEFT JOIN group_user_relations AS GUR ON GUR.group_id = G.id
-            LEFT JOIN users AS U ON U.id = GUR.user_id
-            LEFT JOIN roles AS R ON R.id = GUR.role_id
-            WHERE O.siret = :siret
-            GROUP BY G.id, G.name, O.siret, GSPR.scopes
-            ORDER BY G.id
-            """
-            return await self.db_session.fetch_all(
-                query,
-                {
-                    "siret": siret,
-                    "service_provider_id": service_provider_id,
-                },
-            )
+        db_session = self.db_session.reader
+        query = """
+        SELECT
+            G.id,
+            G.name,
+            O.siret as organisation_siret,
+            GSPR.scopes,
+            GSPR.scope_list,
+            COALESCE(ARRAY_AGG(DISTINCT U.email) FILTER (WHERE R.is_admin = true), '{}') as admin_emails
+        FROM groups as G
+        INNER JOIN organisations AS O ON G.orga_id = O.id
+        INNER JOIN group_service_provider_relations AS GSPR ON GSPR.group_id = G.id AND GSPR.service_provider_id = :service_provider_id
+        LEFT JOIN group_user_relations AS GUR ON GUR.group_id = G.id
+        LEFT JOIN users AS U ON U.id = GUR.user_id
+        LEFT JOIN roles AS R ON R.id = GUR.role_id
+        WHERE O.siret = :siret
+        GROUP BY G.id, G.name, O.siret, GSPR.scopes, GSPR.scope_list
+        ORDER BY G.id
+        """
+        return await db_session.fetch_all(
+            query,
+            {
+                "siret": siret,
+                "service_provider_id": service_provider_id,
+            },
+        )
 
     async def create(
         self, group_data: GroupCreate, orga_id: int, service_provider_id: int
     ) -> GroupResponse:
         async with self.db_session.transaction():
-            query_create_group = "INSERT INTO groups (name, orga_id) VALUES (:name, :orga_id) RETURNING *"
+            # the group and its access for the service provider, in a single round-trip
+            query_create_group = """
+                WITH new_group AS (
+                    INSERT INTO groups (name, orga_id) VALUES (:name, :orga_id) RETURNING *
+                ), new_access AS (
+                    INSERT INTO group_service_provider_relations (service_provider_id, group_id, scopes, contract_description, contract_url)
+                    SELECT :service_provider_id, new_group.id, :scopes, :contract_description, :contract_url FROM new_group
+                )
+                SELECT * FROM new_group
+            """
             new_group = await self.db_session.fetch_one(
-                query_create_group, {"name": group_data.name, "orga_id": orga_id}
-            )
-
-            query_create_access = "INSERT INTO group_service_provider_relations (service_provider_id, group_id, scopes, contract_description, contract_url) VALUES (:service_provider_id, :group_id, :scopes, :contract_description, :contract_url)"
-            await self.db_session.execute(
-                query_create_access,
+                query_create_group,
                 {
+                    "name": group_data.name,
+                    "orga_id": orga_id,
                     "service_provider_id": service_provider_id,
-                    "group_id": new_group.id,
                     "scopes": group_data.scopes if group_data.scopes else "",
                     "contract_description": group_data.contract_description
                     if group_data.contract_description
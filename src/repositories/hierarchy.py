@@ -0,0 +1,178 @@
+# ------- REPOSITORY FILE -------
+from src.model import (
+    LOG_ACTIONS,
+    LOG_RESOURCE_TYPES,
+    ParentChildResponse,
+)
+from src.services.logs import LogsService
+
+
+class GroupHierarchyRepository:
+    """
+    Group hierarchy, stored in parent_child_relations (edges from a parent group to a child group).
+
+    Every traversal is a single recursive CTE, whatever the depth of the tree. UNION (not UNION ALL) in the
+    recursive part stops the traversal on already visited groups.
+    Descendants are only traversed through groups linked to the service provider, so that a service provider
+    never sees the groups or members of another service provider.
+    """
+
+    def __init__(self, db_session, logs_service: LogsService):
+        self.db_session = db_session
+        self.logs_service = logs_service
+
+    async def add_child(
+        self, parent_group_id: int, child_group_id: int, inherit_scopes: bool
+    ) -> ParentChildResponse | None:
+        """
+        Add an edge from parent to child. Returns None, without writing anything, if the edge would create a cycle.
+
+        Hierarchy writes are serialised with an advisory lock : two concurrent inserts (A -> B and B -> A)
+        could otherwise both pass the cycle check.
+        """
+        async with self.db_session.transaction():
+            await self.db_session.execute(
+                "SELECT pg_advisory_xact_lock(hashtext('parent_child_relations'))"
+            )
+
+            # the edge creates a cycle if the parent is the child, or one of its descendants
+            query = """
+            WITH RECURSIVE descendants AS (
+                SELECT CAST(:child_group_id AS INTEGER) AS group_id
+                UNION
+                SELECT PCR.child_group_id
+                FROM descendants AS D
+                INNER JOIN parent_child_relations AS PCR ON PCR.parent_group_id = D.group_id
+            )
+            SELECT EXISTS (SELECT 1 FROM descendants WHERE group_id = :parent_group_id) AS creates_cycle
+            """
+            cycle = await self.db_session.fetch_one(
+                query,
+                {"parent_group_id": parent_group_id, "child_group_id": child_group_id},
+            )
+            if cycle["creates_cycle"]:
+                return None
+
+            query = """
+            INSERT INTO parent_child_relations (parent_group_id, child_group_id, inherit_scopes)
+            VALUES (:parent_group_id, :child_group_id, :inherit_scopes)
+            ON CONFLICT (parent_group_id, child_group_id) DO UPDATE SET inherit_scopes = EXCLUDED.inherit_scopes, updated_at = CURRENT_TIMESTAMP
+            RETURNING parent_group_id, child_group_id, inherit_scopes
+            """
+            relation = await self.db_session.fetch_one(
+                query,
+                {
+                    "parent_group_id": parent_group_id,
+                    "child_group_id": child_group_id,
+                    "inherit_scopes": inherit_scopes,
+                },
+            )
+
+            await self.logs_service.save(
+                action_type=LOG_ACTIONS.ADD_CHILD_GROUP,
+                resource_type=LOG_RESOURCE_TYPES.GROUP,
+                db_session=self.db_session,
+                resource_id=parent_group_id,
+                new_values={
+                    "child_group_id": child_group_id,
+                    "inherit_scopes": inherit_scopes,
+                },
+            )
+
+            return relation
+
+    async def remove_child(self, parent_group_id: int, child_group_id: int) -> bool:
+        async with self.db_session.transaction():
+            query = """
+            DELETE FROM parent_child_relations
+            WHERE parent_group_id = :parent_group_id AND child_group_id = :child_group_id
+            RETURNING id
+            """
+            deleted = await self.db_session.fetch_one(
+                query,
+                {"parent_group_id": parent_group_id, "child_group_id": child_group_id},
+            )
+            if not deleted:
+                return False
+
+            await self.logs_service.save(
+                action_type=LOG_ACTIONS.REMOVE_CHILD_GROUP,
+                resource_type=LOG_RESOURCE_TYPES.GROUP,
+                db_session=self.db_session,
+                resource_id=parent_group_id,
+                new_values={"child_group_id": child_group_id},
+            )
+            return True
+
+    async def get_descendants(self, group_id: int, service_provider_id: int):
+        query = """
+        WITH RECURSIVE descendants AS (
+            SELECT PCR.child_group_id AS id, PCR.parent_group_id, PCR.inherit_scopes, 1 AS depth
+            FROM parent_child_relations AS PCR
+            WHERE PCR.parent_group_id = :group_id
+            UNION
+            SELECT PCR.child_group_id, PCR.parent_group_id, PCR.inherit_scopes, D.depth + 1
+            FROM descendants AS D
+            INNER JOIN parent_child_relations AS PCR ON PCR.parent_group_id = D.id
+            INNER JOIN group_service_provider_relations AS GSPR ON GSPR.group_id = D.id AND GSPR.service_provider_id = :service_provider_id
+        )
+        SELECT D.id, G.name, D.parent_group_id, D.inherit_scopes, D.depth
+        FROM descendants AS D
+        INNER JOIN groups AS G ON G.id = D.id
+        INNER JOIN group_service_provider_relations AS GSPR ON GSPR.group_id = D.id AND GSPR.service_provider_id = :service_provider_id
+        ORDER BY D.depth, D.id
+        """
+        return await self.db_session.fetch_all(
+            query,
+            {"group_id": group_id, "service_provider_id": service_provider_id},
+        )
+
+    async def get_effective_members(self, group_id: int, service_provider_id: int):
+        """
+        Members of the group and of all its descendants, with the group they are a direct member of.
+        """
+        query = """
+        WITH RECURSIVE subgroups AS (
+            SELECT CAST(:group_id AS INTEGER) AS id
+            UNION
+            SELECT PCR.child_group_id
+            FROM subgroups AS SG
+            INNER JOIN parent_child_relations AS PCR ON PCR.parent_group_id = SG.id
+            INNER JOIN group_service_provider_relations AS GSPR ON GSPR.group_id = PCR.child_group_id AND GSPR.service_provider_id = :service_provider_id
+        )
+        SELECT U.id, U.email, R.role_name, R.id as role_id, R.is_admin, GUR.group_id
+        FROM subgroups AS SG
+        INNER JOIN group_user_relations AS GUR ON GUR.group_id = SG.id
+        INNER JOIN users AS U ON U.id = GUR.user_id
+        INNER JOIN roles AS R ON R.id = GUR.role_id
+        ORDER BY GUR.group_id, R.id, U.id
+        """
+        return await self.db_session.fetch_all(
+            query,
+            {"group_id": group_id, "service_provider_id": service_provider_id},
+        )
+
+    async def get_effective_scopes(self, group_id: int, service_provider_id: int):
+        """
+        Scopes of the group on the service provider, including the scopes inherited from its ancestors
+        through inherit_scopes edges.
+        """
+        query = """
+        WITH RECURSIVE granting AS (
+            SELECT CAST(:group_id AS INTEGER) AS id
+            UNION
+            SELECT PCR.parent_group_id
+            FROM granting AS GR
+            INNER JOIN parent_child_relations AS PCR ON PCR.child_group_id = GR.id AND PCR.inherit_scopes
+        )
+        SELECT
+            COALESCE(array_agg(DISTINCT S.scope ORDER BY S.scope) FILTER (WHERE S.scope IS NOT NULL), '{}') AS scopes,
+            COALESCE(array_agg(DISTINCT GSPR.group_id ORDER BY GSPR.group_id) FILTER (WHERE GSPR.group_id <> :group_id), '{}') AS inherited_from
+        FROM granting AS GR
+        INNER JOIN group_service_provider_relations AS GSPR ON GSPR.group_id = GR.id AND GSPR.service_provider_id = :service_provider_id
+        LEFT JOIN LATERAL unnest(GSPR.scope_list) AS S(scope) ON true
+        """
+        return await self.db_session.fetch_one(
+            query,
+            {"group_id": group_id, "service_provider_id": service_provider_id},
+        )
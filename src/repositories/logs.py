@@ -4,8 +4,25 @@
 from databases import Database
 from pydantic import UUID4
 
+from src.database import prepared_query
 from src.model import LOG_ACTIONS, LOG_RESOURCE_TYPES
 
+# every entry in one statement whatever their number : the entries are sent as arrays
+INSERT_AUDIT_LOGS = prepared_query(
+    "insert_audit_logs",
+    """
+    INSERT INTO audit_logs (
+        service_account_id, service_provider_id, action_type, resource_type, resource_id,
+        new_values, acting_user_sub
+    )
+    SELECT
+        CAST(:service_account_id AS integer), CAST(:service_provider_id AS integer),
+        CAST(:action_type AS text), CAST(:resource_type AS text),
+        E.resource_id, CAST(E.new_values AS jsonb), CAST(:acting_user_sub AS text)
+    FROM unnest(CAST(:resource_ids AS integer[]), CAST(:new_values AS text[])) AS E(resource_id, new_values)
+    """,
+)
+
 
 class LogsRepository:
     """
@@ -45,33 +62,18 @@ class LogsRepository:
         if not resource_values:
             return
 
-        values_placeholders = []
-        query_values = {}
-
-        for i, (resource_id, new_values) in enumerate(resource_values):
-            values_placeholders.append(
-                f"(:service_account_id, :service_provider_id, :action_type, :resource_type, :resource_id_{i}, :new_values_{i}, :acting_user_sub)"
-            )
-            query_values[f"resource_id_{i}"] = resource_id
-            query_values[f"new_values_{i}"] = new_values
-
-        values_clause = ", ".join(values_placeholders)
-        query = f"""
-                    INSERT INTO audit_logs (
-                        service_account_id, service_provider_id, action_type, resource_type, resource_id,
-                        new_values, acting_user_sub
-                    ) VALUES {values_clause}
-                """
-
-        # Add common values
-        query_values.update(
-            {
+        resource_ids, new_values = zip(*resource_values)
+        await db_session.execute(
+            INSERT_AUDIT_LOGS,
+            values={
                 "service_account_id": self.service_account_id,
                 "service_provider_id": self.service_provider_id,
                 "action_type": str(action_type),
                 "resource_type": str(resource_type),
-                "acting_user_sub": self.acting_user_sub,
-            }
+                "acting_user_sub": str(self.acting_user_sub)
+                if self.acting_user_sub
+                else None,
+                "resource_ids": list(resource_ids),
+                "new_values": list(new_values),
+            },
         )
-
-        await db_session.execute(query, values=query_values)
@@ -12,6 +12,7 @@ from src.model import (
     Siret,
 )
 from src.services.logs import LogsService
+from src.utils.metrics import external_request_duration
 
 
 class OrganisationsRepository:
@@ -20,9 +21,8 @@ class OrganisationsRepository:
         self.logs_service = logs_service
 
     async def get_by_siret(self, siret: Siret) -> OrganisationResponse | None:
-        async with self.db_session.transaction():
-            query = "SELECT * FROM organisations WHERE siret = :siret"
-            return await self.db_session.fetch_one(query, {"siret": siret})
+        query = "SELECT * FROM organisations WHERE siret = :siret"
+        return await self.db_session.fetch_one(query, {"siret": siret})
 
     async def create(
         self, organisation_data: OrganisationCreate
@@ -84,7 +84,8 @@ async def fetch_organisation_metadata(siret: Siret):
             "page": 1,
         }
 
-        response = await client.get(url, params=params)
+        async with external_request_duration.time("recherche_entreprises", "search"):
+            response = await client.get(url, params=params)
         response.raise_for_status()
 
         data = response.json()
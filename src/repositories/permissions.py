@@ -0,0 +1,35 @@
+# ------- REPOSITORY FILE -------
+from pydantic import UUID4
+
+from src.database import prepared_query
+
+GET_PERMISSIONS_BY_USER_SUB = prepared_query(
+    "get_permissions_by_user_sub",
+    """
+    SELECT U.id as user_id, EP.scopes, EP.group_ids
+    FROM users AS U
+    LEFT JOIN effective_permissions AS EP ON EP.user_id = U.id AND EP.service_provider_id = :service_provider_id
+    WHERE U.sub_pro_connect = :sub_pro_connect
+    """,
+)
+
+
+class PermissionsRepository:
+    """
+    Read access to effective_permissions, which is maintained by database triggers (see migrations).
+    """
+
+    def __init__(self, db_session):
+        self.db_session = db_session
+
+    async def get_by_user_sub(self, user_sub: UUID4, service_provider_id: int):
+        """
+        Returns no row if the user does not exist, and NULL scopes if it has no permission on the service provider.
+        """
+        return await self.db_session.fetch_one(
+            GET_PERMISSIONS_BY_USER_SUB,
+            {
+                "sub_pro_connect": str(user_sub),
+                "service_provider_id": service_provider_id,
+            },
+        )
@@ -0,0 +1,94 @@
+# ------- REPOSITORY FILE -------
+import time
+
+from src.config import settings
+from src.database import DatabaseWithSchema, database
+from src.services.cache_invalidation import REFERENCE_DATA, invalidation_bus
+
+
+class ReferenceDataCache:
+    """
+    In-process cache of the reference tables : roles and service_providers.
+
+    These tables hold a handful of rows and almost never change, but are read on nearly every write request.
+    Both tables are loaded at once (two small queries) and kept in memory :
+    - loaded at startup, or lazily on first use
+    - reloaded after REFERENCE_DATA_CACHE_TTL_SECONDS, so that changes made by another worker are eventually seen
+    - invalidated by AdminWriteRepository when it creates or updates a service provider, on every worker
+      through the invalidation bus
+
+    Rows are kept as returned by the database, so that cached and uncached reads are interchangeable.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self.roles: dict[int, object] = {}
+        self.service_providers: dict[int, object] = {}
+        self.service_providers_by_client_id: dict[str, object] = {}
+        self.loaded_at: float | None = None
+
+    def is_fresh(self) -> bool:
+        return (
+            self.loaded_at is not None
+            and time.monotonic() - self.loaded_at < self.ttl_seconds
+        )
+
+    def invalidate(self) -> None:
+        self.loaded_at = None
+
+    async def load(self, db_session) -> None:
+        async with db_session.transaction():
+            roles = await db_session.fetch_all(
+                "SELECT R.id, R.role_name, R.is_admin FROM roles AS R ORDER BY R.id"
+            )
+            service_providers = await db_session.fetch_all(
+                "SELECT SP.id, SP.name, SP.url, SP.proconnect_client_id FROM service_providers AS SP ORDER BY SP.id"
+            )
+        self.roles = {role["id"]: role for role in roles}
+        self.service_providers = {sp["id"]: sp for sp in service_providers}
+        self.service_providers_by_client_id = {
+            sp["proconnect_client_id"]: sp
+            for sp in service_providers
+            if sp["proconnect_client_id"]
+        }
+        self.loaded_at = time.monotonic()
+
+    async def ensure_loaded(self, db_session) -> None:
+        if not self.is_fresh():
+            await self.load(db_session)
+
+    async def get_role(self, db_session, role_id: int):
+        await self.ensure_loaded(db_session)
+        return self.roles.get(role_id)
+
+    async def get_all_roles(self, db_session) -> list:
+        await self.ensure_loaded(db_session)
+        return list(self.roles.values())
+
+    async def get_service_provider(self, db_session, service_provider_id: int):
+        await self.ensure_loaded(db_session)
+        return self.service_providers.get(service_provider_id)
+
+    async def get_service_provider_by_proconnect_client_id(
+        self, db_session, proconnect_client_id: str
+    ):
+        """
+        As the whole table is cached, unknown client ids are negatively cached too :
+        they do not hit the database until the next reload.
+        """
+        await self.ensure_loaded(db_session)
+        return self.service_providers_by_client_id.get(proconnect_client_id)
+
+
+reference_data_cache = ReferenceDataCache(
+    ttl_seconds=settings.REFERENCE_DATA_CACHE_TTL_SECONDS
+)
+
+invalidation_bus.subscribe(
+    REFERENCE_DATA, lambda _key: reference_data_cache.invalidate()
+)
+
+
+async def warm_reference_data_cache():
+    """Startup event : load the reference data before the first request."""
+    await reference_data_cache.load(DatabaseWithSchema(database, settings.DB_SCHEMA))
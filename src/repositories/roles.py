@@ -1,25 +1,18 @@
 # ------- REPOSITORY FILE -------
 from src.model import RoleResponse
+from src.repositories.reference_data import reference_data_cache
 
 
 class RolesRepository:
+    """
+    Roles are reference data : they are read from the in-process cache, not from the database.
+    """
+
     def __init__(self, db_session):
         self.db_session = db_session
 
     async def get(self, role_id: int) -> RoleResponse:
-        async with self.db_session.transaction():
-            query = """
-            SELECT R.id, R.role_name, R.is_admin
-            FROM roles AS R
-            WHERE R.id = :role_id
-            """
-            return await self.db_session.fetch_one(query, {"role_id": role_id})
+        return await reference_data_cache.get_role(self.db_session, role_id)
 
     async def get_all(self) -> list[RoleResponse]:
-        async with self.db_session.transaction():
-            query = """
-            SELECT R.id, R.role_name, R.is_admin
-            FROM roles AS R
-            ORDER BY R.id
-            """
-            return await self.db_session.fetch_all(query)
+        return await reference_data_cache.get_all_roles(self.db_session)
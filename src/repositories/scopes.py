@@ -1,26 +1,32 @@
 # ------- REPOSITORY FILE -------
 from src.model import LOG_ACTIONS, LOG_RESOURCE_TYPES, ScopeResponse
 from src.services.logs import LogsService
+from src.services.webhooks import WebhooksService
 
 
 class ScopesRepository:
-    def __init__(self, db_session, logs_service: LogsService):
+    def __init__(
+        self,
+        db_session,
+        logs_service: LogsService,
+        webhooks_service: WebhooksService,
+    ):
         self.db_session = db_session
         self.logs_service = logs_service
+        self.webhooks_service = webhooks_service
 
     async def get(
         self, service_provider_id: int, group_id: int
     ) -> ScopeResponse | None:
-        async with self.db_session.transaction():
-            query = """
-            SELECT *
-            FROM group_service_provider_relations as  GSPR
-            WHERE GSPR.service_provider_id = :service_provider_id AND GSPR.group_id = :group_id
-            """
-            return await self.db_session.fetch_one(
-                query,
-                {"service_provider_id": service_provider_id, "group_id": group_id},
-            )
+        query = """
+        SELECT *
+        FROM group_service_provider_relations as  GSPR
+        WHERE GSPR.service_provider_id = :service_provider_id AND GSPR.group_id = :group_id
+        """
+        return await self.db_session.fetch_one(
+            query,
+            {"service_provider_id": service_provider_id, "group_id": group_id},
+        )
 
     async def update(
         self,
@@ -75,12 +81,27 @@ class ScopesRepository:
                 db_session=self.db_session,
                 resource_id=response["id"],
                 new_values={
+                    "group_id": group_id,
                     "scopes": scopes,
                     "contract_description": contract_description,
                     "contract_url": contract_url,
                 },
             )
 
+            await self.webhooks_service.notify(
+                event_type=LOG_ACTIONS.UPDATE_GROUP_SERVICE_PROVIDER_RELATION,
+                group_id=group_id,
+                db_session=self.db_session,
+                payloads=[
+                    {
+                        "scopes": response["scopes"],
+                        "contract_description": response["contract_description"],
+                        "contract_url": response["contract_url"],
+                    }
+                ],
+                service_provider_id=service_provider_id,
+            )
+
             return response
 
     async def create(
@@ -116,10 +137,25 @@ class ScopesRepository:
                 db_session=self.db_session,
                 resource_id=response["id"],
                 new_values={
+                    "group_id": group_id,
                     "scopes": scopes,
                     "contract_description": contract_description,
                     "contract_url": contract_url,
                 },
             )
 
+            await self.webhooks_service.notify(
+                event_type=LOG_ACTIONS.CREATE_GROUP_SERVICE_PROVIDER_RELATION,
+                group_id=group_id,
+                db_session=self.db_session,
+                payloads=[
+                    {
+                        "scopes": response["scopes"],
+                        "contract_description": response["contract_description"],
+                        "contract_url": response["contract_url"],
+                    }
+                ],
+                service_provider_id=service_provider_id,
+            )
+
             return response
@@ -1,6 +1,7 @@
 # ------- REPOSITORY FILE -------
 from pydantic import UUID4
 
+from src.database import prepared_query
 from src.model import (
     LOG_ACTIONS,
     LOG_RESOURCE_TYPES,
@@ -10,6 +11,13 @@ from src.model import (
 )
 from src.services.logs import LogsService
 
+GET_USER_BY_SUB = prepared_query(
+    "get_user_by_sub",
+    """
+    SELECT U.id, U.email FROM users as U WHERE U.sub_pro_connect = :sub_pro_connect
+    """,
+)
+
 
 class UsersRepository:
     """
@@ -29,31 +37,28 @@ class UsersRepository:
         if not emails:
             return []
 
-        async with self.db_session.transaction():
-            placeholders = ",".join([f":email_{i}" for i in range(len(emails))])
-            query = f"""
-                SELECT U.id, U.email FROM users as U
-                WHERE U.email IN ({placeholders})
-                """
-            return await self.db_session.fetch_all(
-                query, {f"email_{i}": email.lower() for i, email in enumerate(emails)}
-            )
+        placeholders = ",".join([f":email_{i}" for i in range(len(emails))])
+        query = f"""
+            SELECT U.id, U.email FROM users as U
+            WHERE U.email IN ({placeholders})
+            """
+        return await self.db_session.fetch_all(
+            query, {f"email_{i}": email.lower() for i, email in enumerate(emails)}
+        )
+
+    # users and memberships are read on the primary : they guard the writes (admin checks, last admin,
+    # already a member...), which must not act on a lagging replica
 
     async def get_by_id(self, user_id: int) -> UserResponse:
-        async with self.db_session.transaction():
-            query = """
-            SELECT U.id, U.email FROM users as U WHERE U.id = :id
-            """
-            return await self.db_session.fetch_one(query, {"id": user_id})
+        query = """
+        SELECT U.id, U.email FROM users as U WHERE U.id = :id
+        """
+        return await self.db_session.fetch_one(query, {"id": user_id})
 
     async def get_by_sub(self, user_sub: UUID4) -> UserResponse:
-        async with self.db_session.transaction():
-            query = """
-            SELECT U.id, U.email FROM users as U WHERE U.sub_pro_connect = :sub_pro_connect
-            """
-            return await self.db_session.fetch_one(
-                query, {"sub_pro_connect": str(user_sub)}
-            )
+        return await self.db_session.fetch_one(
+            GET_USER_BY_SUB, {"sub_pro_connect": str(user_sub)}
+        )
 
     async def get_all_by_group_ids(
         self, group_ids: list[int]
@@ -65,29 +70,28 @@ class UsersRepository:
         if len(group_ids) == 0:
             return {}
 
-        async with self.db_session.transaction():
-            placeholders = ",".join([f":group_id_{i}" for i in range(len(group_ids))])
-            query = f"""
-                SELECT U.id, U.email, U.created_at, R.role_name, R.id as role_id, R.is_admin, TUR.group_id
-                FROM users as U
-                INNER JOIN group_user_relations as TUR ON TUR.user_id = U.id
-                INNER JOIN roles as R ON TUR.role_id = R.id
-                WHERE TUR.group_id IN ({placeholders})
-                ORDER BY TUR.group_id, R.id ASC, U.id ASC
-                """
-
-            values = {f"group_id_{i}": group_id for i, group_id in enumerate(group_ids)}
-            rows = await self.db_session.fetch_all(query, values)
-
-            # Group users by group_id
-            result = {group_id: [] for group_id in group_ids}
-            for row in rows:
-                row_dict = dict(row)
-                group_id = row_dict["group_id"]
-                user_data = {k: v for k, v in row_dict.items() if k != "group_id"}
-                result[group_id].append(UserWithRoleResponse(**user_data))
-
-            return result
+        placeholders = ",".join([f":group_id_{i}" for i in range(len(group_ids))])
+        query = f"""
+            SELECT U.id, U.email, U.created_at, R.role_name, R.id as role_id, R.is_admin, TUR.group_id
+            FROM users as U
+            INNER JOIN group_user_relations as TUR ON TUR.user_id = U.id
+            INNER JOIN roles as R ON TUR.role_id = R.id
+            WHERE TUR.group_id IN ({placeholders})
+            ORDER BY TUR.group_id, R.id ASC, U.id ASC
+            """
+
+        values = {f"group_id_{i}": group_id for i, group_id in enumerate(group_ids)}
+        rows = await self.db_session.fetch_all(query, values)
+
+        # Group users by group_id
+        result = {group_id: [] for group_id in group_ids}
+        for row in rows:
+            row_dict = dict(row)
+            group_id = row_dict["group_id"]
+            user_data = {k: v for k, v in row_dict.items() if k != "group_id"}
+            result[group_id].append(UserWithRoleResponse(**user_data))
+
+        return result
 
     async def create_many(self, users: list[UserCreate]) -> list[UserResponse]:
         """
@@ -4,12 +4,19 @@ from src.model import (
     LOG_RESOURCE_TYPES,
 )
 from src.services.logs import LogsService
+from src.services.webhooks import WebhooksService
 
 
 class UsersInGroupRepository:
-    def __init__(self, db_session, logs_service: LogsService):
+    def __init__(
+        self,
+        db_session,
+        logs_service: LogsService,
+        webhooks_service: WebhooksService,
+    ):
         self.db_session = db_session
         self.logs_service = logs_service
+        self.webhooks_service = webhooks_service
 
     async def add_users(
         self, group_id: int, user_role_pairs: list[tuple[int, int]]
@@ -51,6 +58,16 @@ class UsersInGroupRepository:
                     resource_values=log_entries,
                 )
 
+            await self.webhooks_service.notify(
+                event_type=LOG_ACTIONS.ADD_USER_TO_GROUP,
+                group_id=group_id,
+                db_session=self.db_session,
+                payloads=[
+                    {"user_id": user_id, "role_id": role_id}
+                    for user_id, role_id in user_role_pairs
+                ],
+            )
+
     async def remove_user(self, group_id: int, user_id: int) -> None:
         async with self.db_session.transaction():
             query = "DELETE FROM group_user_relations WHERE group_id = :group_id AND user_id = :user_id"
@@ -67,6 +84,13 @@ class UsersInGroupRepository:
                 },
             )
 
+            await self.webhooks_service.notify(
+                event_type=LOG_ACTIONS.REMOVE_USER_FROM_GROUP,
+                group_id=group_id,
+                db_session=self.db_session,
+                payloads=[{"user_id": user_id}],
+            )
+
     async def update_user_role(self, group_id: int, user_id: int, role_id: int) -> None:
         async with self.db_session.transaction():
             query = "UPDATE group_user_relations SET role_id = :role_id WHERE group_id = :group_id AND user_id = :user_id"
@@ -83,3 +107,10 @@ class UsersInGroupRepository:
                     "role_id": role_id,
                 },
             )
+
+            await self.webhooks_service.notify(
+                event_type=LOG_ACTIONS.UPDATE_USER_ROLE,
+                group_id=group_id,
+                db_session=self.db_session,
+                payloads=[{"user_id": user_id, "role_id": role_id}],
+            )
@@ -3,6 +3,18 @@ from uuid import UUID
 
 from pydantic import EmailStr
 
+from src.config import settings
+from src.services.cache_invalidation import USER, invalidation_bus
+from src.utils.cache import TTLCache
+
+# sub -> email pairings, read on every resource server request. A pairing never changes once saved,
+# so entries are only evicted when a user is deleted.
+sub_emails_cache = TTLCache(
+    ttl_seconds=settings.USER_SUBS_CACHE_TTL_SECONDS,
+    max_size=settings.USER_SUBS_CACHE_MAX_SIZE,
+)
+invalidation_bus.subscribe(USER, lambda _key: sub_emails_cache.clear())
+
 
 class UserSubsRepository:
     """
@@ -16,34 +28,39 @@ class UserSubsRepository:
 
     async def get_mail_by_sub(self, sub: UUID) -> EmailStr | None:
         """
-        Retrieve a user's sub
+        Retrieve the email paired to a sub
         """
-        async with self.db_session.transaction():
-            query = """
-            SELECT U.email FROM users as U WHERE U.sub_pro_connect = :sub
-            """
-            record = await self.db_session.fetch_one(query, {"sub": str(sub)})
-            return record["email"] if record else None
+        email = sub_emails_cache.get(str(sub))
+        if email:
+            return email
+
+        query = """
+        SELECT U.email FROM users as U WHERE U.sub_pro_connect = :sub
+        """
+        record = await self.db_session.fetch_one(query, {"sub": str(sub)})
+        if not record:
+            # not cached : the sub may be paired by the next request
+            return None
+        sub_emails_cache.set(str(sub), record["email"])
+        return record["email"]
 
     async def get_sub_by_email(self, email: EmailStr) -> UUID | str | None:
         """
         Retrieve a user's sub
         """
-        async with self.db_session.transaction():
-            query = """
-            SELECT coalesce(U.sub_pro_connect, '') as sub FROM users as U WHERE U.email = :email
-            """
-            record = await self.db_session.fetch_one(query, {"email": email.lower()})
-            return record["sub"] if record else None
+        query = """
+        SELECT coalesce(U.sub_pro_connect, '') as sub FROM users as U WHERE U.email = :email
+        """
+        record = await self.db_session.fetch_one(query, {"email": email.lower()})
+        return record["sub"] if record else None
 
     async def set(self, email: str, sub: UUID) -> None:
         """
         Save a user's sub
         """
-        async with self.db_session.transaction():
-            query = """
-            UPDATE users SET sub_pro_connect = :sub_pro_connect
-            WHERE email = :email
-            """
-            values = {"email": email.lower(), "sub_pro_connect": sub}
-            await self.db_session.fetch_one(query, values)
+        query = """
+        UPDATE users SET sub_pro_connect = :sub_pro_connect
+        WHERE email = :email
+        """
+        values = {"email": email.lower(), "sub_pro_connect": sub}
+        await self.db_session.fetch_one(query, values)
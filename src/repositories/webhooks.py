@@ -0,0 +1,127 @@
+# ------- REPOSITORY FILE -------
+import json
+
+from databases import Database
+
+from src.model import LOG_ACTIONS
+
+
+class WebhooksRepository:
+    """
+    Repository for the outbound webhooks delivery queue (webhook_deliveries).
+
+    Enqueuing does not rely on its own database session, but uses the one provided by the current transaction,
+    so that a delivery exists if and only if the change it notifies has been committed.
+    """
+
+    def __init__(self, db_session=None):
+        self.db_session = db_session
+
+    async def enqueue(
+        self,
+        event_type: LOG_ACTIONS,
+        group_id: int,
+        payloads: list[dict],
+        db_session: Database,
+        service_provider_id: int | None = None,
+    ) -> None:
+        """
+        Enqueue one delivery per payload, for every service provider of the group that has a webhook URL
+        (or only for `service_provider_id` if given).
+        Single INSERT query, which inserts nothing when no service provider of the group uses webhooks.
+        """
+        if not payloads:
+            return
+
+        values = {
+            "event_type": str(event_type),
+            "group_id": group_id,
+            "payloads": json.dumps(payloads, default=str),
+        }
+        service_provider_filter = ""
+        if service_provider_id is not None:
+            service_provider_filter = "AND SP.id = :service_provider_id"
+            values["service_provider_id"] = service_provider_id
+
+        query = f"""
+        INSERT INTO webhook_deliveries (service_provider_id, event_type, group_id, payload)
+        SELECT SP.id, :event_type, :group_id, P.payload
+        FROM group_service_provider_relations AS GSPR
+        INNER JOIN service_providers AS SP ON SP.id = GSPR.service_provider_id
+        CROSS JOIN jsonb_array_elements(CAST(:payloads AS jsonb)) AS P(payload)
+        WHERE GSPR.group_id = :group_id AND SP.webhook_url IS NOT NULL {service_provider_filter}
+        ORDER BY SP.id
+        """
+        await db_session.execute(query, values)
+
+    async def claim_pending(
+        self, batch_size: int, lease_seconds: float, max_attempts: int
+    ):
+        """
+        Claim pending deliveries whose next attempt is due, and which have less than `max_attempts` attempts.
+
+        Claimed deliveries are leased : their next attempt is pushed back by `lease_seconds`, so that other
+        workers skip them while they are being sent, and so that they are retried if this worker dies.
+        """
+        query = """
+        UPDATE webhook_deliveries AS WD
+        SET attempts = WD.attempts + 1,
+            next_attempt_at = now() + make_interval(secs => :lease_seconds)
+        FROM service_providers AS SP
+        WHERE SP.id = WD.service_provider_id
+        AND WD.id IN (
+            SELECT id FROM webhook_deliveries
+            WHERE delivered_at IS NULL AND failed_at IS NULL AND next_attempt_at <= now()
+            AND attempts < :max_attempts
+            ORDER BY id
+            LIMIT :batch_size
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING
+            WD.id,
+            WD.service_provider_id,
+            WD.event_type,
+            WD.group_id,
+            WD.payload,
+            WD.attempts,
+            WD.created_at,
+            SP.webhook_url,
+            SP.webhook_secret
+        """
+        return await self.db_session.fetch_all(
+            query,
+            {
+                "batch_size": batch_size,
+                "lease_seconds": lease_seconds,
+                "max_attempts": max_attempts,
+            },
+        )
+
+    async def mark_delivered(self, delivery_ids: list[int]) -> None:
+        query = """
+        UPDATE webhook_deliveries
+        SET delivered_at = now(), last_error = NULL
+        WHERE id = ANY(:ids)
+        """
+        await self.db_session.execute(query, {"ids": delivery_ids})
+
+    async def mark_for_retry(
+        self, delivery_ids: list[int], error: str, delay_seconds: float
+    ) -> None:
+        query = """
+        UPDATE webhook_deliveries
+        SET next_attempt_at = now() + make_interval(secs => :delay_seconds), last_error = :error
+        WHERE id = ANY(:ids)
+        """
+        await self.db_session.execute(
+            query,
+            {"ids": delivery_ids, "error": error, "delay_seconds": delay_seconds},
+        )
+
+    async def mark_failed(self, delivery_ids: list[int], error: str) -> None:
+        query = """
+        UPDATE webhook_deliveries
+        SET failed_at = now(), last_error = :error
+        WHERE id = ANY(:ids)
+        """
+        await self.db_session.execute(query, {"ids": delivery_ids, "error": error})
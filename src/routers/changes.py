@@ -0,0 +1,30 @@
+# ------- USER ROUTER FILE -------
+from fastapi import APIRouter, Depends, Query
+
+from src.dependencies import get_changes_service
+from src.dependencies.auth.o_auth import decode_access_token
+from src.model import ChangesResponse
+from src.services.changes import ChangesService
+
+router = APIRouter(
+    prefix="/changes",
+    tags=["Synchronisation incrémentale"],
+    dependencies=[Depends(decode_access_token)],
+    responses={404: {"description": "Not found"}, 400: {"description": "Bad request"}},
+)
+
+
+@router.get("/", response_model=ChangesResponse)
+async def list_changes(
+    since: int = Query(
+        0, ge=0, description="Curseur renvoyé par l’appel précédent (`next_cursor`)"
+    ),
+    limit: int = Query(100, ge=1, le=1000, description="Nombre maximum de changements"),
+    changes_service: ChangesService = Depends(get_changes_service),
+):
+    """
+    Liste les changements survenus sur les groupes de votre fournisseur de service depuis un curseur : création et modification de groupes, ajout, retrait et changement de rôle des membres, modification des scopes et contrats, suppression de groupes.
+
+    Les changements sont triés du plus ancien au plus récent. Conservez `next_cursor` et utilisez-le comme `since` lors de l’appel suivant. Si `has_more` vaut `true`, d’autres changements sont disponibles immédiatement.
+    """
+    return await changes_service.list_changes(since, limit)
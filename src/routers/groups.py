@@ -1,16 +1,27 @@
 # ------- USER ROUTER FILE -------
-from fastapi import APIRouter, Depends, Path, Query
+from fastapi import APIRouter, Depends, Path, Query, Request, Response
 from pydantic import HttpUrl
 
-from src.dependencies import get_groups_service
+from src.dependencies import get_group_hierarchy_service, get_groups_service
 from src.dependencies.auth.o_auth import decode_access_token
 from src.model import (
+    ChildGroupCreate,
+    EffectiveMemberResponse,
     GroupCreate,
+    GroupDescendantResponse,
+    GroupEffectiveScopesResponse,
     GroupResponse,
     GroupWithScopesResponse,
     GroupWithUsersAndScopesResponse,
+    ParentChildResponse,
 )
 from src.services.groups import GroupsService
+from src.services.hierarchy import GroupHierarchyService
+from src.utils.responses import (
+    is_not_modified,
+    not_modified_response,
+    records_response,
+)
 
 router = APIRouter(
     prefix="/groups",
@@ -20,24 +31,61 @@ router = APIRouter(
 )
 
 
-@router.get("/all", response_model=list[GroupWithScopesResponse])
+@router.get(
+    "/all",
+    response_model=list[GroupWithScopesResponse],
+    responses={304: {"description": "Not modified"}},
+)
 async def list_service_provider_groups(
+    request: Request,
     group_service: GroupsService = Depends(get_groups_service),
 ):
     """
     Liste les groupes disponibles pour votre fournisseur de services.
+
+    La réponse porte un en-tête `ETag`. Renvoyez-le dans l’en-tête `If-None-Match` : si aucun groupe n’a changé, la réponse est une `304` sans contenu.
     """
-    return await group_service.list_groups()
+    etag = await group_service.get_groups_etag()
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
 
+    groups = await group_service.list_groups()
+    return records_response(groups, GroupWithScopesResponse, headers={"ETag": etag})
 
-@router.get("/{group_id}", response_model=GroupWithUsersAndScopesResponse)
+
+@router.get("/search", response_model=list[GroupWithScopesResponse])
+async def search_by_scope(
+    scope: str = Query(..., min_length=1, description="Scope recherché (ex: `rne`)"),
+    group_service: GroupsService = Depends(get_groups_service),
+):
+    """
+    Liste les groupes de votre fournisseur de service qui disposent d’un scope.
+    """
+    groups = await group_service.search_groups_by_scope(scope)
+    return records_response(groups, GroupWithScopesResponse)
+
+
+@router.get(
+    "/{group_id}",
+    response_model=GroupWithUsersAndScopesResponse,
+    responses={304: {"description": "Not modified"}},
+)
 async def by_id(
+    request: Request,
+    response: Response,
     group_id: int = Path(..., description="ID du groupe à récupérer"),
     group_service: GroupsService = Depends(get_groups_service),
 ):
     """
     Récupère un groupe par son ID. Inclut les utilisateurs, leurs rôles et les droits du groupes sur le fournisseur de service.
+
+    La réponse porte un en-tête `ETag`. Renvoyez-le dans l’en-tête `If-None-Match` : si le groupe n’a pas changé, la réponse est une `304` sans contenu.
     """
+    etag = await group_service.get_group_etag(group_id)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+
+    response.headers["ETag"] = etag
     return await group_service.get_group_with_users_and_scopes(group_id)
 
 
@@ -82,3 +130,74 @@ async def update_group_scopes(
         contract_description,
         contract_url,
     )
+
+
+# ---------------
+# Group hierarchy
+# ---------------
+
+
+@router.post(
+    "/{group_id}/children", response_model=ParentChildResponse, status_code=201
+)
+async def add_child(
+    child: ChildGroupCreate,
+    group_id: int = Path(..., description="ID du groupe parent"),
+    hierarchy_service: GroupHierarchyService = Depends(get_group_hierarchy_service),
+):
+    """
+    Rattache un groupe enfant à un groupe (ex: une direction à son ministère).
+
+    Les membres du groupe enfant deviennent membres effectifs du groupe parent et de ses ancêtres.
+    Si `inherit_scopes` est vrai, le groupe enfant hérite des scopes du groupe parent.
+
+    Une erreur 400 est levée si le rattachement créerait un cycle.
+    """
+    return await hierarchy_service.add_child(group_id, child)
+
+
+@router.delete("/{group_id}/children/{child_group_id}", status_code=204)
+async def remove_child(
+    group_id: int = Path(..., description="ID du groupe parent"),
+    child_group_id: int = Path(..., description="ID du groupe enfant"),
+    hierarchy_service: GroupHierarchyService = Depends(get_group_hierarchy_service),
+):
+    """
+    Détache un groupe enfant de son groupe parent.
+    """
+    await hierarchy_service.remove_child(group_id, child_group_id)
+
+
+@router.get("/{group_id}/descendants", response_model=list[GroupDescendantResponse])
+async def descendants(
+    group_id: int = Path(..., description="ID du groupe"),
+    hierarchy_service: GroupHierarchyService = Depends(get_group_hierarchy_service),
+):
+    """
+    Liste les sous-groupes d’un groupe, à toutes les profondeurs.
+    """
+    return await hierarchy_service.get_descendants(group_id)
+
+
+@router.get(
+    "/{group_id}/effective-members", response_model=list[EffectiveMemberResponse]
+)
+async def effective_members(
+    group_id: int = Path(..., description="ID du groupe"),
+    hierarchy_service: GroupHierarchyService = Depends(get_group_hierarchy_service),
+):
+    """
+    Liste les membres d’un groupe et de tous ses sous-groupes, avec le groupe dont ils sont directement membres.
+    """
+    return await hierarchy_service.get_effective_members(group_id)
+
+
+@router.get("/{group_id}/effective-scopes", response_model=GroupEffectiveScopesResponse)
+async def effective_scopes(
+    group_id: int = Path(..., description="ID du groupe"),
+    hierarchy_service: GroupHierarchyService = Depends(get_group_hierarchy_service),
+):
+    """
+    Retourne les scopes d’un groupe sur votre fournisseur de service, y compris ceux hérités de ses groupes parents.
+    """
+    return await hierarchy_service.get_effective_scopes(group_id)
@@ -13,29 +13,29 @@ router = APIRouter(
 )
 
 
+async def is_alive(db) -> bool:
+    try:
+        query = "SELECT R.is_admin as is_alive from roles as R WHERE R.role_name = 'administrateur'"
+        result = await db.fetch_one(query)
+        return bool(result and result["is_alive"] == 1)
+    except Exception:
+        # Log the exception here if needed
+        return False
+
+
 @router.get("/")
 async def ping(db: Database = Depends(get_db)):
     """
-    Vérifie l’état de la connexion à la base de données.
+    Vérifie l’état de la connexion à la base de données, et au réplica en lecture s’il est configuré.
     """
-    try:
-        async with db.transaction():
-            query = "SELECT R.is_admin as is_alive from roles as R WHERE R.role_name = 'administrateur'"
-            result = await db.fetch_one(query)
-
-            if result and result["is_alive"] == 1:
-                return {
-                    "status": "healthy",
-                    "database": "connected",
-                    "timestamp": datetime.now().isoformat(),
-                }
-            else:
-                raise Exception("Database query returned unexpected result")
-
-    except Exception:
-        # Log the exception here if needed
-        return {
-            "status": "unhealthy",
-            "database": "disconnected",
-            "timestamp": datetime.now().isoformat(),
-        }
+    primary_alive = await is_alive(db)
+    health = {
+        "status": "healthy" if primary_alive else "unhealthy",
+        "database": "connected" if primary_alive else "disconnected",
+        "timestamp": datetime.now().isoformat(),
+    }
+    if getattr(db, "replica", None) is not None:
+        health["replica"] = (
+            "connected" if await is_alive(db.replica) else "disconnected"
+        )
+    return health
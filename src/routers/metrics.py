@@ -0,0 +1,38 @@
+# ------- METRICS ROUTER FILE -------
+import secrets
+
+from fastapi import APIRouter, Header, HTTPException, status
+from fastapi.responses import PlainTextResponse
+
+from src.config import settings
+from src.utils.metrics import registry
+
+router = APIRouter(
+    prefix="/metrics",
+    tags=["Health check"],
+    responses={404: {"description": "Not found"}},
+)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("", response_class=PlainTextResponse)
+async def metrics(authorization: str | None = Header(default=None)):
+    """
+    Métriques au format Prometheus : latence par route, requêtes SQL, pool de connexions,
+    appels aux API externes et emails en attente. Sommées sur tous les workers si METRICS_DIR est défini.
+    """
+    if settings.IS_PRODUCTION and not settings.METRICS_TOKEN:
+        # never exposed without a token in production
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+    if settings.METRICS_TOKEN and not secrets.compare_digest(
+        authorization or "", f"Bearer {settings.METRICS_TOKEN}"
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return PlainTextResponse(
+        registry.render(settings.METRICS_DIR), media_type=PROMETHEUS_CONTENT_TYPE
+    )
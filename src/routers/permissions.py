@@ -0,0 +1,28 @@
+# ------- USER ROUTER FILE -------
+from fastapi import APIRouter, Depends, Path
+from pydantic import UUID4
+
+from src.dependencies import get_permissions_service
+from src.dependencies.auth.o_auth import decode_access_token
+from src.model import EffectivePermissionsResponse
+from src.services.permissions import PermissionsService
+
+router = APIRouter(
+    prefix="/permissions",
+    tags=["Permissions"],
+    dependencies=[Depends(decode_access_token)],
+    responses={404: {"description": "Not found"}, 400: {"description": "Bad request"}},
+)
+
+
+@router.get("/{user_sub}", response_model=EffectivePermissionsResponse)
+async def by_user_sub(
+    user_sub: UUID4 = Path(..., description="Sub ProConnect de l’utilisateur"),
+    permissions_service: PermissionsService = Depends(get_permissions_service),
+):
+    """
+    Retourne les droits effectifs d’un utilisateur sur votre fournisseur de service : l’union des scopes de tous ses groupes, et les groupes qui les lui donnent.
+
+    Un utilisateur qui n’appartient à aucun de vos groupes n’a aucun scope.
+    """
+    return await permissions_service.get_effective_permissions(user_sub)
@@ -12,6 +12,7 @@ from src.model import (
     UserInGroupResponse,
 )
 from src.services.groups import GroupsService
+from src.utils.responses import records_response
 
 router = APIRouter(
     prefix="/groups",
@@ -28,7 +29,8 @@ async def get_my_groups(
     """
     Recherche les groupes d’un utilisateur, avec son adresse e-mail et son sub ProConnect.
     """
-    return await groups_service.search_groups(user_sub=acting_user_sub)
+    groups = await groups_service.search_groups(user_sub=acting_user_sub)
+    return records_response(groups, GroupWithUsersAndScopesResponse)
 
 
 @router.put("/{group_id}", response_model=GroupResponse)
@@ -9,6 +9,7 @@ from src.model import (
     Siret,
 )
 from src.services.groups import GroupsService
+from src.utils.responses import records_response
 
 router = APIRouter(
     prefix="/organizations",
@@ -25,4 +26,7 @@ async def get_my_groups(
     """
     Recherche les groupes d'une organisation, avec son SIRET.
     """
-    return await groups_service.search_groups_by_organisation_siret(siret=acting_user_organization_siret)
+    groups = await groups_service.search_groups_by_organisation_siret(
+        siret=acting_user_organization_siret
+    )
+    return records_response(groups, OrganisationGroupResponse)
@@ -17,6 +17,23 @@ router = APIRouter(
 )
 
 
+def parse_webhook_url(form) -> str | None:
+    """
+    Webhook URL of the service provider form, None when left empty (no webhooks)
+    """
+    webhook_url = str(form.get("webhook_url", "")).strip()
+    if not webhook_url:
+        return None
+
+    try:
+        return str(HttpUrl(webhook_url))
+    except ValidationError:
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid webhook URL format. Please provide a valid URL.",
+        )
+
+
 @router.get("/", response_class=HTMLResponse)
 async def all_service_providers(
     request: Request, admin_service=Depends(get_admin_read_service)
@@ -63,6 +80,20 @@ async def create_service_provider_form(request: Request):
                     "placeholder": "ex: client_12345",
                     "name": "proconnect_client_id",
                 },
+                {
+                    "label": "URL de webhook",
+                    "label_hint": "URL notifiée des changements sur les groupes du FS (facultatif)",
+                    "placeholder": "ex: https://data.gouv.fr/webhooks/roles",
+                    "name": "webhook_url",
+                    "optional": True,
+                },
+                {
+                    "label": "Secret de webhook",
+                    "label_hint": "Secret de signature des notifications (facultatif)",
+                    "placeholder": "ex: un secret aléatoire",
+                    "name": "webhook_secret",
+                    "optional": True,
+                },
             ],
         },
         breadcrumbs=[
@@ -97,7 +128,11 @@ async def create_service_provider(
         )
 
     service_provider = await admin_service.create_service_provider(
-        name=name, url=str(url), proconnect_client_id=proconnect_client_id
+        name=name,
+        url=str(url),
+        proconnect_client_id=proconnect_client_id,
+        webhook_url=parse_webhook_url(form),
+        webhook_secret=str(form.get("webhook_secret", "")) or None,
     )
 
     return RedirectResponse(
@@ -171,6 +206,21 @@ async def update_service_provider_form(
                     "name": "proconnect_client_id",
                     "defaultValue": service_provider.proconnect_client_id or "",
                 },
+                {
+                    "label": "URL de webhook",
+                    "label_hint": "URL notifiée des changements sur les groupes du FS (vide pour désactiver les webhooks)",
+                    "placeholder": "ex: https://data.gouv.fr/webhooks/roles",
+                    "name": "webhook_url",
+                    "defaultValue": service_provider.webhook_url or "",
+                    "optional": True,
+                },
+                {
+                    "label": "Secret de webhook",
+                    "label_hint": "Secret de signature des notifications (vide pour conserver le secret actuel)",
+                    "placeholder": "ex: un secret aléatoire",
+                    "name": "webhook_secret",
+                    "optional": True,
+                },
             ],
         },
         breadcrumbs=[
@@ -210,6 +260,8 @@ async def update_service_provider(
         name=name,
         url=str(url),
         proconnect_client_id=proconnect_client_id,
+        webhook_url=parse_webhook_url(form),
+        webhook_secret=str(form.get("webhook_secret", "")) or None,
     )
 
     return RedirectResponse(url="/admin/service-providers", status_code=303)
@@ -201,13 +201,18 @@ class AdminWriteService:
         return updated_group
 
     async def create_service_provider(
-        self, name: str, url: str, proconnect_client_id: str | None = None
+        self,
+        name: str,
+        url: str,
+        proconnect_client_id: str | None = None,
+        webhook_url: str | None = None,
+        webhook_secret: str | None = None,
     ) -> ServiceProviderResponse:
         """
         Create a new service provider.
         """
         return await self.admin_write_repository.create_service_provider(
-            name, url, proconnect_client_id
+            name, url, proconnect_client_id, webhook_url, webhook_secret
         )
 
     async def update_service_provider(
@@ -216,12 +221,15 @@ class AdminWriteService:
         name: str,
         url: str,
         proconnect_client_id: str | None = None,
+        webhook_url: str | None = None,
+        webhook_secret: str | None = None,
     ) -> ServiceProviderResponse:
         """
-        Update a service provider name, url, and proconnect_client_id
+        Update a service provider name, url, proconnect_client_id and webhook.
+        Without webhook_secret, the current secret is kept, unless the webhook is removed (no webhook_url).
         """
         return await self.admin_write_repository.update_service_provider(
-            service_provider_id, name, url, proconnect_client_id
+            service_provider_id, name, url, proconnect_client_id, webhook_url, webhook_secret
         )
 
     async def delete_group(self, group_id: int) -> None:
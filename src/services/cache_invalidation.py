@@ -0,0 +1,115 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from typing import Any, Callable
+
+import asyncpg
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+# topics
+REFERENCE_DATA = "reference_data"  # roles and service providers, no key
+USER = "user"  # user deletion, key : user_id
+
+RECONNECT_DELAY_SECONDS = 5
+HEALTH_CHECK_INTERVAL_SECONDS = 10
+
+
+class InvalidationBus:
+    """
+    Cross-worker cache invalidation over Postgres LISTEN/NOTIFY.
+
+    - writers publish an event (topic and optional key) in their transaction : Postgres delivers it only on commit
+    - every worker keeps one dedicated connection listening to the channel, and calls the handlers subscribed
+      to the topic, which evict the matching cache entries
+
+    NOTIFY is fire-and-forget : events sent while a worker is disconnected are lost. After a reconnection,
+    every handler is called with key None, which must evict everything for the topic.
+    """
+
+    def __init__(self, channel: str):
+        self.channel = channel
+        self.handlers: dict[str, list[Callable[[Any], None]]] = defaultdict(list)
+
+    def subscribe(self, topic: str, handler: Callable[[Any], None]) -> None:
+        self.handlers[topic].append(handler)
+
+    async def publish(self, db_session, topic: str, key: Any = None) -> None:
+        """
+        Publish an invalidation event. Call it within the transaction of the write.
+        """
+        await db_session.execute(
+            "SELECT pg_notify(:channel, :payload)",
+            {
+                "channel": self.channel,
+                "payload": json.dumps({"topic": topic, "key": key}),
+            },
+        )
+
+    def dispatch(self, topic: str, key: Any = None) -> None:
+        for handler in self.handlers.get(topic, []):
+            try:
+                handler(key)
+            except Exception:
+                logger.exception("Cache invalidation handler failed on %s", topic)
+
+    def dispatch_all(self) -> None:
+        for topic in list(self.handlers):
+            self.dispatch(topic)
+
+    def on_notification(self, _connection, _pid, _channel, payload: str) -> None:
+        try:
+            event = json.loads(payload)
+            topic, key = event["topic"], event.get("key")
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Invalid cache invalidation event: %s", payload)
+            return
+        self.dispatch(topic, key)
+
+    async def listen(self) -> None:
+        """
+        Keep a LISTEN connection open, reconnecting on failure. Runs until cancelled.
+        """
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(settings.DATABASE_URL)
+                await connection.add_listener(self.channel, self.on_notification)
+                # events may have been missed while disconnected
+                self.dispatch_all()
+                while not connection.is_closed():
+                    await asyncio.sleep(HEALTH_CHECK_INTERVAL_SECONDS)
+                    await connection.execute("SELECT 1")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Cache invalidation listener disconnected")
+            finally:
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+            await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+
+
+invalidation_bus = InvalidationBus(channel=f"{settings.DB_SCHEMA}_cache_invalidation")
+
+_listener_task: asyncio.Task | None = None
+
+
+async def start_invalidation_listener() -> None:
+    global _listener_task
+    if not _listener_task:
+        _listener_task = asyncio.create_task(invalidation_bus.listen())
+
+
+async def stop_invalidation_listener() -> None:
+    global _listener_task
+    if _listener_task:
+        _listener_task.cancel()
+        try:
+            await _listener_task
+        except asyncio.CancelledError:
+            pass
+        _listener_task = None
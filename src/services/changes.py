@@ -0,0 +1,40 @@
+import json
+
+from src.model import ChangeResponse, ChangesResponse
+from src.repositories.changes import ChangesRepository
+
+
+class ChangesService:
+    """
+    Change feed of the groups of a service provider : group creation, updates and deletion, memberships, scopes and contracts.
+
+    Consumers keep the `next_cursor` of the last page and poll with it, instead of listing every group again.
+    """
+
+    def __init__(self, changes_repository: ChangesRepository, service_provider_id: int):
+        self.changes_repository = changes_repository
+        self.service_provider_id = service_provider_id
+
+    async def list_changes(self, since: int, limit: int) -> ChangesResponse:
+        # fetch one more row to know whether there is a next page
+        rows = await self.changes_repository.list_since(
+            self.service_provider_id, since, limit + 1
+        )
+
+        changes = [
+            ChangeResponse(
+                cursor=row["cursor"],
+                action_type=row["action_type"],
+                resource_type=row["resource_type"],
+                group_id=row["group_id"],
+                new_values=json.loads(row["new_values"]) if row["new_values"] else None,
+                created_at=row["created_at"],
+            )
+            for row in rows[:limit]
+        ]
+
+        return ChangesResponse(
+            changes=changes,
+            next_cursor=changes[-1].cursor if changes else since,
+            has_more=len(rows) > limit,
+        )
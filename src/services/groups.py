@@ -1,3 +1,4 @@
+import json
 from uuid import UUID
 
 from fastapi import HTTPException, status
@@ -13,11 +14,13 @@ from src.model import (
     Siret,
     UserCreate,
     UserInGroupResponse,
+    UserWithRoleResponse,
 )
 from src.repositories import groups, users_in_group
 from src.services import organisations, roles, scopes, users
 from src.services.email.main import EmailService
 from src.services.service_providers import ServiceProvidersService
+from src.utils.responses import make_etag
 
 
 class GroupsService:
@@ -44,6 +47,7 @@ class GroupsService:
         service_provider_id: int,
         email_service: EmailService,
         should_send_emails: bool,
+        db_session,
     ):
         self.groups_repository = groups_repository
         self.users_in_group_repository = users_in_group_repository
@@ -55,6 +59,8 @@ class GroupsService:
         self.email_service = email_service
         self.service_provider_id = service_provider_id
         self.should_send_emails = should_send_emails
+        # only used to run the operations spanning several repositories as one unit of work
+        self.db_session = db_session
 
     async def validate_group_data(self, group_data: GroupCreate) -> None:
         if not group_data.organisation_siret:
@@ -90,31 +96,75 @@ class GroupsService:
     async def create_group(self, group_data: GroupCreate) -> GroupResponse:
         await self.validate_group_data(group_data)
 
+        # outside of the unit of work : the organisation name is fetched by another task, which must see it
         orga_id = await self.organisations_service.get_or_create_organisation(
             OrganisationCreate(siret=group_data.organisation_siret)
         )
 
-        admin_user = await self.users_service.create_user_if_doesnt_exist(
-            group_data.admin
-        )
+        # the admin is not added twice if also listed as a member
+        members = {
+            member.email: member
+            for member in group_data.members or []
+            if member.email != group_data.admin.email
+        }
+
+        # users, group and memberships are created together, or not at all, each in a single batch
+        async with self.db_session.transaction():
+            users = await self.users_service.create_users_if_dont_exist(
+                [group_data.admin, *members.values()]
+            )
+            admin_user, member_users = users[0], users[1:]
 
-        new_group = await self.groups_repository.create(
-            group_data, orga_id, self.service_provider_id
-        )
+            new_group = await self.groups_repository.create(
+                group_data, orga_id, self.service_provider_id
+            )
 
-        await self.add_user_to_group(new_group.id, user_id=admin_user.id, role_id=1)
+            # role 1 : admin, role 2 : member
+            await self.users_in_group_repository.add_users(
+                new_group.id,
+                [(admin_user.id, 1)] + [(user.id, 2) for user in member_users],
+            )
 
-        if group_data.members:
-            members = await self.users_service.create_users_if_dont_exist(
-                group_data.members
+        if self.should_send_emails:
+            service_provider = (
+                await self.service_provider_service.get_service_provider_by_id(
+                    self.service_provider_id
+                )
             )
-            user_role_pairs = [(user.id, 2) for user in members]
-            await self.users_in_group_repository.add_users(
-                new_group.id, user_role_pairs
+            self.email_service.nouveau_groupe_email(
+                recipients=[admin_user.email],
+                group_name=new_group.name,
+                service_provider_name=service_provider.name,
+                service_provider_url=service_provider.url,
+                group_admin_email=admin_user.email,
             )
 
         return new_group
 
+    async def get_group_etag(self, group_id: int) -> str:
+        """
+        ETag of a group, derived from its version counter which is bumped on every write (see migrations).
+        The service provider is part of the ETag since scopes and contract differ between service providers.
+        """
+        version = await self.groups_repository.get_version(
+            group_id, self.service_provider_id
+        )
+        if version is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Group with ID {group_id} not found, are you certain it exists and you can use it ?",
+            )
+        return make_etag(self.service_provider_id, group_id, version)
+
+    async def get_groups_etag(self) -> str:
+        """
+        ETag of the list of groups of the service provider.
+        """
+        digest = await self.groups_repository.get_all_versions_digest(
+            self.service_provider_id
+        )
+        return make_etag(self.service_provider_id, digest)
+
     async def list_groups(self) -> list[GroupWithScopesResponse]:
         return await self.groups_repository.get_all(self.service_provider_id)
 
@@ -129,6 +179,14 @@ class GroupsService:
             contract_description, self.service_provider_id
         )
 
+    async def search_groups_by_scope(self, scope: str) -> list[GroupWithScopesResponse]:
+        """
+        Search for groups that have a given scope on the service provider.
+        """
+        return await self.groups_repository.search_by_scope(
+            scope, self.service_provider_id
+        )
+
     async def search_groups_by_organisation_siret(
         self, siret: Siret | None
     ) -> list[OrganisationGroupResponse]:
@@ -140,36 +198,43 @@ class GroupsService:
         """
         Search for groups by organisation siret.
         """
-        groups_by_siret = await self.groups_repository.search_by_organisation_siret(
+        return await self.groups_repository.search_by_organisation_siret(
             siret, self.service_provider_id
         )
 
-        return [OrganisationGroupResponse(**dict(group)) for group in groups_by_siret]
-
     async def search_groups(
         self, user_sub: UUID
     ) -> list[GroupWithUsersAndScopesResponse]:
         """
-        Search for groups by user email.
+        Search for groups by user sub.
 
         This method will return all groups that the user is a member of, regardless of their role.
-        """
 
-        user = await self.users_service.get_user_by_sub(user_sub)
-        groups = await self.groups_repository.search_by_user(
-            user.id, self.service_provider_id
+        Groups and members are fetched in a single query. Members are built without validation
+        (model_construct) as they come straight from the database.
+        """
+        rows = await self.groups_repository.search_by_user_sub_with_users(
+            user_sub, self.service_provider_id
         )
 
-        # Batch fetch users for all groups
-        group_ids = [g.id for g in groups]
-        users_by_group = await self.users_service.get_users_by_group_ids(group_ids)
+        if not rows:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found, either it does not exist or it is not verified",
+            )
 
         groupsWithUsers = []
-        for g in groups:
-            # Python's dict() function does not include dynamically added attributes
-            # so we have to manually create a dict then a new object
-            g_dict = dict(g)
-            g_dict["users"] = users_by_group.get(g.id, [])
+        for row in rows:
+            # user exists but is not part of any group
+            if row["id"] is None:
+                continue
+
+            g_dict = dict(row)
+            del g_dict["acting_user_id"]
+            g_dict["users"] = [
+                UserWithRoleResponse.model_construct(**user)
+                for user in json.loads(row["users"] or "[]")
+            ]
             groupsWithUsers.append(GroupWithUsersAndScopesResponse(**g_dict))
         return groupsWithUsers
 
@@ -190,6 +255,7 @@ class GroupsService:
         )
 
         group_dict["scopes"] = scopes_and_contract.scopes
+        group_dict["scope_list"] = scopes_and_contract.scope_list
         group_dict["contract_description"] = scopes_and_contract.contract_description
         group_dict["contract_url"] = scopes_and_contract.contract_url
 
@@ -207,28 +273,33 @@ class GroupsService:
         user_email: EmailStr | None = None,
         user_id: int | None = None,
     ):
-        if user_email is not None:
-            user = await self.users_service.create_user_if_doesnt_exist(
-                UserCreate(email=user_email)
-            )
-        elif user_id is not None:
-            user = await self.users_service.get_user_by_id(user_id)
-        else:
+        if user_email is None and user_id is None:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="You must provide either user_email or user_id.",
             )
 
-        role = await self.roles_service.get_roles_by_id(role_id)
-        group = await self.get_group_with_users_and_scopes(group_id)
+        # the user is not created if it cannot be added to the group
+        async with self.db_session.transaction():
+            if user_email is not None:
+                user = await self.users_service.create_user_if_doesnt_exist(
+                    UserCreate(email=user_email)
+                )
+            else:
+                user = await self.users_service.get_user_by_id(user_id)
 
-        if self.is_user_in_group(group, user.id):
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail=f"User with ID {user.id} is already in group {group_id}",
-            )
+            role = await self.roles_service.get_roles_by_id(role_id)
+            group = await self.get_group_with_users_and_scopes(group_id)
 
-        await self.users_in_group_repository.add_users(group.id, [(user.id, role.id)])
+            if self.is_user_in_group(group, user.id):
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail=f"User with ID {user.id} is already in group {group_id}",
+                )
+
+            await self.users_in_group_repository.add_users(
+                group.id, [(user.id, role.id)]
+            )
 
         service_provider = (
             await self.service_provider_service.get_service_provider_by_id(
@@ -245,7 +316,6 @@ class GroupsService:
                 group_admin_email=self.get_first_admin_email(group),
             )
 
-        role = await self.roles_service.get_roles_by_id(role.id)
         return UserInGroupResponse(
             **dict(user),
             role_id=role.id,
@@ -0,0 +1,87 @@
+from fastapi import HTTPException, status
+
+from src.model import (
+    ChildGroupCreate,
+    EffectiveMemberResponse,
+    GroupDescendantResponse,
+    GroupEffectiveScopesResponse,
+    ParentChildResponse,
+)
+from src.repositories.hierarchy import GroupHierarchyRepository
+from src.services.groups import GroupsService
+
+
+class GroupHierarchyService:
+    """
+    Service class for nested groups (ex: ministry -> directorates -> teams).
+
+    - the members of a child group are effective members of all its ancestors
+    - a child group inherits the scopes of its parent when the relation has inherit_scopes
+
+    Like GroupsService, it is used in the context of a service provider : both groups of a relation must be linked to it.
+    """
+
+    def __init__(
+        self,
+        hierarchy_repository: GroupHierarchyRepository,
+        groups_service: GroupsService,
+    ):
+        self.hierarchy_repository = hierarchy_repository
+        self.groups_service = groups_service
+        self.service_provider_id = groups_service.service_provider_id
+
+    async def add_child(
+        self, parent_group_id: int, child: ChildGroupCreate
+    ) -> ParentChildResponse:
+        # verify both groups exist and are linked to the service provider
+        await self.groups_service.get_group_by_id(parent_group_id)
+        await self.groups_service.get_group_by_id(child.child_group_id)
+
+        relation = await self.hierarchy_repository.add_child(
+            parent_group_id, child.child_group_id, child.inherit_scopes
+        )
+        if not relation:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Group {child.child_group_id} cannot be a child of group {parent_group_id}, it would create a cycle.",
+            )
+        return ParentChildResponse.model_validate(relation)
+
+    async def remove_child(self, parent_group_id: int, child_group_id: int) -> None:
+        # verify both groups exist and are linked to the service provider
+        await self.groups_service.get_group_by_id(parent_group_id)
+        await self.groups_service.get_group_by_id(child_group_id)
+
+        removed = await self.hierarchy_repository.remove_child(
+            parent_group_id, child_group_id
+        )
+        if not removed:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Group {child_group_id} is not a child of group {parent_group_id}",
+            )
+
+    async def get_descendants(self, group_id: int) -> list[GroupDescendantResponse]:
+        await self.groups_service.get_group_by_id(group_id)
+        return await self.hierarchy_repository.get_descendants(
+            group_id, self.service_provider_id
+        )
+
+    async def get_effective_members(
+        self, group_id: int
+    ) -> list[EffectiveMemberResponse]:
+        await self.groups_service.get_group_by_id(group_id)
+        return await self.hierarchy_repository.get_effective_members(
+            group_id, self.service_provider_id
+        )
+
+    async def get_effective_scopes(self, group_id: int) -> GroupEffectiveScopesResponse:
+        await self.groups_service.get_group_by_id(group_id)
+        scopes = await self.hierarchy_repository.get_effective_scopes(
+            group_id, self.service_provider_id
+        )
+        return GroupEffectiveScopesResponse(
+            group_id=group_id,
+            scopes=scopes["scopes"],
+            inherited_from=scopes["inherited_from"],
+        )
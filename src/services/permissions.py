@@ -0,0 +1,36 @@
+from fastapi import HTTPException, status
+from pydantic import UUID4
+
+from src.model import EffectivePermissionsResponse
+from src.repositories.permissions import PermissionsRepository
+
+
+class PermissionsService:
+    """
+    Effective permissions of users on a service provider, for authorization decisions.
+    """
+
+    def __init__(
+        self, permissions_repository: PermissionsRepository, service_provider_id: int
+    ):
+        self.permissions_repository = permissions_repository
+        self.service_provider_id = service_provider_id
+
+    async def get_effective_permissions(
+        self, user_sub: UUID4
+    ) -> EffectivePermissionsResponse:
+        permissions = await self.permissions_repository.get_by_user_sub(
+            user_sub, self.service_provider_id
+        )
+        if not permissions:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found, either it does not exist or it is not verified",
+            )
+
+        return EffectivePermissionsResponse.model_construct(
+            user_id=permissions["user_id"],
+            service_provider_id=self.service_provider_id,
+            scopes=permissions["scopes"] or [],
+            group_ids=permissions["group_ids"] or [],
+        )
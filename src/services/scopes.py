@@ -21,6 +21,7 @@ class ScopesService:
 
         return ScopeBase(
             scopes=(scopes_response.scopes or "") if scopes_response else "",
+            scope_list=scopes_response.scope_list if scopes_response else [],
             contract_description=(scopes_response.contract_description or "")
             if scopes_response
             else "",
@@ -0,0 +1,234 @@
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import time
+from collections import defaultdict
+from typing import Any
+
+import httpx
+from databases import Database
+
+from src.config import settings
+from src.database import DatabaseWithSchema, database, startup
+from src.model import LOG_ACTIONS
+from src.repositories.webhooks import WebhooksRepository
+
+logger = logging.getLogger(__name__)
+
+SIGNATURE_HEADER = "X-Roles-Signature-256"
+TIMESTAMP_HEADER = "X-Roles-Timestamp"
+
+BACKOFF_BASE_SECONDS = 10
+BACKOFF_MAX_SECONDS = 3600
+
+
+def sign(secret: str, timestamp: int, body: bytes) -> str:
+    """
+    HMAC SHA256 signature of a delivery, same format as DataPass' X-Hub-Signature-256.
+    The timestamp is signed along with the body so that receivers can reject replayed deliveries.
+    """
+    message = str(timestamp).encode("utf-8") + b"." + body
+    return (
+        "sha256="
+        + hmac.new(secret.encode("utf-8"), message, hashlib.sha256).hexdigest()
+    )
+
+
+def backoff_delay(attempts: int) -> float:
+    """
+    Delay before the next attempt, after `attempts` failed attempts : 10s, 20s, 40s... up to one hour.
+    """
+    return min(BACKOFF_BASE_SECONDS * 2 ** max(attempts - 1, 0), BACKOFF_MAX_SECONDS)
+
+
+class WebhooksService:
+    """
+    Notifies service providers of the changes on their groups.
+
+    Like LogsService, it requires the database session of the current transaction.
+    """
+
+    def __init__(self, webhooks_repository: WebhooksRepository):
+        self.webhooks_repository = webhooks_repository
+
+    async def notify(
+        self,
+        event_type: LOG_ACTIONS,
+        group_id: int,
+        db_session: Database,
+        payloads: list[dict[str, Any]],
+        service_provider_id: int | None = None,
+    ) -> None:
+        """
+        Enqueue one event per payload for the service providers of the group,
+        or only for `service_provider_id` when the change concerns a single service provider (ex: scopes).
+        """
+        await self.webhooks_repository.enqueue(
+            event_type,
+            group_id,
+            payloads,
+            db_session=db_session,
+            service_provider_id=service_provider_id,
+        )
+
+
+class WebhooksDispatcher:
+    """
+    Sends the pending deliveries of the webhook_deliveries queue.
+
+    Deliveries are batched by service provider : one signed POST per service provider, with all its pending events.
+    A failed batch is retried with an exponential backoff, until `max_attempts` is reached.
+    Deliveries that reached `max_attempts` are never claimed again.
+
+    Delivery is at least once, and retries may reorder events : receivers should dedupe on the event `id`
+    and, when order matters, read the current state of the group from the API.
+    """
+
+    def __init__(
+        self,
+        webhooks_repository: WebhooksRepository,
+        http_client: httpx.AsyncClient,
+        batch_size: int,
+        max_attempts: int,
+        timeout_seconds: float,
+    ):
+        self.webhooks_repository = webhooks_repository
+        self.http_client = http_client
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.timeout_seconds = timeout_seconds
+
+    async def dispatch_once(self) -> int:
+        """
+        Claim and send one batch of pending deliveries. Returns the number of claimed deliveries.
+        """
+        deliveries = await self.webhooks_repository.claim_pending(
+            self.batch_size,
+            # leave enough time to send every batch before another worker can claim them again
+            lease_seconds=self.timeout_seconds * 2,
+            max_attempts=self.max_attempts,
+        )
+
+        by_service_provider = defaultdict(list)
+        for delivery in deliveries:
+            by_service_provider[delivery["service_provider_id"]].append(delivery)
+
+        # a batch failing to be marked does not stop the others : it is claimed again once its lease expires
+        results = await asyncio.gather(
+            *(self.send(batch) for batch in by_service_provider.values()),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error("Webhooks batch failed", exc_info=result)
+        return len(deliveries)
+
+    async def send(self, batch) -> None:
+        ids = [delivery["id"] for delivery in batch]
+        webhook_url = batch[0]["webhook_url"]
+        webhook_secret = batch[0]["webhook_secret"]
+
+        if not webhook_url:
+            # webhook removed since the deliveries were enqueued
+            await self.webhooks_repository.mark_failed(ids, "No webhook URL")
+            return
+
+        body = json.dumps(
+            {
+                "events": [
+                    {
+                        "id": delivery["id"],
+                        "event_type": delivery["event_type"],
+                        "group_id": delivery["group_id"],
+                        "data": json.loads(delivery["payload"]),
+                        "created_at": delivery["created_at"].isoformat(),
+                    }
+                    for delivery in batch
+                ]
+            }
+        ).encode("utf-8")
+
+        timestamp = int(time.time())
+        headers = {"Content-Type": "application/json", TIMESTAMP_HEADER: str(timestamp)}
+        if webhook_secret:
+            headers[SIGNATURE_HEADER] = sign(webhook_secret, timestamp, body)
+
+        try:
+            response = await self.http_client.post(
+                webhook_url, content=body, headers=headers, timeout=self.timeout_seconds
+            )
+            response.raise_for_status()
+        except Exception as e:
+            # any error, ex: an invalid URL, is a failed attempt of the batch
+            await self.handle_failure(batch, f"{type(e).__name__}: {e}")
+            return
+
+        await self.webhooks_repository.mark_delivered(ids)
+
+    async def handle_failure(self, batch, error: str) -> None:
+        exhausted = []
+        retries = defaultdict(list)
+        for delivery in batch:
+            if delivery["attempts"] >= self.max_attempts:
+                exhausted.append(delivery["id"])
+            else:
+                retries[delivery["attempts"]].append(delivery["id"])
+
+        if exhausted:
+            await self.webhooks_repository.mark_failed(exhausted, error)
+        for attempts, ids in retries.items():
+            await self.webhooks_repository.mark_for_retry(
+                ids, error, backoff_delay(attempts)
+            )
+
+    async def run(self, poll_interval_seconds: float) -> None:
+        while True:
+            try:
+                claimed = await self.dispatch_once()
+            except Exception:
+                logger.exception("Webhooks dispatch failed")
+                claimed = 0
+
+            # keep going while the queue is full, otherwise wait for new deliveries
+            if claimed < self.batch_size:
+                await asyncio.sleep(poll_interval_seconds)
+
+
+_dispatcher: WebhooksDispatcher | None = None
+_dispatcher_task: asyncio.Task | None = None
+
+
+async def start_webhooks_dispatcher() -> None:
+    """
+    Start the webhooks dispatcher in the background of the current worker, if enabled.
+    Every worker may run one : deliveries are claimed with SKIP LOCKED, so they are never sent twice concurrently.
+    """
+    global _dispatcher, _dispatcher_task
+    if not settings.WEBHOOKS_DISPATCHER_ENABLED or _dispatcher_task:
+        return
+
+    await startup()
+    _dispatcher = WebhooksDispatcher(
+        WebhooksRepository(DatabaseWithSchema(database, settings.DB_SCHEMA)),
+        httpx.AsyncClient(),
+        batch_size=settings.WEBHOOKS_BATCH_SIZE,
+        max_attempts=settings.WEBHOOKS_MAX_ATTEMPTS,
+        timeout_seconds=settings.WEBHOOKS_TIMEOUT_SECONDS,
+    )
+    _dispatcher_task = asyncio.create_task(
+        _dispatcher.run(settings.WEBHOOKS_POLL_INTERVAL_SECONDS)
+    )
+
+
+async def stop_webhooks_dispatcher() -> None:
+    global _dispatcher, _dispatcher_task
+    if _dispatcher_task:
+        _dispatcher_task.cancel()
+        try:
+            await _dispatcher_task
+        except asyncio.CancelledError:
+            pass
+        await _dispatcher.http_client.aclose()
+        _dispatcher, _dispatcher_task = None, None
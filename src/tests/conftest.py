@@ -8,7 +8,7 @@ from fastapi.testclient import TestClient
 from pydantic import UUID4, EmailStr
 
 from src.config import settings
-from src.database import DatabaseWithSchema, get_db
+from src.database import DatabaseWithSchema, database_options, get_db
 from src.dependencies.auth.o_auth import decode_access_token
 from src.dependencies.auth.pro_connect_resource_server import (
     ALLOWED_PATHS_FOR_NO_EMAIL_PAIRING,
@@ -19,11 +19,18 @@ from src.main import app
 from src.repositories.users_sub import UserSubsRepository
 from src.services.user_subs import UserSubsService
 
+# query_budget marker and fixture (hooks are only collected from the conftest namespace)
+from src.tests.query_budget import (  # noqa: F401
+    pytest_configure,
+    pytest_runtest_call,
+    query_budget,
+)
+
 # Create bearer scheme for testing
 bearer_scheme = HTTPBearer()
 
 # Create a test database instance
-test_db = Database(settings.DATABASE_URL)
+test_db = Database(settings.DATABASE_URL, **database_options())
 
 if settings.DB_ENV != "test":
     # Use a different port for the test database
@@ -177,3 +184,26 @@ def client(test_override_setup):
     """Test client using the overridden database connection"""
     with TestClient(app) as client:
         yield client
+
+
+@pytest.fixture
+def call_with_db_session(client):
+    """Call an async function with a session on the test database, in the event loop of the test client"""
+    db_session = DatabaseWithSchema(test_db, settings.DB_SCHEMA)
+
+    def call(function, *args):
+        return client.portal.call(function, db_session, *args)
+
+    return call
+
+
+@pytest.fixture
+def execute_sql(call_with_db_session):
+    """Run a statement on the test database (writes no route exposes)"""
+
+    def execute(query: str, values: dict | None = None):
+        return call_with_db_session(
+            lambda db_session: db_session.execute(query, values)
+        )
+
+    return execute
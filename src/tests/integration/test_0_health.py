@@ -1,3 +1,7 @@
+from src.config import settings
+from src.database import DatabaseBusyError, DatabaseWithSchema
+
+
 def test_health_check(client):
     response = client.get("/health/")
     assert response.status_code == 200
@@ -5,3 +9,43 @@ def test_health_check(client):
     json = response.json()
     assert json["status"] == "healthy"
     assert json["database"] == "connected"
+
+
+def test_metrics(client):
+    client.get("/health/")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+
+    metrics = response.text
+    assert (
+        'http_request_duration_seconds_count{method="GET",route="/health/",status="200"}'
+        in metrics
+    )
+    assert 'db_queries_per_request_count{route="/health/"}' in metrics
+    assert 'db_query_duration_seconds_count{operation="fetch_one"}' in metrics
+    # the tests use their own database, the pool of the app is not connected
+    assert "# TYPE db_pool_connections gauge" in metrics
+
+
+def test_metrics_require_a_token_in_production(client, monkeypatch):
+    monkeypatch.setattr(settings, "DB_ENV", "prod")
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "")
+    assert client.get("/metrics").status_code == 404
+
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "token")
+    assert client.get("/metrics").status_code == 401
+    response = client.get("/metrics", headers={"Authorization": "Bearer token"})
+    assert response.status_code == 200
+
+
+def test_database_busy_returns_503(client, monkeypatch):
+    async def busy(*_args, **_kwargs):
+        raise DatabaseBusyError("No database connection available after 5.0s")
+
+    monkeypatch.setattr(DatabaseWithSchema, "fetch_one", busy)
+
+    response = client.get("/groups/1")
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
@@ -0,0 +1,141 @@
+import json
+
+from src.config import settings
+from src.tests.helpers import create_group, mock_session
+
+
+def get_all_changes(client, since=0):
+    changes = []
+    has_more = True
+    while has_more:
+        response = client.get(f"/changes/?since={since}&limit=50")
+        assert response.status_code == 200
+        page = response.json()
+        changes += page["changes"]
+        since = page["next_cursor"]
+        has_more = page["has_more"]
+    return changes, since
+
+
+def test_list_changes(client):
+    """Test the change feed on groups, members and scopes."""
+    _, cursor = get_all_changes(client)
+
+    new_group_data = create_group(client)
+    group_id = new_group_data["id"]
+
+    response = client.patch(f"/groups/{group_id}/scopes?scopes=read")
+    assert response.status_code == 200
+
+    changes, next_cursor = get_all_changes(client, since=cursor)
+    assert next_cursor > cursor
+
+    group_changes = [c for c in changes if c["group_id"] == group_id]
+    actions = [c["action_type"] for c in group_changes]
+    assert actions[0] == "CREATE_GROUP"
+    assert "ADD_USER_TO_GROUP" in actions
+    assert actions[-1] == "UPDATE_GROUP_SERVICE_PROVIDER_RELATION"
+    assert group_changes[-1]["new_values"]["scopes"] == "read"
+
+    # cursors are increasing
+    cursors = [c["cursor"] for c in changes]
+    assert cursors == sorted(cursors)
+
+    # nothing new since the last cursor
+    response = client.get(f"/changes/?since={next_cursor}")
+    assert response.status_code == 200
+    assert response.json() == {
+        "changes": [],
+        "next_cursor": next_cursor,
+        "has_more": False,
+    }
+
+
+def test_list_changes_pagination(client):
+    """Test the change feed is paginated."""
+    response = client.get("/changes/?since=0&limit=1")
+    assert response.status_code == 200
+    page = response.json()
+    assert len(page["changes"]) == 1
+    assert page["has_more"] is True
+    assert page["next_cursor"] == page["changes"][0]["cursor"]
+
+
+def test_list_changes_keeps_deleted_groups(client):
+    """Test the change feed still returns a group, and its deletion, once the group is deleted."""
+    _, cursor = get_all_changes(client)
+
+    admin_email = settings.SUPER_ADMIN_EMAILS.split(" ")[0]
+    group_id = create_group(client)["id"]
+    response = client.patch(f"/groups/{group_id}/scopes?scopes=read")
+    assert response.status_code == 200
+
+    with mock_session(
+        {"user_email": admin_email, "is_admin": True, "is_super_admin": True}
+    ):
+        response = client.delete(f"/admin/groups/{group_id}", follow_redirects=False)
+    assert response.status_code == 303
+
+    changes, _ = get_all_changes(client, since=cursor)
+
+    group_changes = [c for c in changes if c["group_id"] == group_id]
+    actions = [c["action_type"] for c in group_changes]
+    assert actions[0] == "CREATE_GROUP"
+    assert "UPDATE_GROUP_SERVICE_PROVIDER_RELATION" in actions
+    assert actions[-1] == "DELETE_GROUP"
+
+
+def test_list_changes_hides_other_service_providers_values(client, execute_sql):
+    """Test the values specific to another service provider are removed from its entries on a shared group."""
+    _, cursor = get_all_changes(client)
+
+    group_id = create_group(client)["id"]
+    # entry written by another service provider (DataPass, seeded in the test database)
+    execute_sql(
+        """
+        INSERT INTO audit_logs (service_provider_id, service_account_id, action_type, resource_type, resource_id, new_values)
+        VALUES (999, 0, 'CREATE_GROUP', 'GROUP', :group_id, :new_values)
+        """,
+        {
+            "group_id": group_id,
+            "new_values": json.dumps(
+                {
+                    "name": "Groupe partagé",
+                    "scopes": "secret",
+                    "contract_description": "contrat DataPass",
+                    "contract_url": "https://example.com/datapass",
+                }
+            ),
+        },
+    )
+
+    changes, _ = get_all_changes(client, since=cursor)
+
+    group_changes = [c for c in changes if c["group_id"] == group_id]
+    # the entry written by the service provider itself is returned as is
+    assert group_changes[0]["new_values"]["scopes"] == "read maintain"
+    assert group_changes[-1]["new_values"] == {"name": "Groupe partagé"}
+
+
+def test_list_changes_logs_deleted_users(client, execute_sql):
+    """Test the deletion of a user by an admin appears as its removal from each of its groups."""
+    _, cursor = get_all_changes(client)
+
+    admin_email = settings.SUPER_ADMIN_EMAILS.split(" ")[0]
+    group = create_group(client)
+    user_id = execute_sql(
+        "SELECT id FROM users WHERE email = :email",
+        {"email": group["members"][0]["email"]},
+    )
+
+    with mock_session(
+        {"user_email": admin_email, "is_admin": True, "is_super_admin": True}
+    ):
+        response = client.delete(f"/admin/users/{user_id}", follow_redirects=False)
+    assert response.status_code == 303
+
+    changes, _ = get_all_changes(client, since=cursor)
+
+    group_changes = [c for c in changes if c["group_id"] == group["id"]]
+    assert group_changes[-1]["action_type"] == "REMOVE_USER_FROM_GROUP"
+    assert group_changes[-1]["new_values"] == {"user_id": user_id}
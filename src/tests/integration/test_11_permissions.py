@@ -0,0 +1,36 @@
+from src.tests.helpers import (
+    create_group,
+    random_sub_pro_connect,
+    random_user,
+    resource_server_auth_headers,
+)
+
+
+def test_effective_permissions(client):
+    """Test effective permissions are the union of the scopes of the user's groups."""
+    user = random_user()
+
+    first_group = create_group(client, admin_email=user["email"])
+    second_group = create_group(client, admin_email=user["email"])
+
+    # pair the user email with its sub
+    headers = resource_server_auth_headers(user["sub_pro_connect"], user["email"])
+    response = client.get("/resource-server/groups/", headers=headers)
+    assert response.status_code == 200
+
+    response = client.patch(f"/groups/{first_group['id']}/scopes?scopes=read,write")
+    assert response.status_code == 200
+    response = client.patch(f"/groups/{second_group['id']}/scopes?scopes=write admin")
+    assert response.status_code == 200
+
+    response = client.get(f"/permissions/{user['sub_pro_connect']}")
+    assert response.status_code == 200
+    permissions = response.json()
+    assert permissions["service_provider_id"] == 1
+    assert permissions["scopes"] == ["admin", "read", "write"]
+    assert permissions["group_ids"] == [first_group["id"], second_group["id"]]
+
+
+def test_effective_permissions_unknown_user(client):
+    response = client.get(f"/permissions/{random_sub_pro_connect()}")
+    assert response.status_code == 404
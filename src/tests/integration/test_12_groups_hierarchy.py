@@ -0,0 +1,162 @@
+from src.tests.helpers import (
+    create_group,
+    random_user,
+    resource_server_auth_headers,
+)
+
+# DataPass, seeded in the test database
+OTHER_SERVICE_PROVIDER_ID = 999
+
+
+def create_hierarchy(client):
+    """ministry -> directorate -> team, the team inherits the scopes of the directorate only"""
+    ministry = create_group(client)
+    directorate = create_group(client)
+    team = create_group(client)
+
+    response = client.post(
+        f"/groups/{ministry['id']}/children",
+        json={"child_group_id": directorate["id"], "inherit_scopes": False},
+    )
+    assert response.status_code == 201
+    response = client.post(
+        f"/groups/{directorate['id']}/children",
+        json={"child_group_id": team["id"], "inherit_scopes": True},
+    )
+    assert response.status_code == 201
+    assert response.json() == {
+        "parent_group_id": directorate["id"],
+        "child_group_id": team["id"],
+        "inherit_scopes": True,
+    }
+
+    return ministry, directorate, team
+
+
+def test_descendants_and_effective_members(client):
+    ministry, directorate, team = create_hierarchy(client)
+
+    response = client.get(f"/groups/{ministry['id']}/descendants")
+    assert response.status_code == 200
+    assert [(g["id"], g["depth"]) for g in response.json()] == [
+        (directorate["id"], 1),
+        (team["id"], 2),
+    ]
+
+    response = client.get(f"/groups/{ministry['id']}/effective-members")
+    assert response.status_code == 200
+    members = {(m["email"], m["group_id"]) for m in response.json()}
+    assert (team["admin"]["email"], team["id"]) in members
+    assert (ministry["admin"]["email"], ministry["id"]) in members
+
+
+def test_hierarchy_rejects_cycles(client):
+    ministry, _, team = create_hierarchy(client)
+
+    response = client.post(
+        f"/groups/{team['id']}/children", json={"child_group_id": ministry["id"]}
+    )
+    assert response.status_code == 400
+
+    response = client.post(
+        f"/groups/{team['id']}/children", json={"child_group_id": team["id"]}
+    )
+    assert response.status_code == 400
+
+
+def test_inherited_scopes(client):
+    user = random_user()
+    ministry, directorate, team = create_hierarchy(client)
+    member_group = create_group(client, admin_email=user["email"])
+
+    client.patch(f"/groups/{ministry['id']}/scopes?scopes=ministere")
+    client.patch(f"/groups/{directorate['id']}/scopes?scopes=direction")
+    client.patch(f"/groups/{team['id']}/scopes?scopes=equipe")
+
+    response = client.get(f"/groups/{team['id']}/effective-scopes")
+    assert response.status_code == 200
+    assert response.json() == {
+        "group_id": team["id"],
+        "scopes": ["direction", "equipe"],
+        "inherited_from": [directorate["id"]],
+    }
+
+    # effective permissions follow the hierarchy
+    headers = resource_server_auth_headers(user["sub_pro_connect"], user["email"])
+    client.get("/resource-server/groups/", headers=headers)
+    client.patch(f"/groups/{member_group['id']}/scopes?scopes=")
+    response = client.post(
+        f"/groups/{team['id']}/children",
+        json={"child_group_id": member_group["id"], "inherit_scopes": True},
+    )
+    assert response.status_code == 201
+
+    response = client.get(f"/permissions/{user['sub_pro_connect']}")
+    assert response.json()["scopes"] == ["direction", "equipe"]
+
+    response = client.delete(f"/groups/{team['id']}/children/{member_group['id']}")
+    assert response.status_code == 204
+
+    response = client.get(f"/permissions/{user['sub_pro_connect']}")
+    assert response.json()["scopes"] == []
+
+
+def test_no_inherited_scopes_from_other_service_providers(client, execute_sql):
+    """A group nested under a group shared with another service provider does not get its scopes."""
+    user = random_user()
+    parent = create_group(client)
+    member_group = create_group(client, admin_email=user["email"])
+
+    client.patch(f"/groups/{parent['id']}/scopes?scopes=parent")
+    execute_sql(
+        """
+        INSERT INTO group_service_provider_relations (service_provider_id, group_id, scopes)
+        VALUES (:service_provider_id, :group_id, 'datapass')
+        """,
+        {"service_provider_id": OTHER_SERVICE_PROVIDER_ID, "group_id": parent["id"]},
+    )
+
+    headers = resource_server_auth_headers(user["sub_pro_connect"], user["email"])
+    client.get("/resource-server/groups/", headers=headers)
+    response = client.post(
+        f"/groups/{parent['id']}/children",
+        json={"child_group_id": member_group["id"], "inherit_scopes": True},
+    )
+    assert response.status_code == 201
+
+    response = client.get(f"/permissions/{user['sub_pro_connect']}")
+    assert "parent" in response.json()["scopes"]
+
+    # the parent scopes of the other service provider are not inherited
+    count = execute_sql(
+        """
+        SELECT count(*) FROM effective_permissions AS EP
+        INNER JOIN users AS U ON U.id = EP.user_id
+        WHERE U.email = :email AND EP.service_provider_id = :service_provider_id
+        """,
+        {"email": user["email"], "service_provider_id": OTHER_SERVICE_PROVIDER_ID},
+    )
+    assert count == 0
+
+
+def test_remove_child_of_another_service_provider(client, execute_sql):
+    """A relation cannot be removed when the child group is not linked to the service provider."""
+    parent = create_group(client)
+    child = create_group(client)
+    execute_sql(
+        """
+        UPDATE group_service_provider_relations SET service_provider_id = :service_provider_id
+        WHERE group_id = :group_id
+        """,
+        {"service_provider_id": OTHER_SERVICE_PROVIDER_ID, "group_id": child["id"]},
+    )
+    execute_sql(
+        """
+        INSERT INTO parent_child_relations (parent_group_id, child_group_id)
+        VALUES (:parent_group_id, :child_group_id)
+        """,
+        {"parent_group_id": parent["id"], "child_group_id": child["id"]},
+    )
+
+    response = client.delete(f"/groups/{parent['id']}/children/{child['id']}")
+    assert response.status_code == 404
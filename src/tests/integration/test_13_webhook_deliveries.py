@@ -0,0 +1,138 @@
+from src.config import settings
+from src.model import LOG_ACTIONS
+from src.repositories.webhooks import WebhooksRepository
+from src.tests.helpers import create_group, mock_session, random_name
+
+
+def admin_session():
+    return mock_session(
+        {
+            "user_email": settings.SUPER_ADMIN_EMAILS.split(" ")[0],
+            "is_admin": True,
+            "is_super_admin": True,
+        }
+    )
+
+
+def create_service_provider(client, **form):
+    with admin_session():
+        response = client.post(
+            "/admin/service-providers/create",
+            data={"name": random_name(), "url": "https://example.com", **form},
+            follow_redirects=False,
+        )
+    assert response.status_code == 303
+    return int(response.headers["location"].split("/")[-1])
+
+
+def get_service_provider(call_with_db_session, service_provider_id):
+    return call_with_db_session(
+        lambda db_session: db_session.fetch_one(
+            "SELECT * FROM service_providers WHERE id = :id",
+            {"id": service_provider_id},
+        )
+    )
+
+
+def test_admin_sets_service_provider_webhook(client, call_with_db_session):
+    """Test the webhook URL and secret are written by the admin service provider forms."""
+    service_provider_id = create_service_provider(
+        client,
+        webhook_url="https://example.com/webhook",
+        webhook_secret="secret",
+    )
+
+    service_provider = get_service_provider(call_with_db_session, service_provider_id)
+    assert service_provider["webhook_url"] == "https://example.com/webhook"
+    assert service_provider["webhook_secret"] == "secret"
+
+    update_url = f"/admin/service-providers/{service_provider_id}/update"
+    form = {"name": random_name(), "url": "https://example.com"}
+
+    # the secret is kept when left empty
+    with admin_session():
+        response = client.post(
+            update_url,
+            data={**form, "webhook_url": "https://example.com/hooks"},
+            follow_redirects=False,
+        )
+    assert response.status_code == 303
+    service_provider = get_service_provider(call_with_db_session, service_provider_id)
+    assert service_provider["webhook_url"] == "https://example.com/hooks"
+    assert service_provider["webhook_secret"] == "secret"
+
+    # and removed along with the URL
+    with admin_session():
+        response = client.post(update_url, data=form, follow_redirects=False)
+    assert response.status_code == 303
+    service_provider = get_service_provider(call_with_db_session, service_provider_id)
+    assert service_provider["webhook_url"] is None
+    assert service_provider["webhook_secret"] is None
+
+    with admin_session():
+        response = client.post(update_url, data={**form, "webhook_url": "not an url"})
+    assert response.status_code == 400
+
+
+def test_enqueue_and_claim_pending(client, call_with_db_session, execute_sql):
+    """Test the deliveries queue : enqueued for the service providers with a webhook, claimed until max_attempts."""
+    service_provider_id = create_service_provider(
+        client, webhook_url="https://example.com/webhook", webhook_secret="secret"
+    )
+    group_id = create_group(client)["id"]
+    execute_sql(
+        """
+        INSERT INTO group_service_provider_relations (service_provider_id, group_id, scopes)
+        VALUES (:service_provider_id, :group_id, '')
+        """,
+        {"service_provider_id": service_provider_id, "group_id": group_id},
+    )
+    repository = WebhooksRepository()
+
+    # one delivery per payload, only for the service providers with a webhook URL
+    call_with_db_session(
+        lambda db_session: repository.enqueue(
+            LOG_ACTIONS.ADD_USER_TO_GROUP,
+            group_id,
+            [{"user_id": 1}, {"user_id": 2}],
+            db_session=db_session,
+        )
+    )
+
+    def claim():
+        deliveries = call_with_db_session(
+            lambda db_session: WebhooksRepository(db_session).claim_pending(
+                100, lease_seconds=60, max_attempts=2
+            )
+        )
+        return [
+            delivery
+            for delivery in deliveries
+            if delivery["service_provider_id"] == service_provider_id
+        ]
+
+    deliveries = claim()
+    assert [delivery["group_id"] for delivery in deliveries] == [group_id, group_id]
+    assert [delivery["attempts"] for delivery in deliveries] == [1, 1]
+    assert deliveries[0]["event_type"] == "ADD_USER_TO_GROUP"
+    assert deliveries[0]["webhook_url"] == "https://example.com/webhook"
+    assert deliveries[0]["webhook_secret"] == "secret"
+    ids = [delivery["id"] for delivery in deliveries]
+
+    # leased : not claimed again before the lease expires
+    assert claim() == []
+
+    call_with_db_session(
+        lambda db_session: WebhooksRepository(db_session).mark_for_retry(
+            ids, "error", 0
+        )
+    )
+    assert [delivery["attempts"] for delivery in claim()] == [2, 2]
+
+    # max_attempts reached : never claimed again
+    call_with_db_session(
+        lambda db_session: WebhooksRepository(db_session).mark_for_retry(
+            ids, "error", 0
+        )
+    )
+    assert claim() == []
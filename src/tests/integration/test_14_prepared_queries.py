@@ -0,0 +1,77 @@
+import asyncio
+
+from databases import Database
+
+from src.config import settings
+from src.database import database_options
+from src.repositories.groups import GET_GROUP
+from src.tests.helpers import create_group
+
+
+def test_prepared_query_runs_through_the_pool(client, call_with_db_session):
+    """
+    Test a prepared query on a real connection of the pool : prepared when the connection opened,
+    run through asyncpg, rows behaving like the rows of `databases`.
+
+    Guards the private internals of asyncpg and `databases` src/database.py relies on.
+    """
+    group = create_group(client)
+
+    async def run(db_session):
+        row = await db_session.fetch_one(
+            GET_GROUP, {"id": group["id"], "service_provider_id": 1}
+        )
+        rows = await db_session.fetch_all(
+            GET_GROUP, {"id": group["id"], "service_provider_id": 1}
+        )
+        missing = await db_session.fetch_one(
+            GET_GROUP, {"id": 0, "service_provider_id": 1}
+        )
+        # same connection : the statement is among the ones prepared on it
+        prepared = await db_session.fetch_all(
+            "SELECT statement FROM pg_prepared_statements"
+        )
+        return row, rows, missing, [p["statement"] for p in prepared]
+
+    row, rows, missing, prepared = call_with_db_session(run)
+
+    assert row.id == group["id"]
+    assert row["name"] == group["name"]
+    assert dict(row) == {
+        "id": group["id"],
+        "name": group["name"],
+        "organisation_siret": group["organisation_siret"],
+    }
+    assert [dict(r) for r in rows] == [dict(row)]
+    assert missing is None
+    assert GET_GROUP.sql in prepared
+
+
+def test_prepared_connection_left_idle_runs_its_next_statement(client):
+    """
+    Test a connection left idle longer than the statement timeout once its statements are prepared :
+    its next statement must not be cancelled by the statement timeout armed while preparing.
+    """
+    options = database_options()
+
+    async def run():
+        database = Database(
+            settings.DATABASE_URL,
+            **{
+                **options,
+                "min_size": 1,
+                "max_size": 1,
+                "server_settings": {
+                    **options["server_settings"],
+                    "statement_timeout": "200",
+                },
+            },
+        )
+        await database.connect()
+        try:
+            await asyncio.sleep(0.5)
+            return await database.fetch_val("SELECT 1")
+        finally:
+            await database.disconnect()
+
+    assert client.portal.call(run) == 1
@@ -1,9 +1,14 @@
+import pytest
+
 from src.tests.helpers import (
     create_group,
+    get_group,
     random_group,
+    random_user,
 )
 
 
+@pytest.mark.query_budget(2)
 def test_list_groups(client):
     """Test listing all groups."""
     response = client.get("/groups/all")
@@ -68,12 +73,45 @@ def test_create_group(client):
     assert response.status_code == 400
 
 
-def test_get_group_with_users(client):
+def test_create_group_query_budget(client, query_budget):
+    """Test that a group is created in a few set-based statements, whatever its number of members."""
+    new_group_data = random_group()
+    new_group_data["members"] = [{"email": random_user()["email"]} for _ in range(10)]
+
+    # 12 statements, and 4 more when the reference data are loaded
+    with query_budget(16):
+        response = client.post("/groups/?no_acting_user=True", json=new_group_data)
+    assert response.status_code == 201
+
+    group = get_group(client, response.json()["id"])
+    assert len(group["users"]) == 11
+
+
+def test_create_group_admin_also_member(client):
+    """Test creating a group whose admin is also listed in the members."""
+    new_group_data = random_group()
+    new_group_data["members"].append(new_group_data["admin"])
+
+    response = client.post("/groups/?no_acting_user=True", json=new_group_data)
+    assert response.status_code == 201
+
+    group = get_group(client, response.json()["id"])
+    assert len(group["users"]) == 2
+    admin = next(
+        user
+        for user in group["users"]
+        if user["email"] == new_group_data["admin"]["email"]
+    )
+    assert admin["is_admin"]
+
+
+def test_get_group_with_users(client, query_budget):
     """Test retrieving a group with its users."""
     # Create a new group
     new_group_data = create_group(client)
 
-    response = client.get(f"/groups/{new_group_data['id']}")
+    with query_budget(4):
+        response = client.get(f"/groups/{new_group_data['id']}")
     assert response.status_code == 200
     group = response.json()
     assert group["name"] == new_group_data["name"]
@@ -90,3 +128,82 @@ def test_get_group_not_found(client):
     # Test non-existent group
     response = client.get("/groups/999999")
     assert response.status_code == 404
+
+
+def test_get_group_not_modified(client):
+    """Test conditional GET on a group with If-None-Match."""
+    new_group_data = create_group(client)
+    group_id = new_group_data["id"]
+
+    response = client.get(f"/groups/{group_id}")
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+
+    response = client.get(f"/groups/{group_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
+
+    # any write on the group changes its ETag
+    response = client.patch(f"/groups/{group_id}/scopes?scopes=read")
+    assert response.status_code == 200
+
+    response = client.get(f"/groups/{group_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["scopes"] == "read"
+    assert response.headers["ETag"] != etag
+
+
+def test_get_group_etag_covers_members_roles_and_organisation(client, execute_sql):
+    """The ETag covers the member emails, role names and organisation SIRET the group read returns."""
+    group_id = create_group(client)["id"]
+    group = get_group(client, group_id)
+    member = group["users"][-1]
+    siret = group["organisation_siret"]
+
+    # each write is followed by the one restoring the shared rows
+    writes = [
+        (
+            "UPDATE users SET email = :email WHERE id = :id",
+            {"email": f"renamed_{member['email']}", "id": member["id"]},
+        ),
+        (
+            "UPDATE roles SET role_name = role_name || ' (renamed)' WHERE id = :id",
+            {"id": member["role_id"]},
+        ),
+        (
+            "UPDATE roles SET role_name = :role_name WHERE id = :id",
+            {"role_name": member["role_name"], "id": member["role_id"]},
+        ),
+        (
+            "UPDATE organisations SET siret = '00000000000000' WHERE siret = :siret",
+            {"siret": siret},
+        ),
+        (
+            "UPDATE organisations SET siret = :siret WHERE siret = '00000000000000'",
+            {"siret": siret},
+        ),
+    ]
+    for query, values in writes:
+        etag = client.get(f"/groups/{group_id}").headers["ETag"]
+        execute_sql(query, values)
+
+        response = client.get(f"/groups/{group_id}", headers={"If-None-Match": etag})
+        assert response.status_code == 200, query
+        assert response.headers["ETag"] != etag
+
+
+def test_list_groups_not_modified(client):
+    """Test conditional GET on the list of groups with If-None-Match."""
+    response = client.get("/groups/all")
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+
+    response = client.get("/groups/all", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    create_group(client)
+
+    response = client.get("/groups/all", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
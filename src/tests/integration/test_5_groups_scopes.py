@@ -18,6 +18,7 @@ def test_update_scopes(client):
     assert response.status_code == 200
     group = response.json()
     assert group["scopes"] == new_scopes
+    assert group["scope_list"] == ["read", "write", "delete"]
     assert group["contract_description"] == new_contract
 
     new_contract_url = "https://example.com/contract"
@@ -31,3 +32,27 @@ def test_update_scopes(client):
     assert response.status_code == 200
     group = response.json()
     assert group["contract_url"] == new_contract_url
+
+
+def test_search_groups_by_scope(client):
+    """Test listing the groups having a scope."""
+    new_group_data = create_group(client)
+    other_group_data = create_group(client)
+
+    response = client.patch(
+        f"/groups/{new_group_data['id']}/scopes?scopes=read, scope_recherche"
+    )
+    assert response.status_code == 200
+
+    response = client.get("/groups/search?scope=scope_recherche")
+    assert response.status_code == 200
+    groups = response.json()
+    assert new_group_data["id"] in [g["id"] for g in groups]
+    assert other_group_data["id"] not in [g["id"] for g in groups]
+    group = next(g for g in groups if g["id"] == new_group_data["id"])
+    assert group["scope_list"] == ["read", "scope_recherche"]
+
+    # scopes are matched exactly, not as substrings
+    response = client.get("/groups/search?scope=scope")
+    assert response.status_code == 200
+    assert new_group_data["id"] not in [g["id"] for g in response.json()]
@@ -32,6 +32,32 @@ def test_list_groups_for_user(client):
     assert any(g["id"] == group["id"] for g in groups)
 
 
+def test_list_groups_for_user_includes_members_and_scopes(client):
+    """Test that listed groups embed their members with roles, and their scopes."""
+    user = random_user()
+    group = create_group(client, admin_email=user["email"])
+
+    headers = resource_server_auth_headers(user["sub_pro_connect"], user["email"])
+    response = client.get("/resource-server/groups/", headers=headers)
+
+    assert response.status_code == 200
+    listed_group = next(g for g in response.json() if g["id"] == group["id"])
+    assert listed_group["scopes"] == group["scopes"]
+    assert listed_group["organisation_siret"] == group["organisation_siret"]
+
+    admin = next(u for u in listed_group["users"] if u["email"] == user["email"])
+    assert admin["is_admin"] is True
+    assert admin["role_name"] == "administrateur"
+
+    member = next(
+        u
+        for u in listed_group["users"]
+        if u["email"] == group["members"][0]["email"]
+    )
+    assert member["is_admin"] is False
+    assert member["role_id"] == 2
+
+
 def test_list_groups_for_different_users(client):
     """Test that different users see different groups."""
     # Create two users with different groups
@@ -113,7 +139,7 @@ def test_update_group_name_unauthorized(client):
     assert response.status_code == 404
 
 
-def test_add_user_to_group_as_admin(client):
+def test_add_user_to_group_as_admin(client, query_budget):
     """Test that admin can add users to their group."""
     admin = random_user()
     new_member = random_user()
@@ -124,14 +150,15 @@ def test_add_user_to_group_as_admin(client):
 
     # Add new user to group
     headers = resource_server_auth_headers(admin["sub_pro_connect"], admin["email"])
-    response = client.post(
-        f"/resource-server/groups/{group_id}/users",
-        json={
-            "email": new_member["email"],
-            "role_id": 2,
-        },  # role_id=2 is usually "member"
-        headers=headers,
-    )
+    with query_budget(18):
+        response = client.post(
+            f"/resource-server/groups/{group_id}/users",
+            json={
+                "email": new_member["email"],
+                "role_id": 2,
+            },  # role_id=2 is usually "member"
+            headers=headers,
+        )
 
     assert response.status_code == 201
     user_in_group = response.json()
@@ -246,7 +273,7 @@ def test_update_user_role_unauthorized(client):
     assert response.status_code == 403
 
 
-def test_remove_user_from_group_as_admin(client):
+def test_remove_user_from_group_as_admin(client, query_budget):
     """Test that admin can remove users from their group."""
     admin = random_user()
     member = random_user()
@@ -269,10 +296,11 @@ def test_remove_user_from_group_as_admin(client):
     member_id = member_data["id"]
 
     # Remove member from group
-    response = client.delete(
-        f"/resource-server/groups/{group_id}/users/{member_id}",
-        headers=headers,
-    )
+    with query_budget(14):
+        response = client.delete(
+            f"/resource-server/groups/{group_id}/users/{member_id}",
+            headers=headers,
+        )
 
     assert response.status_code == 204
 
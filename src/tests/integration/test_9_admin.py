@@ -192,3 +192,10 @@ def test_viewer_admin_cannot_access_restricted_pages_or_write_actions(client):
         delete_user_response = client.delete("/admin/users/1", follow_redirects=False)
 
     assert delete_user_response.status_code == 403
+
+
+def test_admin_pages_redirect_to_login_without_session(client):
+    response = client.get("/admin/users/", follow_redirects=False)
+
+    assert response.status_code == 302
+    assert response.headers["location"] == "/admin/login"
@@ -0,0 +1,85 @@
+"""
+Query budget : fail a test when a request runs more SQL statements than declared.
+
+The budget applies to every request of a test :
+
+    @pytest.mark.query_budget(8)
+    def test_list_groups(client):
+        ...
+
+or only to the requests sent within a block, to leave the setup requests out :
+
+    def test_get_group(client, query_budget):
+        group = create_group(client)
+        with query_budget(6):
+            client.get(f"/groups/{group['id']}")
+
+Requests are sent through the `client` fixture. A request over budget fails the test, with its statements,
+their callers, and the statements run more than once.
+NB : the budget counts every round-trip, including the BEGIN and COMMIT of the transactions.
+"""
+
+from contextlib import contextmanager
+
+import pytest
+
+from src.utils.sql_profiler import QueryProfile, global_query_profiles
+
+
+@contextmanager
+def enforce_query_budget(client, max_queries: int):
+    # the app runs in another thread than the test : record the statements of the whole process,
+    # one request at a time
+    profile = QueryProfile()
+    over_budget = []
+
+    def start_request(_request):
+        profile.records.clear()
+
+    def end_request(response):
+        if len(profile) > max_queries:
+            request = response.request
+            over_budget.append(
+                f"{request.method} {request.url.path} over budget ({max_queries}): {profile.report()}"
+            )
+
+    event_hooks = client.event_hooks
+    client.event_hooks = {
+        "request": [*event_hooks["request"], start_request],
+        "response": [*event_hooks["response"], end_request],
+    }
+    global_query_profiles.append(profile)
+    try:
+        yield
+    finally:
+        global_query_profiles.remove(profile)
+        client.event_hooks = event_hooks
+
+    if over_budget:
+        pytest.fail("\n".join(over_budget), pytrace=False)
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "query_budget(max_queries): fail the test if one of its requests runs more than max_queries SQL statements",
+    )
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    marker = item.get_closest_marker("query_budget")
+    if marker is None:
+        return (yield)
+
+    client = item.funcargs.get("client")
+    if client is None:
+        pytest.fail("query_budget requires the client fixture", pytrace=False)
+
+    with enforce_query_budget(client, marker.args[0]):
+        return (yield)
+
+
+@pytest.fixture
+def query_budget(client):
+    return lambda max_queries: enforce_query_budget(client, max_queries)
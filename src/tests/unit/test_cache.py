@@ -0,0 +1,21 @@
+from src.utils.cache import TTLCache
+
+
+def test_ttl_cache_expires_entries():
+    cache = TTLCache(ttl_seconds=0, max_size=10)
+    cache.set("key", "value")
+    assert cache.get("key") is None
+
+    cache = TTLCache(ttl_seconds=60, max_size=10)
+    cache.set("key", "value")
+    assert cache.get("key") == "value"
+    cache.clear()
+    assert cache.get("key") is None
+
+
+def test_ttl_cache_evicts_oldest_entries():
+    cache = TTLCache(ttl_seconds=60, max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("c", 3)
+    assert [cache.get(key) for key in "abc"] == [None, 2, 3]
@@ -0,0 +1,41 @@
+import json
+
+from src.services.cache_invalidation import InvalidationBus
+
+
+def test_notification_dispatched_to_topic_handlers():
+    bus = InvalidationBus(channel="test")
+    evicted = {"group": [], "reference_data": []}
+    bus.subscribe("group", evicted["group"].append)
+    bus.subscribe("reference_data", evicted["reference_data"].append)
+
+    bus.on_notification(None, 1, "test", json.dumps({"topic": "group", "key": 42}))
+    bus.on_notification(None, 1, "test", "not json")
+
+    assert evicted == {"group": [42], "reference_data": []}
+
+
+def test_reconnection_evicts_everything():
+    bus = InvalidationBus(channel="test")
+    evicted = []
+    bus.subscribe("group", evicted.append)
+    bus.subscribe("reference_data", evicted.append)
+
+    bus.dispatch_all()
+
+    assert evicted == [None, None]
+
+
+def test_failing_handler_does_not_stop_dispatch():
+    bus = InvalidationBus(channel="test")
+    evicted = []
+
+    def failing_handler(key):
+        raise RuntimeError("boom")
+
+    bus.subscribe("group", failing_handler)
+    bus.subscribe("group", evicted.append)
+
+    bus.dispatch("group", 1)
+
+    assert evicted == [1]
@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+from src.database import (
+    AcquireTimeoutPool,
+    DatabaseBusyError,
+    PreparedQuery,
+    prepared_queries,
+    prepared_query,
+)
+from src.utils.metrics import db_pool_acquire_timeouts
+
+
+class FakePool:
+    def __init__(self):
+        self.connections = asyncio.Queue()
+
+    async def acquire(self, timeout=None):
+        return await asyncio.wait_for(self.connections.get(), timeout)
+
+    def get_size(self):
+        return 1
+
+
+@pytest.mark.asyncio
+async def test_acquire_timeout_pool_fails_fast():
+    fake_pool = FakePool()
+    pool = AcquireTimeoutPool(fake_pool, timeout=0.01)
+
+    fake_pool.connections.put_nowait("connection")
+    assert await pool.acquire() == "connection"
+    # other attributes are the ones of the wrapped pool
+    assert pool.get_size() == 1
+
+    timeouts = db_pool_acquire_timeouts.values[()]
+    with pytest.raises(DatabaseBusyError):
+        await pool.acquire()
+    assert db_pool_acquire_timeouts.values[()] == timeouts + 1
+
+
+def test_prepared_query_positional_parameters():
+    query = PreparedQuery(
+        "test",
+        "SELECT * FROM groups WHERE id = :id AND CAST(:scopes AS text[]) && scope_list AND orga_id = :id",
+    )
+
+    assert query.sql == (
+        "SELECT * FROM groups WHERE id = $1 AND CAST($2 AS text[]) && scope_list AND orga_id = $1"
+    )
+    assert query.arguments({"scopes": ["read"], "id": 1}) == [1, ["read"]]
+    # the text is the one of the query, for the profiler
+    assert str(query) == query.query
+
+
+def test_prepared_query_keeps_casts_and_times():
+    query = PreparedQuery("test", "SELECT '12:30'::time, now()::date WHERE id = :id")
+    assert query.sql == "SELECT '12:30'::time, now()::date WHERE id = $1"
+
+
+def test_prepared_query_names_are_unique():
+    prepared_query("test_unique", "SELECT 1")
+    try:
+        with pytest.raises(ValueError):
+            prepared_query("test_unique", "SELECT 2")
+    finally:
+        # not prepared on the connections of the other tests
+        del prepared_queries["test_unique"]
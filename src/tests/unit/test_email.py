@@ -0,0 +1,125 @@
+import socket
+from email.message import EmailMessage
+
+import pytest
+from aiosmtpd.controller import Controller
+from fastapi_mail import ConnectionConfig
+
+from src.repositories.email import EmailRepository, SMTPConnectionPool
+
+
+class RecordingHandler:
+    def __init__(self):
+        self.connections = 0
+        self.messages = []
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.connections += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope)
+        return "250 Message accepted for delivery"
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    handler = RecordingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    yield controller, handler
+    controller.stop()
+
+
+def build_pool(controller, max_size=2, suppress_send=False):
+    conf = ConnectionConfig(
+        MAIL_SERVER=controller.hostname,
+        MAIL_PORT=controller.port,
+        MAIL_USERNAME="",
+        MAIL_PASSWORD="",
+        MAIL_FROM="roles@data.gouv.fr",
+        MAIL_STARTTLS=False,
+        MAIL_SSL_TLS=False,
+        USE_CREDENTIALS=False,
+        SUPPRESS_SEND=suppress_send,
+    )
+    return SMTPConnectionPool(conf, max_size=max_size, health_check_after_seconds=0)
+
+
+def message(recipient: str) -> EmailMessage:
+    msg = EmailMessage()
+    msg["From"] = "roles@data.gouv.fr"
+    msg["To"] = recipient
+    msg["Subject"] = "Test"
+    msg.set_content("Bonjour")
+    return msg
+
+
+@pytest.mark.asyncio
+async def test_smtp_sessions_are_reused(smtp_server):
+    controller, handler = smtp_server
+    pool = build_pool(controller)
+
+    for i in range(3):
+        async with pool.acquire() as session:
+            await session.send_message(message(f"user{i}@example.com"))
+
+    assert len(handler.messages) == 3
+    assert handler.connections == 1
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_closed_sessions_are_replaced(smtp_server):
+    controller, handler = smtp_server
+    pool = build_pool(controller)
+
+    async with pool.acquire() as session:
+        await session.send_message(message("user@example.com"))
+    # the server drops the idle session
+    session.close()
+
+    async with pool.acquire() as session:
+        await session.send_message(message("user@example.com"))
+
+    assert len(handler.messages) == 2
+    assert handler.connections == 2
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_suppressed_sending_opens_no_session(smtp_server):
+    controller, handler = smtp_server
+    pool = build_pool(controller, suppress_send=True)
+
+    await pool.send_message(message("user@example.com"))
+
+    assert handler.messages == []
+    assert handler.connections == 0
+
+
+def test_build_message_with_inline_logo():
+    email_repository = EmailRepository()
+
+    message = email_repository.build_message(
+        ["user@example.com", "other@example.com"],
+        "Sujet",
+        '<img src="cid:logo_ade"> Bonjour',
+    )
+
+    assert message["To"] == "user@example.com, other@example.com"
+    assert message["From"] == "roles@data.gouv.fr"
+    assert message["Subject"] == "Sujet"
+    assert message.get_content_type() == "multipart/related"
+    html, logo = message.iter_parts()
+    assert html.get_content_type() == "text/html"
+    assert "Bonjour" in html.get_content()
+    assert logo.get_content_type() == "image/png"
+    assert logo["Content-ID"] == "<logo_ade>"
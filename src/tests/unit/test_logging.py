@@ -5,11 +5,26 @@ from fastapi import HTTPException
 from starlette.requests import Request
 
 from src.main import (
-    REDACTED_EMAIL,
     global_exception_handler,
     log_http_exception,
     sentry_before_send,
 )
+from src.utils.sentry import REDACTED_EMAIL, HttpExceptionCapturePolicy
+
+
+def build_request(path: str = "/resource-server/groups/") -> Request:
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": path,
+            "headers": [],
+            "query_string": b"",
+            "server": ("testserver", 80),
+            "scheme": "http",
+            "client": ("testclient", 50000),
+        }
+    )
 
 
 @pytest.mark.asyncio
@@ -41,9 +56,7 @@ async def test_http_exception_logs_detail(caplog):
 
 
 @pytest.mark.asyncio
-async def test_http_exception_anonymizes_email_in_logs_and_sentry(
-    caplog, monkeypatch
-):
+async def test_http_exception_anonymizes_email_in_logs_and_sentry(caplog, monkeypatch):
     captured_exceptions = []
     request = Request(
         {
@@ -66,6 +79,10 @@ async def test_http_exception_anonymizes_email_in_logs_and_sentry(
         captured_exceptions.append(exception)
 
     monkeypatch.setattr("src.main.sentry_sdk.capture_exception", fake_capture_exception)
+    monkeypatch.setattr(
+        "src.main.http_exception_capture_policy",
+        HttpExceptionCapturePolicy("403:1", max_per_minute=60),
+    )
 
     with caplog.at_level(logging.ERROR, logger="src"):
         response = await log_http_exception(request, exception)
@@ -121,3 +138,54 @@ async def test_unexpected_exception_anonymizes_email_in_logs(caplog, monkeypatch
     assert response.status_code == 500
     assert "alice@example.com" not in caplog.text
     assert f"Could not load {REDACTED_EMAIL}" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_client_errors_are_not_captured_by_default(caplog, monkeypatch):
+    captured_exceptions = []
+    monkeypatch.setattr(
+        "src.main.sentry_sdk.capture_exception", captured_exceptions.append
+    )
+
+    with caplog.at_level(logging.ERROR, logger="src"):
+        response = await log_http_exception(
+            build_request(), HTTPException(status_code=404, detail="Group not found")
+        )
+
+    assert response.status_code == 404
+    assert captured_exceptions == []
+    assert "HTTPException 404 on GET /resource-server/groups/" in caplog.text
+    assert "Traceback" not in caplog.text
+
+
+def test_capture_policy_sample_rates_and_rate_limit():
+    policy = HttpExceptionCapturePolicy("5xx:1.0,403:1,4xx:0", max_per_minute=2)
+
+    assert policy.sample_rate(503) == 1.0
+    assert policy.sample_rate(403) == 1.0
+    assert policy.sample_rate(404) == 0.0
+    assert policy.sample_rate(302) == 0.0
+
+    assert not policy.should_capture(404)
+    assert [policy.should_capture(500) for _ in range(3)] == [True, True, False]
+
+
+def test_sentry_before_send_anonymizes_stack_frame_variables():
+    event = {
+        "exception": {
+            "values": [
+                {
+                    "value": "error",
+                    "stacktrace": {
+                        "frames": [{"vars": {"user_email": "alice@example.com"}}]
+                    },
+                }
+            ]
+        },
+        "breadcrumbs": {"values": [{"message": "bob@example.org logged in"}]},
+    }
+
+    anonymized_event = sentry_before_send(event, {})
+
+    assert "alice@example.com" not in str(anonymized_event)
+    assert "bob@example.org" not in str(anonymized_event)
@@ -0,0 +1,87 @@
+import json
+import os
+
+from src.utils.metrics import Counter, Gauge, Histogram, Registry
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1))
+    histogram.observe(0.05, "/a")
+    histogram.observe(0.5, "/a")
+    histogram.observe(5, "/a")
+
+    assert histogram.render().splitlines() == [
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{route="/a",le="0.1"} 1',
+        'latency_seconds_bucket{route="/a",le="1"} 2',
+        'latency_seconds_bucket{route="/a",le="+Inf"} 3',
+        'latency_seconds_sum{route="/a"} 5.55',
+        'latency_seconds_count{route="/a"} 3',
+    ]
+
+
+def test_registry_renders_counters_and_gauges():
+    registry = Registry()
+    counter = registry.register(Counter("calls_total", "Calls.", ("name",)))
+    gauge = registry.register(Gauge("pending", "Pending."))
+    registry.register(
+        Gauge("pool", "Pool.", ("state",), callback=lambda: {("idle",): 3})
+    )
+    counter.inc('say "hi"')
+    counter.inc('say "hi"')
+    gauge.inc()
+    gauge.inc()
+    gauge.dec()
+
+    rendered = registry.render()
+    assert 'calls_total{name="say \\"hi\\""} 2' in rendered
+    assert "\npending 1\n" in rendered
+    assert 'pool{state="idle"} 3' in rendered
+    assert rendered.endswith("\n")
+
+
+def worker_registry():
+    registry = Registry()
+    registry.register(Counter("calls_total", "Calls.", ("name",)))
+    registry.register(Histogram("latency_seconds", "Latency.", buckets=(0.1, 1)))
+    return registry
+
+
+def test_registry_sums_the_snapshots_of_the_running_workers(tmp_path):
+    other_worker = worker_registry()
+    other_worker.metrics[0].inc("a")
+    other_worker.metrics[1].observe(0.5)
+    # written by the parent process, as a running worker
+    (tmp_path / f"{os.getppid()}.json").write_text(json.dumps(other_worker.snapshot()))
+    # written by a stopped worker
+    stopped_worker_snapshot = tmp_path / "999999999.json"
+    stopped_worker_snapshot.write_text(json.dumps(other_worker.snapshot()))
+
+    registry = worker_registry()
+    registry.metrics[0].inc("a")
+    registry.metrics[0].inc("b")
+    registry.metrics[1].observe(0.05)
+
+    rendered = registry.render(str(tmp_path))
+    assert 'calls_total{name="a"} 2' in rendered
+    assert 'calls_total{name="b"} 1' in rendered
+    assert 'latency_seconds_bucket{le="0.1"} 1' in rendered
+    assert 'latency_seconds_bucket{le="1"} 2' in rendered
+    assert "latency_seconds_count 2" in rendered
+    assert not stopped_worker_snapshot.exists()
+
+    # the values of this worker are not modified
+    assert registry.render().count("calls_total{") == 2
+    assert 'calls_total{name="a"} 1' in registry.render()
+
+
+def test_registry_writes_its_snapshot(tmp_path):
+    registry = worker_registry()
+    registry.metrics[0].inc("a")
+
+    registry.write_snapshot(str(tmp_path))
+
+    snapshot = json.loads((tmp_path / f"{os.getpid()}.json").read_text())
+    assert snapshot["calls_total"] == [[["a"], 1]]
+    assert snapshot["latency_seconds"] == []
@@ -0,0 +1,73 @@
+import pytest
+
+from src.database import DatabaseWithSchema
+from src.repositories.groups import GroupsRepository
+from src.repositories.users import UsersRepository
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.queries = []
+
+    async def execute(self, query, *args, **kwargs):
+        self.queries.append(str(query))
+
+    async def fetch_one(self, query, *args, **kwargs):
+        self.queries.append(str(query))
+
+    async def fetch_all(self, query, *args, **kwargs):
+        self.queries.append(str(query))
+        return []
+
+
+def test_reader_is_the_session_without_replica():
+    session = DatabaseWithSchema(FakeDatabase(), "roles")
+    assert session.reader is session
+
+
+@pytest.mark.asyncio
+async def test_reads_go_to_the_replica_until_a_write():
+    primary, replica = FakeDatabase(), FakeDatabase()
+    session = DatabaseWithSchema(primary, "roles", replica=replica)
+
+    await session.reader.fetch_all("SELECT G.id FROM groups AS G")
+    assert replica.queries[-1] == "SELECT G.id FROM groups AS G"
+
+    # reads on the primary do not pin the session
+    await session.fetch_one("  select U.id FROM users AS U")
+    assert session.reader is session.replica
+
+    # read-your-writes : after a write, reads are sent to the primary
+    await session.fetch_one("INSERT INTO groups (name) VALUES (:name) RETURNING id")
+    assert session.reader is session
+    await session.reader.fetch_all("SELECT G.id FROM groups AS G")
+    assert primary.queries[-1] == "SELECT G.id FROM groups AS G"
+
+
+@pytest.mark.asyncio
+async def test_users_and_memberships_are_read_on_the_primary():
+    """They guard the writes : admin checks, last admin, already a member..."""
+    primary, replica = FakeDatabase(), FakeDatabase()
+    users_repository = UsersRepository(
+        DatabaseWithSchema(primary, "roles", replica=replica), logs_service=None
+    )
+
+    await users_repository.get_by_id(1)
+    await users_repository.get_all_by_group_ids([1])
+
+    assert len(primary.queries) == 2
+    assert replica.queries == []
+
+
+@pytest.mark.asyncio
+async def test_contract_groups_are_read_on_the_primary():
+    """DataPass looks the group of a contract up before creating it."""
+    primary, replica = FakeDatabase(), FakeDatabase()
+    groups_repository = GroupsRepository(
+        DatabaseWithSchema(primary, "roles", replica=replica), logs_service=None
+    )
+
+    await groups_repository.search_by_contract("contrat", 1)
+
+    assert len(primary.queries) == 1
+    assert replica.queries == []
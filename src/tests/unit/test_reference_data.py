@@ -0,0 +1,66 @@
+from contextlib import asynccontextmanager
+
+import pytest
+
+from src.repositories.reference_data import ReferenceDataCache
+
+
+class CountingDbSession:
+    def __init__(self):
+        self.queries = 0
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield
+
+    async def fetch_all(self, query):
+        self.queries += 1
+        if "FROM roles" in query:
+            return [{"id": 1, "role_name": "administrateur", "is_admin": True}]
+        return [
+            {"id": 1, "name": "SP", "url": None, "proconnect_client_id": "client"},
+            {"id": 2, "name": "SP 2", "url": None, "proconnect_client_id": None},
+        ]
+
+
+@pytest.mark.asyncio
+async def test_reference_data_is_read_once():
+    db_session = CountingDbSession()
+    cache = ReferenceDataCache(ttl_seconds=60)
+
+    assert (await cache.get_role(db_session, 1))["role_name"] == "administrateur"
+    assert await cache.get_role(db_session, 2) is None
+    assert (await cache.get_service_provider(db_session, 1))["name"] == "SP"
+    assert db_session.queries == 2
+
+    cache.invalidate()
+    await cache.get_all_roles(db_session)
+    assert db_session.queries == 4
+
+
+@pytest.mark.asyncio
+async def test_reference_data_expires():
+    db_session = CountingDbSession()
+    cache = ReferenceDataCache(ttl_seconds=0)
+
+    await cache.get_role(db_session, 1)
+    await cache.get_role(db_session, 1)
+    assert db_session.queries == 4
+
+
+@pytest.mark.asyncio
+async def test_service_provider_by_proconnect_client_id():
+    db_session = CountingDbSession()
+    cache = ReferenceDataCache(ttl_seconds=60)
+
+    sp = await cache.get_service_provider_by_proconnect_client_id(db_session, "client")
+    assert sp["id"] == 1
+    # unknown client ids are negatively cached
+    for _ in range(3):
+        assert (
+            await cache.get_service_provider_by_proconnect_client_id(
+                db_session, "unknown"
+            )
+            is None
+        )
+    assert db_session.queries == 2
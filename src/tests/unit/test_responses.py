@@ -0,0 +1,31 @@
+import json
+
+from pydantic import BaseModel, Field
+
+from src.utils.responses import records_response
+
+
+class Item(BaseModel):
+    id: int
+    name: str | None = None
+    scope_list: list[str] = Field(default_factory=list)
+    role: str = "member"
+
+
+def test_records_response_defaults_missing_fields():
+    response = records_response([{"id": 1, "name": "a"}], Item)
+
+    assert json.loads(response.body) == [
+        {"id": 1, "name": "a", "scope_list": [], "role": "member"}
+    ]
+
+
+def test_records_response_keeps_selected_fields():
+    response = records_response(
+        [{"id": 1, "name": None, "scope_list": ["read"], "role": "admin", "extra": 1}],
+        Item,
+    )
+
+    assert json.loads(response.body) == [
+        {"id": 1, "name": None, "scope_list": ["read"], "role": "admin"}
+    ]
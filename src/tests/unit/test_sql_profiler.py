@@ -0,0 +1,37 @@
+from src.utils.sql_profiler import (
+    QueryProfile,
+    current_query_profile,
+    record_query,
+)
+
+
+def test_record_query_is_a_noop_without_profile():
+    record_query("fetch_one", "SELECT 1", 0.001)
+    assert current_query_profile.get() is None
+
+
+def test_profile_flags_repeated_statements():
+    profile = QueryProfile()
+    token = current_query_profile.set(profile)
+    try:
+        for user_id in (1, 2, 3):
+            record_query("begin", "BEGIN", 0.001)
+            record_query(
+                "fetch_one",
+                "SELECT U.email\n  FROM users AS U WHERE U.id = :id",
+                0.002,
+            )
+        record_query("begin", "BEGIN", 0.001)
+        record_query("fetch_all", "SELECT R.id FROM roles AS R", 0.002)
+    finally:
+        current_query_profile.reset(token)
+
+    assert len(profile) == 8
+    # transaction boundaries are not flagged, statements are compared whitespace-insensitively
+    assert profile.repeated_statements() == {
+        "SELECT U.email FROM users AS U WHERE U.id = :id": 3
+    }
+    assert profile.summary().startswith("queries=8; repeated=1;")
+    # the caller is the first application frame outside of the profiler
+    assert profile.records[0].caller.startswith("tests/unit/test_sql_profiler.py:")
+    assert "repeated x3: SELECT U.email" in profile.report()
@@ -0,0 +1,35 @@
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from src.middleware.web_session import WebSessionMiddleware
+
+
+def build_client() -> TestClient:
+    app = FastAPI()
+
+    @app.get("/admin/page")
+    async def admin_page(request: Request):
+        request.session["seen"] = True
+        return {"has_session": True}
+
+    @app.get("/groups/")
+    async def api_route(request: Request):
+        return {"has_session": "session" in request.scope}
+
+    app.add_middleware(WebSessionMiddleware, secret_key="test")
+    return TestClient(app)
+
+
+def test_web_paths_have_a_session():
+    response = build_client().get("/admin/page")
+    assert response.json() == {"has_session": True}
+    assert "session" in response.cookies
+
+
+def test_api_paths_skip_the_session():
+    client = build_client()
+    client.get("/admin/page")
+
+    response = client.get("/groups/")
+    assert response.json() == {"has_session": False}
+    assert "set-cookie" not in response.headers
@@ -0,0 +1,150 @@
+import hashlib
+import hmac
+import json
+from datetime import datetime, timezone
+
+import httpx
+import pytest
+
+from src.services.webhooks import (
+    SIGNATURE_HEADER,
+    TIMESTAMP_HEADER,
+    WebhooksDispatcher,
+    backoff_delay,
+    sign,
+)
+
+
+class InMemoryWebhooksRepository:
+    def __init__(self, deliveries):
+        self.deliveries = deliveries
+        self.delivered = []
+        self.retried = []
+        self.failed = []
+
+    async def claim_pending(self, batch_size, lease_seconds, max_attempts):
+        claimed, self.deliveries = self.deliveries[:batch_size], []
+        return claimed
+
+    async def mark_delivered(self, delivery_ids):
+        self.delivered += delivery_ids
+
+    async def mark_for_retry(self, delivery_ids, error, delay_seconds):
+        self.retried.append((delivery_ids, delay_seconds))
+
+    async def mark_failed(self, delivery_ids, error):
+        self.failed += delivery_ids
+
+
+def delivery(id, service_provider_id, attempts=1):
+    return {
+        "id": id,
+        "service_provider_id": service_provider_id,
+        "event_type": "ADD_USER_TO_GROUP",
+        "group_id": 1,
+        "payload": json.dumps({"user_id": id, "role_id": 2}),
+        "attempts": attempts,
+        "created_at": datetime(2026, 1, 1, tzinfo=timezone.utc),
+        "webhook_url": f"https://sp{service_provider_id}.example.com/webhook",
+        "webhook_secret": "secret",
+    }
+
+
+def build_dispatcher(repository, handler):
+    return WebhooksDispatcher(
+        repository,
+        httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        batch_size=100,
+        max_attempts=3,
+        timeout_seconds=1,
+    )
+
+
+def test_sign():
+    body = b'{"events": []}'
+    expected = hmac.new(b"secret", b"1700000000." + body, hashlib.sha256).hexdigest()
+    assert sign("secret", 1700000000, body) == f"sha256={expected}"
+    assert sign("secret", 1700000001, body) != sign("secret", 1700000000, body)
+
+
+def test_backoff_delay():
+    assert [backoff_delay(attempts) for attempts in range(1, 5)] == [10, 20, 40, 80]
+    assert backoff_delay(50) == 3600
+
+
+@pytest.mark.asyncio
+async def test_dispatch_batches_by_service_provider():
+    requests = []
+
+    def handler(request: httpx.Request):
+        requests.append(request)
+        return httpx.Response(200)
+
+    repository = InMemoryWebhooksRepository(
+        [delivery(1, 1), delivery(2, 2), delivery(3, 1)]
+    )
+    claimed = await build_dispatcher(repository, handler).dispatch_once()
+
+    assert claimed == 3
+    assert sorted(repository.delivered) == [1, 2, 3]
+    assert len(requests) == 2
+
+    request = next(r for r in requests if r.url.host == "sp1.example.com")
+    events = json.loads(request.content)["events"]
+    assert [event["id"] for event in events] == [1, 3]
+    assert request.headers[SIGNATURE_HEADER] == sign(
+        "secret", int(request.headers[TIMESTAMP_HEADER]), request.content
+    )
+
+
+@pytest.mark.asyncio
+async def test_dispatch_failure_retries_then_gives_up():
+    repository = InMemoryWebhooksRepository(
+        [delivery(1, 1, attempts=1), delivery(2, 1, attempts=3)]
+    )
+    await build_dispatcher(
+        repository, lambda request: httpx.Response(500)
+    ).dispatch_once()
+
+    assert repository.delivered == []
+    assert repository.retried == [([1], backoff_delay(1))]
+    assert repository.failed == [2]
+
+
+@pytest.mark.asyncio
+async def test_dispatch_any_error_is_a_failed_attempt():
+    def handler(request: httpx.Request):
+        if request.url.host == "sp1.example.com":
+            raise httpx.InvalidURL("Invalid URL")
+        if request.url.host == "sp2.example.com":
+            raise RuntimeError("Unexpected error")
+        return httpx.Response(200)
+
+    repository = InMemoryWebhooksRepository(
+        [delivery(1, 1), delivery(2, 2), delivery(3, 3)]
+    )
+    claimed = await build_dispatcher(repository, handler).dispatch_once()
+
+    assert claimed == 3
+    assert repository.delivered == [3]
+    assert sorted(repository.retried) == [
+        ([1], backoff_delay(1)),
+        ([2], backoff_delay(1)),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_dispatch_batch_error_does_not_stop_the_others():
+    class FlakyWebhooksRepository(InMemoryWebhooksRepository):
+        async def mark_delivered(self, delivery_ids):
+            if 1 in delivery_ids:
+                raise ConnectionError("Database unavailable")
+            await super().mark_delivered(delivery_ids)
+
+    repository = FlakyWebhooksRepository([delivery(1, 1), delivery(2, 2)])
+    claimed = await build_dispatcher(
+        repository, lambda request: httpx.Response(200)
+    ).dispatch_once()
+
+    assert claimed == 2
+    assert repository.delivered == [2]
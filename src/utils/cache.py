@@ -0,0 +1,34 @@
+import time
+from typing import Any, Hashable
+
+
+class TTLCache:
+    """
+    Small bounded in-process cache : entries expire after `ttl_seconds`, and the oldest entries are evicted
+    once `max_size` is reached.
+    """
+
+    def __init__(self, ttl_seconds: float, max_size: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self.entries: dict[Hashable, tuple[float, Any]] = {}
+
+    def get(self, key: Hashable) -> Any | None:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            self.entries.pop(key, None)
+            return None
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self.entries.pop(key, None)
+        while len(self.entries) >= self.max_size:
+            # dicts keep insertion order : the first key is the oldest
+            self.entries.pop(next(iter(self.entries)))
+        self.entries[key] = (time.monotonic() + self.ttl_seconds, value)
+
+    def clear(self) -> None:
+        self.entries.clear()
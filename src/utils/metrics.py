@@ -0,0 +1,337 @@
+"""
+Minimal in-process metrics, exposed in the Prometheus text format on /metrics.
+
+Metrics are kept by each worker. The workers share a socket, so a scrape reaches any of them : if METRICS_DIR is
+set, every worker writes a snapshot of its metrics there, and /metrics returns the sum over the running workers.
+"""
+
+import asyncio
+import bisect
+import json
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape_label_value(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(label_names: tuple[str, ...], label_values: tuple) -> str:
+    if not label_names:
+        return ""
+    labels = ",".join(
+        f'{name}="{_escape_label_value(value)}"'
+        for name, value in zip(label_names, label_values)
+    )
+    return "{" + labels + "}"
+
+
+class Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, label_names: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+
+    def collect(self) -> dict[tuple, Any]:
+        """Current values, by label values."""
+        return self.values
+
+    def merge(self, values: dict[tuple, Any], other: dict[tuple, Any]) -> None:
+        """Add the values of `other` (of another worker) to `values`."""
+        for label_values, value in other.items():
+            values[label_values] = values.get(label_values, 0) + value
+
+    def samples(self, values: dict[tuple, Any]) -> Iterable[str]:
+        for label_values, value in values.items():
+            yield f"{self.name}{_format_labels(self.label_names, label_values)} {value}"
+
+    def render(self, values: dict[tuple, Any] | None = None) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+        lines.extend(self.samples(self.collect() if values is None else values))
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name, documentation, label_names=()):
+        super().__init__(name, documentation, label_names)
+        # unlabelled counters are exported from the start, at 0
+        self.values: dict[tuple, float] = {} if self.label_names else {(): 0}
+
+    def inc(self, *label_values, amount: float = 1) -> None:
+        self.values[label_values] = self.values.get(label_values, 0) + amount
+
+
+class Gauge(Metric):
+    """
+    Gauge set explicitly (inc/dec/set), or read from `callback` when rendered.
+    """
+
+    type = "gauge"
+
+    def __init__(
+        self,
+        name,
+        documentation,
+        label_names=(),
+        callback: Callable[[], dict[tuple, float]] | None = None,
+    ):
+        super().__init__(name, documentation, label_names)
+        self.values: dict[tuple, float] = {} if self.label_names else {(): 0}
+        self.callback = callback
+
+    def set(self, value: float, *label_values) -> None:
+        self.values[label_values] = value
+
+    def inc(self, *label_values, amount: float = 1) -> None:
+        self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def dec(self, *label_values, amount: float = 1) -> None:
+        self.inc(*label_values, amount=-amount)
+
+    def collect(self):
+        return self.callback() if self.callback else self.values
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name, documentation, label_names=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(buckets)
+        # label values -> (count per bucket, +Inf included, sum)
+        self.values: dict[tuple, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, *label_values) -> None:
+        counts, total = self.values.setdefault(
+            label_values, ([0] * (len(self.buckets) + 1), [0.0])
+        )
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        total[0] += value
+
+    def merge(self, values, other):
+        for label_values, (counts, total) in other.items():
+            merged_counts, merged_total = values.setdefault(
+                label_values, ([0] * len(counts), [0.0])
+            )
+            for i, count in enumerate(counts):
+                merged_counts[i] += count
+            merged_total[0] += total[0]
+
+    def samples(self, values):
+        bucket_names = self.label_names + ("le",)
+        for label_values, (counts, total) in values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else str(bound)
+                labels = _format_labels(bucket_names, label_values + (le,))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.label_names, label_values)
+            yield f"{self.name}_sum{labels} {total[0]}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+    @asynccontextmanager
+    async def time(self, *label_values):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *label_values)
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: list[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def snapshot(self) -> dict[str, list]:
+        return {
+            metric.name: [
+                [list(label_values), value]
+                for label_values, value in metric.collect().items()
+            ]
+            for metric in self.metrics
+        }
+
+    def write_snapshot(self, directory: str) -> None:
+        """Write the metrics of this worker to `directory`, read by the other workers (see `render`)."""
+        path = Path(directory) / f"{os.getpid()}.json"
+        temporary_path = path.with_suffix(".tmp")
+        temporary_path.write_text(json.dumps(self.snapshot()))
+        # atomic : the other workers never read a partial snapshot
+        os.replace(temporary_path, path)
+
+    def _other_workers_snapshots(self, directory: str) -> Iterable[dict[str, list]]:
+        for path in Path(directory).glob("*.json"):
+            if not path.stem.isdigit() or int(path.stem) == os.getpid():
+                continue
+            pid = int(path.stem)
+            try:
+                os.kill(pid, 0)
+            except ProcessLookupError:
+                # stopped worker
+                path.unlink(missing_ok=True)
+                continue
+            except PermissionError:
+                pass
+            try:
+                yield json.loads(path.read_text())
+            except (OSError, ValueError):
+                logger.warning("Unreadable metrics snapshot %s", path)
+
+    def render(self, directory: str = "") -> str:
+        """
+        Metrics of this worker, summed with the snapshots of the other running workers written to `directory`.
+        """
+        values = {}
+        for metric in self.metrics:
+            values[metric.name] = {}
+            metric.merge(values[metric.name], metric.collect())
+        if directory:
+            metrics_by_name = {metric.name: metric for metric in self.metrics}
+            for snapshot in self._other_workers_snapshots(directory):
+                for name, samples in snapshot.items():
+                    if name in metrics_by_name:
+                        metrics_by_name[name].merge(
+                            values[name],
+                            {
+                                tuple(label_values): value
+                                for label_values, value in samples
+                            },
+                        )
+        return (
+            "\n".join(metric.render(values[metric.name]) for metric in self.metrics)
+            + "\n"
+        )
+
+
+registry = Registry()
+
+# ----------------
+# Application metrics
+# ----------------
+
+http_request_duration = registry.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "HTTP requests latency, by route template.",
+        ("method", "route", "status"),
+    )
+)
+db_queries_per_request = registry.register(
+    Histogram(
+        "db_queries_per_request",
+        "Database round-trips per HTTP request.",
+        ("route",),
+        buckets=(0, 1, 2, 5, 10, 20, 50, 100),
+    )
+)
+db_query_duration = registry.register(
+    Histogram(
+        "db_query_duration_seconds",
+        "Database round-trips latency, by operation.",
+        ("operation",),
+    )
+)
+db_pool_acquire_duration = registry.register(
+    Histogram(
+        "db_pool_acquire_seconds",
+        "Time waited for a connection of the database pool.",
+        buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0),
+    )
+)
+db_pool_acquire_timeouts = registry.register(
+    Counter(
+        "db_pool_acquire_timeouts_total",
+        "Requests that got no connection of the database pool in time.",
+    )
+)
+external_request_duration = registry.register(
+    Histogram(
+        "external_request_duration_seconds",
+        "Calls to external APIs latency.",
+        ("service", "operation"),
+    )
+)
+emails_pending = registry.register(
+    Gauge("emails_pending", "Emails waiting to be sent.")
+)
+
+
+class RequestStats:
+    def __init__(self):
+        self.db_queries = 0
+
+
+# statistics of the current HTTP request, set by MetricsMiddleware
+current_request_stats: ContextVar[RequestStats | None] = ContextVar(
+    "current_request_stats", default=None
+)
+
+
+def record_db_query(operation: str, duration: float) -> None:
+    db_query_duration.observe(duration, operation)
+    stats = current_request_stats.get()
+    if stats is not None:
+        stats.db_queries += 1
+
+
+# ----------------
+# Snapshots shared by the workers, only if METRICS_DIR
+# ----------------
+
+
+async def write_snapshots(directory: str, interval: float) -> None:
+    while True:
+        try:
+            registry.write_snapshot(directory)
+        except OSError:
+            logger.exception("Could not write the metrics snapshot to %s", directory)
+        await asyncio.sleep(interval)
+
+
+_snapshots_task: asyncio.Task | None = None
+
+
+async def start_metrics_snapshots() -> None:
+    global _snapshots_task
+    if settings.METRICS_DIR and not _snapshots_task:
+        Path(settings.METRICS_DIR).mkdir(parents=True, exist_ok=True)
+        _snapshots_task = asyncio.create_task(
+            write_snapshots(
+                settings.METRICS_DIR, settings.METRICS_SNAPSHOT_INTERVAL_SECONDS
+            )
+        )
+
+
+async def stop_metrics_snapshots() -> None:
+    global _snapshots_task
+    if _snapshots_task:
+        _snapshots_task.cancel()
+        try:
+            await _snapshots_task
+        except asyncio.CancelledError:
+            pass
+        _snapshots_task = None
+        (Path(settings.METRICS_DIR) / f"{os.getpid()}.json").unlink(missing_ok=True)
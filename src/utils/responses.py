@@ -0,0 +1,87 @@
+from functools import cache
+from typing import Any, Iterable, Mapping
+
+import pydantic_core
+from fastapi import Request, Response
+from pydantic import BaseModel, TypeAdapter
+from pydantic_core import PydanticUndefined
+
+
+class FastJSONResponse(Response):
+    """
+    Response whose content is already serialised to JSON bytes.
+    """
+
+    media_type = "application/json"
+
+
+@cache
+def _list_adapter(model: type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(list[model])
+
+
+@cache
+def _field_defaults(model: type[BaseModel]) -> dict[str, Any]:
+    """Default of every field of the model, None for the required ones"""
+    defaults = {}
+    for name, field in model.model_fields.items():
+        default = field.get_default(call_default_factory=True)
+        defaults[name] = None if default is PydanticUndefined else default
+    return defaults
+
+
+def records_response(
+    items: Iterable[Mapping[str, Any] | BaseModel],
+    model: type[BaseModel],
+    status_code: int = 200,
+    headers: Mapping[str, str] | None = None,
+) -> FastJSONResponse:
+    """
+    Serialise a list of database records or pydantic models straight to JSON bytes.
+
+    Opt-in replacement for FastAPI's `response_model` serialisation on large list endpoints :
+    - database records are projected on the fields of `model` but NOT validated, the SQL query is the contract.
+      Fields missing from the records get the default of the model field.
+    - pydantic models are dumped as is, without being validated a second time
+
+    Keep `response_model` on the route so that the OpenAPI documentation stays accurate.
+    """
+    items = list(items)
+
+    if all(isinstance(item, model) for item in items):
+        content = _list_adapter(model).dump_json(items)
+    else:
+        # fields the query does not select get their default, as with the model
+        defaults = _field_defaults(model)
+        rows = [dict(item) for item in items]
+        content = pydantic_core.to_json(
+            [
+                {field: row.get(field, default) for field, default in defaults.items()}
+                for row in rows
+            ]
+        )
+
+    return FastJSONResponse(content=content, status_code=status_code, headers=headers)
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Strong ETag built from the given parts, ex: make_etag(1, 42, 3) -> '"1-42-3"'
+    """
+    return '"' + "-".join(str(part) for part in parts) + '"'
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """
+    Whether the `If-None-Match` header of the request matches the ETag (weak comparison, RFC 9110).
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+
+
+def not_modified_response(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
@@ -0,0 +1,128 @@
+import random
+import re
+import threading
+import time
+from typing import Any
+
+EMAIL_ADDRESS_PATTERN = re.compile(
+    r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b"
+)
+REDACTED_EMAIL = "[REDACTED_EMAIL]"
+
+
+def anonymize_user_emails(value: Any) -> Any:
+    if isinstance(value, str):
+        # most strings contain no email : skip the regex
+        if "@" not in value:
+            return value
+        return EMAIL_ADDRESS_PATTERN.sub(REDACTED_EMAIL, value)
+    if isinstance(value, dict):
+        return {key: anonymize_user_emails(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [anonymize_user_emails(item) for item in value]
+    if isinstance(value, tuple):
+        return tuple(anonymize_user_emails(item) for item in value)
+    return value
+
+
+# Fields of a Sentry event that may contain user emails. "*" walks every item of a list.
+PII_EVENT_FIELDS: tuple[tuple[str, ...], ...] = (
+    ("message",),
+    ("logentry", "message"),
+    ("logentry", "formatted"),
+    ("logentry", "params"),
+    ("exception", "values", "*", "value"),
+    ("exception", "values", "*", "stacktrace", "frames", "*", "vars"),
+    ("threads", "values", "*", "stacktrace", "frames", "*", "vars"),
+    ("breadcrumbs", "values", "*", "message"),
+    ("breadcrumbs", "values", "*", "data"),
+    ("request", "url"),
+    ("request", "query_string"),
+    ("request", "data"),
+    ("extra",),
+    ("user",),
+)
+
+
+def _scrub_path(container: Any, path: tuple[str, ...]) -> None:
+    key, rest = path[0], path[1:]
+    if key == "*":
+        if isinstance(container, list):
+            for index, item in enumerate(container):
+                if rest:
+                    _scrub_path(item, rest)
+                else:
+                    container[index] = anonymize_user_emails(item)
+        return
+
+    if not isinstance(container, dict) or key not in container:
+        return
+    if rest:
+        _scrub_path(container[key], rest)
+    else:
+        container[key] = anonymize_user_emails(container[key])
+
+
+def scrub_event(event: dict[str, Any]) -> dict[str, Any]:
+    """
+    Anonymize the user emails of a Sentry event, in place, only visiting the fields that may contain them.
+    """
+    for path in PII_EVENT_FIELDS:
+        _scrub_path(event, path)
+    return event
+
+
+class RateLimiter:
+    """
+    Token bucket : at most `max_per_minute` events per minute, with bursts up to `max_per_minute`.
+    """
+
+    def __init__(self, max_per_minute: int):
+        self.capacity = max_per_minute
+        self.tokens = float(max_per_minute)
+        self.refill_per_second = max_per_minute / 60
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.capacity,
+                self.tokens + (now - self.updated_at) * self.refill_per_second,
+            )
+            self.updated_at = now
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+class HttpExceptionCapturePolicy:
+    """
+    Decides which HTTPExceptions are sent to Sentry.
+
+    The policy is a comma separated list of `status:sample_rate`, where status is a code (403) or a class (4xx),
+    ex: "5xx:1.0,401:0.1,403:0.1,4xx:0". Codes take precedence over classes, unlisted statuses are not captured.
+    Captures are also rate limited, so that an error storm cannot flood Sentry nor burn CPU.
+    """
+
+    def __init__(self, policy: str, max_per_minute: int):
+        self.sample_rates: dict[str, float] = {}
+        for rule in policy.split(","):
+            if rule.strip():
+                status, rate = rule.split(":")
+                self.sample_rates[status.strip().lower()] = float(rate)
+        self.rate_limiter = RateLimiter(max_per_minute)
+
+    def sample_rate(self, status_code: int) -> float:
+        rate = self.sample_rates.get(str(status_code))
+        if rate is None:
+            rate = self.sample_rates.get(f"{status_code // 100}xx", 0.0)
+        return rate
+
+    def should_capture(self, status_code: int) -> bool:
+        rate = self.sample_rate(status_code)
+        if rate <= 0 or (rate < 1 and random.random() >= rate):
+            return False
+        return self.rate_limiter.allow()
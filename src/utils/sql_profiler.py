@@ -0,0 +1,120 @@
+"""
+SQL profiler : records every statement run through DatabaseWithSchema, with its timing and its caller.
+
+Debug tool, enabled with SQL_PROFILER_ENABLED (see SQLProfilerMiddleware) or by the query budget of the tests.
+Statements run more than once in a request are flagged : they usually are N+1 queries (a query in a loop)
+or sequential repository calls that could be merged.
+"""
+
+import os
+import sys
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# frames skipped when looking for the caller of a statement
+PROFILER_FILES = (
+    os.path.join(SRC_DIR, "database.py"),
+    os.path.join(SRC_DIR, "utils", "sql_profiler.py"),
+)
+CALLER_DEPTH = 3
+
+# transaction boundaries : counted, but never flagged as repeated
+UNFLAGGED_OPERATIONS = {"begin", "commit", "rollback"}
+
+
+@dataclass
+class QueryRecord:
+    operation: str
+    statement: str
+    duration: float
+    caller: str
+
+
+@dataclass
+class QueryProfile:
+    records: list[QueryRecord] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @property
+    def total_duration(self) -> float:
+        return sum(record.duration for record in self.records)
+
+    def repeated_statements(self) -> dict[str, int]:
+        """Statements run more than once, with their number of runs."""
+        counts = Counter(
+            record.statement
+            for record in self.records
+            if record.operation not in UNFLAGGED_OPERATIONS
+        )
+        return {statement: count for statement, count in counts.items() if count > 1}
+
+    def callers_of(self, statement: str) -> list[str]:
+        return list(
+            dict.fromkeys(
+                record.caller
+                for record in self.records
+                if record.statement == statement
+            )
+        )
+
+    def summary(self) -> str:
+        return (
+            f"queries={len(self)}; repeated={len(self.repeated_statements())}; "
+            f"time_ms={self.total_duration * 1000:.1f}"
+        )
+
+    def report(self) -> str:
+        """Every statement, in order, followed by the repeated ones."""
+        lines = [self.summary()]
+        for record in self.records:
+            lines.append(
+                f"  {record.duration * 1000:7.2f}ms {record.operation:<15} {record.statement[:120]}  <- {record.caller}"
+            )
+        for statement, count in self.repeated_statements().items():
+            lines.append(f"  repeated x{count}: {statement[:120]}")
+            for caller in self.callers_of(statement):
+                lines.append(f"    <- {caller}")
+        return "\n".join(lines)
+
+
+# profile of the current HTTP request, set by SQLProfilerMiddleware
+current_query_profile: ContextVar[QueryProfile | None] = ContextVar(
+    "current_query_profile", default=None
+)
+# profiles recording every statement of the process, whatever the request (used by the tests,
+# where the app runs in another thread than the test)
+global_query_profiles: list[QueryProfile] = []
+
+
+def normalize_statement(query) -> str:
+    return " ".join(str(query).split())
+
+
+def find_caller() -> str:
+    """The innermost application frames that led to the statement, ex: services/groups.py:87 add_user_to_group."""
+    callers = []
+    frame = sys._getframe(2)
+    while frame is not None and len(callers) < CALLER_DEPTH:
+        filename = frame.f_code.co_filename
+        if filename.startswith(SRC_DIR) and filename not in PROFILER_FILES:
+            callers.append(
+                f"{os.path.relpath(filename, SRC_DIR)}:{frame.f_lineno} {frame.f_code.co_name}"
+            )
+        frame = frame.f_back
+    return " < ".join(callers)
+
+
+def record_query(operation: str, query, duration: float) -> None:
+    profile = current_query_profile.get()
+    if profile is None and not global_query_profiles:
+        return
+
+    record = QueryRecord(operation, normalize_statement(query), duration, find_caller())
+    if profile is not None:
+        profile.records.append(record)
+    for global_profile in global_query_profiles:
+        global_profile.records.append(record)